@@ -1,6 +1,26 @@
-import struct
-import json
-import logging
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+
+# =================================================
+# 0. 共用的解析实现
+# =================================================
+# 二进制切帧（decode_binary_frames / FRAME_DTYPE）与 JSON 流切分都与 03_ModifyCGMPage/decoders.py 共用同一份实现，
+# 这里只把返回的帧数组 / 对象列表适配成旧接口，避免两份解析器各自演变
+_SHARED_DECODERS = Path(__file__).resolve().parent.parent / "03_ModifyCGMPage" / "decoders.py"
+
+
+def _load_shared_decoders():
+    """按文件路径加载（两个目录都不是包，不能直接 import）"""
+    spec = importlib.util.spec_from_file_location("cgm_decoders", _SHARED_DECODERS)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+_shared = _load_shared_decoders()
 
 
 # =================================================
@@ -30,73 +50,33 @@ class BinaryFrameDecoder(BaseDecoder):
 
     def __init__(self):
         self.buffer = bytearray()
-        self.FRAME_LEN = 15
-        self.HEAD = 0xA5
-        self.TAIL = 0x5A
-        # struct 格式: < (小端), I (uint32), H (uint16) * 4
-        # Payload 部分对应: ms, uric, ascorbic, glucose, code12
-        self.PAYLOAD_FMT = "<IHHHH"
 
     def feed(self, data: bytes, on_frame_decoded):
-        self.buffer.extend(data)
+        frames = self.feed_batch(data)
+        if len(frames) == 0:
+            return
 
-        while len(self.buffer) >= self.FRAME_LEN:
-            # 1. 寻找帧头
-            if self.buffer[0] != self.HEAD:
-                # 如果第一个字节不是帧头，移除它，继续找
-                self.buffer.pop(0)
-                continue
-
-            # 2. 检查帧尾 (优化：先看尾部对不对，不对就不用算校验和了)
-            if self.buffer[self.FRAME_LEN - 1] != self.TAIL:
-                # 帧头是对的，但长度够了尾巴不对，说明这可能不是一个完整的包
-                # 或者碰巧数据里有个 0xA5。移除帧头，继续找
-                self.buffer.pop(0)
-                continue
-
-            # 3. 提取候选帧
-            frame = self.buffer[:self.FRAME_LEN]
-
-            # 4. 校验和验证 (防错)
-            # C++算法: sum += pData[i] (Payload部分)
-            # Payload 在 frame 的索引是 1 到 12 (不含13)
-            payload = frame[1:13]
-            calc_sum = sum(payload) & 0xFF  # 确保是 uint8
-            recv_sum = frame[13]
-
-            if calc_sum == recv_sum:
-                # === 校验通过，解析数据 ===
-                try:
-                    # 解包 Payload
-                    ms, uric_raw, ascorbic_raw, glucose_raw, code12 = struct.unpack(self.PAYLOAD_FMT, payload)
-
-                    # 转换 DAC 码值为电压 (假设 12位 DAC, 参考电压 3.3V，根据你实际情况调整)
-                    # 如果单片机发的就是电压值，这里就不用除
-                    voltage_v = (code12 / 4095.0) * 3.3
-
-                    # 构造与之前 JSON 一致的字典，保证 UI 不用改
-                    decoded_data = {
-                        "t": ms,  # 对应 C++ 的 ms
-                        "voltage": voltage_v,  # 对应 C++ 的 code12 换算
-                        "uric": uric_raw,  # 对应 C++ 的 uric
-                        "ascorbic": ascorbic_raw,
-                        "glucose": glucose_raw
-                    }
-
-                    # 回调给上层
-                    on_frame_decoded(decoded_data)
-
-                except Exception as e:
-                    print(f"解析异常: {e}")
-
-                # 消费掉这个完整帧
-                del self.buffer[:self.FRAME_LEN]
-
-            else:
-                # 校验失败
-                print(f"校验失败: Calc={calc_sum:02X}, Recv={recv_sum:02X}")
-                # 移除帧头，尝试重新对齐
-                self.buffer.pop(0)
+        # 兼容旧接口：逐帧回调 dict（批量场景请直接用 feed_batch）
+        voltage_v = (frames["code12"] / 4095.0) * 3.3
+        for ms, v, u, a, g in zip(frames["ms"].tolist(), voltage_v.tolist(), frames["uric"].tolist(),
+                                  frames["ascorbic"].tolist(), frames["glucose"].tolist()):
+            try:
+                on_frame_decoded({"t": ms, "voltage": v, "uric": u, "ascorbic": a, "glucose": g})
+            except Exception as e:
+                print(f"解析异常: {e}")
+
+    def feed_batch(self, data: bytes) -> np.ndarray:
+        """
+        批量解析：一次 NumPy 扫描找出缓冲区内所有合法帧，返回结构化数组（列式访问 frames["ms"] 等）。
+        与逐字节 pop(0) 的旧算法结果完全一致（同样的贪心对齐 + 同样的剩余字节）。
+        """
+        self.buffer.extend(data)
+        frames, consumed, n_bad = _shared.decode_binary_frames(self.buffer)
+        if n_bad:
+            print(f"校验失败: {n_bad} 帧")
+        if consumed:
+            del self.buffer[:consumed]
+        return frames
 
     def reset(self):
         self.buffer.clear()
@@ -108,60 +88,26 @@ class BinaryFrameDecoder(BaseDecoder):
 class JsonFrameDecoder(BaseDecoder):
     """
     处理基于换行符 \n 或 {} 的 JSON 文本流
+    - 括号深度 / 字符串 / 转义状态跨 feed 保留，每个字节只扫描一次（不再反复重建 buffer）
+    - line_delimiter 非空（对应 ProtocolConfig.line_delimiter）时，一行一个对象的数据整行 json.loads；
+      没有分隔符的数据（{...}{...}）收到完整对象就立即回调，不等分隔符
     """
 
-    def __init__(self):
-        self.buffer = ""
+    def __init__(self, line_delimiter: str = "\n"):
+        self._impl = _shared.JsonFrameDecoder(line_delimiter)
 
-    def feed(self, data: bytes, on_frame_decoded):
-        # 将字节流转为字符串
-        try:
-            text = data.decode('utf-8', errors='ignore')
-        except:
-            return
+    @property
+    def line_delimiter(self):
+        return self._impl.line_delimiter
 
-        self.buffer += text
+    @line_delimiter.setter
+    def line_delimiter(self, value):
+        self._impl.line_delimiter = value
 
-        # 简单的粘包处理：按换行符切割，或者按 JSON 对象切割
-        # 这里假设单片机发 JSON 也是带换行符的，或者我们用括号匹配
-        while "}" in self.buffer:
-            try:
-                # 寻找第一个 { 和对应的 }
-                start = self.buffer.find("{")
-                if start == -1:
-                    self.buffer = ""
-                    break
-
-                # 简单的括号计数法来找匹配的 } (应对嵌套)
-                depth = 0
-                end = -1
-                for i in range(start, len(self.buffer)):
-                    if self.buffer[i] == '{':
-                        depth += 1
-                    elif self.buffer[i] == '}':
-                        depth -= 1
-
-                    if depth == 0:
-                        end = i
-                        break
-
-                if end != -1:
-                    json_str = self.buffer[start:end + 1]
-                    self.buffer = self.buffer[end + 1:]  # 移除已处理部分
-
-                    try:
-                        obj = json.loads(json_str)
-                        # 确保字段名归一化（根据你之前的 AppConfig）
-                        # 这里直接传出去，由 MainViewModel 进行字段映射
-                        on_frame_decoded(obj)
-                    except json.JSONDecodeError:
-                        pass  # 丢弃坏包
-                else:
-                    # 还没收完完整的包
-                    break
-            except Exception:
-                self.buffer = ""  # 出错重置
-                break
+    def feed(self, data: bytes, on_frame_decoded):
+        # 这里直接传出去，由 MainViewModel 进行字段映射
+        for obj in self._impl.feed(data):
+            on_frame_decoded(obj)
 
     def reset(self):
-        self.buffer = ""
\ No newline at end of file
+        self._impl.reset()
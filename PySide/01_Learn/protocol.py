@@ -1,9 +1,9 @@
 # protocol.py
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict
 
-from config import AppConfig
+from config import AppConfig, CalibrationConfig
 
 
 @dataclass(frozen=True)
@@ -33,22 +33,96 @@ def parse_frame(obj: Dict[str, Any], cfg: AppConfig) -> Frame:
     )
 
 
+# 工程换算全是 ADC 码的一次函数：value = code * scale + offset
+# 按 CalibrationConfig 预先算好每个通道的 (scale, offset)，换算时不再做除法；calib 不变就一直复用
+@dataclass(frozen=True)
+class Affine:
+    scale: float
+    offset: float
+
+
+@dataclass(frozen=True)
+class CalibrationTable:
+    time: Affine          # ms -> s
+    voltage: Affine       # Code12 -> V
+    uric: Affine          # ADC -> uA
+    ascorbic: Affine      # ADC -> uA
+    glucose: Affine       # ADC -> mA
+    calib: CalibrationConfig = field(repr=False, compare=False)
+    # adc_to_current 用到的其它增益：gain -> Affine，首次用到时补算
+    by_gain: Dict[float, Affine] = field(default_factory=dict, repr=False, compare=False)
+
+    @staticmethod
+    def current(c: CalibrationConfig, gain: float) -> Affine:
+        # (adc - ref_volt * adc_value_per_volt) / adc_value_per_volt / gain
+        apv, gain = float(c.adc_value_per_volt), float(gain)
+        return Affine(1.0 / (apv * gain), -float(c.ref_volt) / gain)
+
+    @classmethod
+    def build(cls, c: CalibrationConfig) -> "CalibrationTable":
+        apv = float(c.adc_value_per_volt)
+        tb = cls(
+            time=Affine(1.0 / float(c.time_gain), 0.0),
+            voltage=Affine(-1.0 / apv, float(c.ref_volt)),
+            uric=cls.current(c, c.uric_gain),
+            ascorbic=cls.current(c, c.ascorbic_gain),
+            glucose=cls.current(c, c.glucose_gain),
+            calib=c,
+        )
+        tb.by_gain.update({c.uric_gain: tb.uric, c.ascorbic_gain: tb.ascorbic, c.glucose_gain: tb.glucose})
+        return tb
+
+    def for_gain(self, gain: float) -> Affine:
+        aff = self.by_gain.get(gain)
+        if aff is None:
+            aff = self.by_gain[gain] = self.current(self.calib, gain)
+        return aff
+
+
+_table = None
+
+
+def calibration_table(cfg: AppConfig) -> CalibrationTable:
+    """
+    当前 calib 对应的换算表，按 calib 对象本身缓存（AppConfig.load 会换成新对象）；
+    原地修改 cfg.calib 的字段后须调用 invalidate_calibration()
+    """
+    global _table
+    tb = _table
+    if tb is None or tb.calib is not cfg.calib:
+        tb = _table = CalibrationTable.build(cfg.calib)
+    return tb
+
+
+def invalidate_calibration():
+    global _table
+    _table = None
+
+
+# 标量换算逐点调用：缓存命中时不再多一层函数调用
 def adc_code_to_voltage(code12: int, cfg: AppConfig) -> float:
-    c = cfg.calib
-    return float(c.ref_volt) - float(code12) / float(c.adc_value_per_volt)
+    tb = _table
+    if tb is None or tb.calib is not cfg.calib:
+        tb = calibration_table(cfg)
+    v = tb.voltage
+    return float(code12) * v.scale + v.offset
 
 
 def adc_to_current(adc_value: int, gain: float, cfg: AppConfig) -> float:
-    c = cfg.calib
-    v = (float(adc_value) - float(c.ref_volt) * float(c.adc_value_per_volt)) / float(c.adc_value_per_volt)
-    return v / float(gain)
+    tb = _table
+    if tb is None or tb.calib is not cfg.calib:
+        tb = calibration_table(cfg)
+    a = tb.by_gain.get(gain) or tb.for_gain(gain)
+    return float(adc_value) * a.scale + a.offset
 
 
 def frame_to_engineering(frame: Frame, cfg: AppConfig):
-    c = cfg.calib
-    t_s = float(frame.ms) / float(c.time_gain)
-    voltage = adc_code_to_voltage(frame.code12, cfg)
-    uric_uA = adc_to_current(frame.uric, c.uric_gain, cfg)
-    ascorbic_uA = adc_to_current(frame.ascorbic, c.ascorbic_gain, cfg)
-    glucose_mA = adc_to_current(frame.glucose, c.glucose_gain, cfg)
-    return t_s, voltage, uric_uA, ascorbic_uA, glucose_mA
+    tb = calibration_table(cfg)
+    t, v, u, a, g = tb.time, tb.voltage, tb.uric, tb.ascorbic, tb.glucose
+    return (
+        frame.ms * t.scale + t.offset,
+        frame.code12 * v.scale + v.offset,
+        frame.uric * u.scale + u.offset,
+        frame.ascorbic * a.scale + a.offset,
+        frame.glucose * g.scale + g.offset,
+    )
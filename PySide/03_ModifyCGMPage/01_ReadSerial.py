@@ -1,252 +1,347 @@
 import sys
-import json
 import serial
-import serial.tools.list_ports
-from dataclasses import dataclass, asdict, field
-from enum import Enum
-from pathlib import Path
+from dataclasses import dataclass
 from datetime import datetime
-import struct
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QTextEdit, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QTextEdit, QTableView,
     QHeaderView, QMessageBox, QComboBox, QLineEdit,
     QSplitter, QFormLayout, QCheckBox, QFrame, QStackedWidget,
-    QGridLayout, QFileDialog, QSpinBox, QPlainTextEdit, QGroupBox
+    QGridLayout, QFileDialog, QSpinBox, QPlainTextEdit, QGroupBox,
+    QListWidget, QListWidgetItem
 )
 from PySide6.QtCore import Qt, Signal, QTimer, QThread, QObject
 from PySide6.QtGui import QColor, QPainter, QTextCursor
-from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 import os
-import csv
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from acquisition import FILTER_CHANNELS, AcquisitionPipeline, MultiPortReader, port_tag
+from app_config import AppConfig, _safe_filter_type
+from chart_buffer import LodSeries, RingSeries
+from cv_cycles import CvCycleSegmenter
+from filters import FilterType
+from flush_scheduler import FlushScheduler
+from peaks import PeakTracker
+from perf_metrics import METRICS, MetricsDump
+from raw_capture import RawCaptureReader, RawCaptureWriter
+from recorder import SessionRecorder
+from frame_batch import FrameBatch
+from serial_reader import PortReader
+from table_model import FrameTableModel
 
 
 # =========================
-# 1) Config / Protocol (单文件内置，避免循环导入)
+# 1) Config / Protocol：见 app_config.py（与无界面采集程序 cgm_daemon.py 共用）
 # =========================
-
-class FilterType(Enum):
-    NONE = "无滤波"
-    MOVING_AVG = "滑动平均"
-    MEDIAN = "中值滤波"
-    KALMAN = "卡尔曼滤波"
-
-
-@dataclass
-class UIConfig:
-    ui_update_interval_ms: int = 50
-    max_table_rows: int = 2000
-
-
-@dataclass
-class FilterConfig:
-    filter_type: FilterType = FilterType.MOVING_AVG
-    window_size: int = 5
-    kalman_Q: float = 0.01
-    kalman_R: float = 0.1
-
-
-@dataclass
-class SaveConfig:
-    auto_save: bool = False
-    save_interval_ms: int = 1000
-    save_path: str = "./serial_data"
-
-
-@dataclass
-class ProtocolConfig:
-    # 你设备的 JSON 字段名可能不同，可在这里扩展/修改
-    time_keys: tuple = ("t", "time", "sec", "seconds", "timestamp")
-    voltage_keys: tuple = ("voltage", "V", "v")
-    uric_keys: tuple = ("uric", "uric_uA", "UA", "uA_uric")
-    ascorbic_keys: tuple = ("ascorbic", "ascorbic_uA", "AA", "uA_ascorbic")
-    glucose_keys: tuple = ("glucose", "glucose_mA", "GLU", "mA_glucose")
-
-    # 工程量缩放（默认透传：若你的数据是 ADC 计数/原始量，需要在此设置倍率）
-    time_unit: str = "auto"          # "auto" / "ms" / "s"
-    voltage_scale: float = 1.0       # raw -> V
-    uric_scale: float = 1.0          # raw -> uA
-    ascorbic_scale: float = 1.0      # raw -> uA
-    glucose_scale: float = 1.0       # raw -> mA
-
-
-@dataclass
-class AppConfig:
-    ui: UIConfig = field(default_factory=UIConfig)
-    filt: FilterConfig = field(default_factory=FilterConfig)
-    save: SaveConfig = field(default_factory=SaveConfig)
-    proto: ProtocolConfig = field(default_factory=ProtocolConfig)
-
-    @staticmethod
-    def _config_path() -> Path:
-        return Path(__file__).with_name("app_config.json")
-
-    @classmethod
-    def load(cls):
-        p = cls._config_path()
-        if not p.exists():
-            cfg = cls()
-            cfg.save_to()
-            return cfg
-
-        try:
-            raw = json.loads(p.read_text(encoding="utf-8"))
-        except Exception:
-            cfg = cls()
-            cfg.save_to()
-            return cfg
-
-        cfg = cls()
-
-        # ui
-        ui = raw.get("ui", {})
-        cfg.ui.ui_update_interval_ms = int(ui.get("ui_update_interval_ms", cfg.ui.ui_update_interval_ms))
-        cfg.ui.max_table_rows = int(ui.get("max_table_rows", cfg.ui.max_table_rows))
-
-        # filt
-        flt = raw.get("filt", {})
-        ft = flt.get("filter_type", cfg.filt.filter_type.value)
-        cfg.filt.filter_type = _safe_filter_type(ft, default=cfg.filt.filter_type)
-        cfg.filt.window_size = int(flt.get("window_size", cfg.filt.window_size))
-        cfg.filt.kalman_Q = float(flt.get("kalman_Q", cfg.filt.kalman_Q))
-        cfg.filt.kalman_R = float(flt.get("kalman_R", cfg.filt.kalman_R))
-
-        # save
-        sv = raw.get("save", {})
-        cfg.save.auto_save = bool(sv.get("auto_save", cfg.save.auto_save))
-        cfg.save.save_interval_ms = int(sv.get("save_interval_ms", cfg.save.save_interval_ms))
-        cfg.save.save_path = str(sv.get("save_path", cfg.save.save_path))
-
-        # proto
-        pr = raw.get("proto", {})
-        cfg.proto.time_unit = str(pr.get("time_unit", cfg.proto.time_unit))
-        cfg.proto.voltage_scale = float(pr.get("voltage_scale", cfg.proto.voltage_scale))
-        cfg.proto.uric_scale = float(pr.get("uric_scale", cfg.proto.uric_scale))
-        cfg.proto.ascorbic_scale = float(pr.get("ascorbic_scale", cfg.proto.ascorbic_scale))
-        cfg.proto.glucose_scale = float(pr.get("glucose_scale", cfg.proto.glucose_scale))
-
-        return cfg
-
-    def save_to(self):
-        p = self._config_path()
-        data = asdict(self)
-
-        # Enum 序列化为 value
-        data["filt"]["filter_type"] = self.filt.filter_type.value
-
-        p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-
-def _safe_filter_type(v, default: FilterType) -> FilterType:
-    # 既支持 value，也支持 name
-    for ft in FilterType:
-        if v == ft.value or v == ft.name:
-            return ft
-    return default
-
-
-def _pick_first_key(d: dict, keys: tuple):
-    for k in keys:
-        if k in d:
-            return d.get(k)
-    return None
-
-
-def _to_float(x, default=0.0):
-    try:
-        if x is None:
-            return default
-        return float(x)
-    except Exception:
-        return default
-
-
-def parse_frame(data: dict, cfg: AppConfig) -> dict:
-    """
-    将串口 JSON dict 归一化为统一字段：
-    { "t": seconds, "voltage": V, "uric": uA, "ascorbic": uA, "glucose": mA }
-    """
-    pr = cfg.proto
-
-    t_raw = _pick_first_key(data, pr.time_keys)
-    v_raw = _pick_first_key(data, pr.voltage_keys)
-    u_raw = _pick_first_key(data, pr.uric_keys)
-    a_raw = _pick_first_key(data, pr.ascorbic_keys)
-    g_raw = _pick_first_key(data, pr.glucose_keys)
-
-    t = _to_float(t_raw, 0.0)
-
-    # 时间单位处理
-    if pr.time_unit == "ms":
-        t_sec = t / 1000.0
-    elif pr.time_unit == "s":
-        t_sec = t
-    else:
-        # auto：经验判断，> 1e4 认为是 ms
-        t_sec = t / 1000.0 if t > 1e4 else t
-
-    frame = {
-        "t": t_sec,
-        "voltage": _to_float(v_raw, 0.0),
-        "uric": _to_float(u_raw, 0.0),
-        "ascorbic": _to_float(a_raw, 0.0),
-        "glucose": _to_float(g_raw, 0.0),
-    }
-    return frame
-
-
-def frame_to_engineering(frame: dict, cfg: AppConfig):
-    """
-    工程量换算（倍率默认 1.0=透传）
-    返回：seconds, voltage(V), uric(uA), ascorbic(uA), glucose(mA)
-    """
-    pr = cfg.proto
-    seconds = _to_float(frame.get("t"), 0.0)
-    voltage = _to_float(frame.get("voltage"), 0.0) * pr.voltage_scale
-    uric = _to_float(frame.get("uric"), 0.0) * pr.uric_scale
-    ascorbic = _to_float(frame.get("ascorbic"), 0.0) * pr.ascorbic_scale
-    glucose = _to_float(frame.get("glucose"), 0.0) * pr.glucose_scale
-    return seconds, voltage, uric, ascorbic, glucose
-
+# 启动时只加载第一屏用得到的模块：QtCharts 在第一次显示图表时、serial.tools.list_ports 在后台枚举串口时、
+# csv 在手动保存时才导入（启动耗时见 benchmarks/bench_startup.py）
 
 # =========================
 # 2) Serial Worker
 # =========================
 
+@dataclass
+class DecodedChunk:
+    """工作线程交给 GUI 的一份结果：各设备已解析的数据批次（设备 ID -> FrameBatch）+ 接收区要显示的文本"""
+    batches: dict
+    text: str
+
+
 class SerialWorker(QObject):
-    data_received = Signal(bytes)
+    data_received = Signal(str, bytes)  # 设备 ID, 原始字节（在工作线程内发出）
+    batches_ready = Signal()            # output_queue 有新结果（限频，最多一个未处理的通知）
     error_occurred = Signal(str)
+    device_lost = Signal(str, str)      # 设备 ID, 错误：多设备时一个串口出错只停这台，其余照常采集
 
-    def __init__(self, serial_port, is_bluetooth=True):
+    def __init__(self, serial_port, cfg: AppConfig, is_bluetooth=True, event_driven=True,
+                 device_id: str = "", extra_ports: dict = None):
         super().__init__()
         self.serial_port = serial_port
+        self.cfg = cfg
+        # 设备 ID -> 串口：serial_port 为主设备（发送命令用它），extra_ports 为同时采集的其他设备
+        self.device_id = device_id
+        self.ports = {device_id: serial_port} if serial_port is not None else {}
+        self.ports.update(extra_ports or {})
+        self._stop_event = threading.Event()
         self.running = False
         self.is_bluetooth = is_bluetooth
         self.base_interval = 20 if is_bluetooth else 5
         self.current_interval = self.base_interval
 
+        # 事件驱动模式：阻塞在串口句柄上，数据一到立刻交出；False 时退回旧的 sleep 轮询
+        self.event_driven = event_driven
+
+        # 显示 / 解析选项（由 GUI 线程直接赋值）
+        self.binary_mode = False
+        self.hex_display = False
+        self.show_timestamp = False
+
+        # 接收区显示：暂停时不格式化；否则每 console_every_n 块取一块，每块最多 console_max_bytes 字节。
+        # 采集、解析、录制不受影响，始终处理全部数据
+        self.console_paused = False
+        self.console_every_n = 1
+        self.console_max_bytes = int(cfg.ui.console_max_chunk_bytes)
+        self._console_seq = 0
+
+        # 解码 + 换算 + 滤波在本线程完成，每台设备一套独立状态（与 cgm_daemon.py 共用 acquisition.py），
+        # GUI 只收到按设备分开的、滤波好的批次。每块数据到达即解码，换算 + 滤波攒到交付时每台设备整批做一次
+        self.pipelines = {dev: AcquisitionPipeline(cfg, self.binary_mode, device_id=dev)
+                          for dev in (self.ports or [device_id])}
+
+        # 限频交付：攒够 emit_interval_ms 再合并成一个 DecodedChunk 放进队列
+        self.emit_interval_ms = 20
+        self.output_queue = deque()
+        self.max_queue_depth = 0
+        self._notified = False
+        self._pending_batches = {}      # 设备 ID -> [已解码、未换算的 FrameBatch]
+        # 两次交付之间最多保留 console_max_lines 行：GUI 来不及显示的旧文本直接丢弃
+        self._pending_text = deque(maxlen=max(1, int(cfg.ui.console_max_lines)))
+        self._last_push = 0.0
+
+        # 热路径指标（见 perf_metrics.py），只在本线程写
+        self.m_bytes = METRICS.counter("serial.bytes")
+        self.m_chunks = METRICS.counter("serial.chunks")
+        self.m_decode = METRICS.timer("decode.chunk")
+        self.m_filter = METRICS.timer("filter.batch")
+        self.m_console_skipped = METRICS.counter("console.skipped_chunks")
+
     def start(self):
         self.running = True
         self.read_data()
 
+    def apply_config(self, cfg: AppConfig):
+        self.cfg = cfg
+        self.reset_filters()
+        self.console_max_bytes = int(cfg.ui.console_max_chunk_bytes)
+        lines = max(1, int(cfg.ui.console_max_lines))
+        if lines != self._pending_text.maxlen:
+            self._pending_text = deque(self._pending_text, maxlen=lines)
+
+    def reset_filters(self):
+        """GUI 线程调用：按 self.cfg 重建各设备的解码 / 滤波配置（下一块数据到达时在本线程生效）"""
+        for pipeline in self.pipelines.values():
+            pipeline.reconfigure(self.cfg)
+
     def stop(self):
         self.running = False
+        self._stop_event.set()
+        # 阻塞读（非 POSIX）最多等端口的 timeout（蓝牙为 2 s）：主动打断，停止不必等满
+        for port in self.ports.values():
+            cancel = getattr(port, "cancel_read", None)
+            if cancel is not None:
+                try:
+                    cancel()
+                except Exception:
+                    pass
+
+    def queue_depth(self) -> int:
+        return len(self.output_queue)
+
+    def take_results(self) -> list:
+        """GUI 线程调用：取走队列里全部结果"""
+        self._notified = False
+        out = []
+        while self.output_queue:
+            out.append(self.output_queue.popleft())
+        return out
 
     def read_data(self):
+        if len(self.ports) > 1:
+            self.read_data_multi()
+            return
+        if self.event_driven:
+            self.read_data_event_driven()
+            return
+
         while self.running and self.serial_port and self.serial_port.is_open:
             try:
                 if self.serial_port.in_waiting:
                     data = self.serial_port.read(self.serial_port.in_waiting)
-                    self.data_received.emit(data)
+                    self._handle_chunk(data)
                     self.current_interval = self.base_interval
                 else:
                     self.current_interval = min(self.current_interval * 2, 500)
+                self._push_if_due()
                 QThread.msleep(self.current_interval)
             except Exception as e:
                 self.error_occurred.emit(repr(e))
                 self.running = False
                 break
+        self._push_pending()
+
+    def read_data_event_driven(self):
+        # wait_timeout 只决定 stop() 的响应时间，不影响数据延迟
+        try:
+            reader = PortReader(self.serial_port, wait_timeout=0.1)
+        except Exception as e:
+            self.error_occurred.emit(repr(e))
+            self.running = False
+            return
+
+        interval = self.emit_interval_ms / 1000.0
+        while self.running and self.serial_port and self.serial_port.is_open:
+            try:
+                # 有待交付数据时，最多只等到下一个交付时刻
+                timeout = None
+                if self._pending_batches or self._pending_text:
+                    timeout = self._last_push + interval - time.perf_counter()
+                chunk = reader.read_chunk(timeout)
+                if chunk:
+                    self._handle_chunk(bytes(chunk))
+                self._push_if_due()
+            except Exception as e:
+                self.error_occurred.emit(repr(e))
+                self.running = False
+                break
+        self._push_pending()
+
+    def read_data_multi(self):
+        """多台设备：全部串口由本线程的一个 MultiPortReader 读取，空闲时每个交付周期醒一次"""
+        reader = MultiPortReader(self.ports, wait_timeout=self.emit_interval_ms / 1000.0)
+        for dev, data in reader.chunks(self._stop_event):
+            if isinstance(data, Exception):
+                self.device_lost.emit(dev, repr(data))
+            elif data:
+                self._handle_chunk(data, dev)
+            self._push_if_due()
+        if self.running:
+            self.error_occurred.emit("所有串口均已断开")
+            self.running = False
+        self._push_pending()
+
+    # ---------- 工作线程内：显示文本 + 解析 ----------
+    def _handle_chunk(self, data: bytes, device_id: str = None):
+        dev = self.device_id if device_id is None else device_id
+        self.m_bytes.add(len(data))
+        self.m_chunks.add()
+        self.data_received.emit(dev, data)
+        try:
+            if self._console_due():
+                self._pending_text.append(self._format_display(data, dev))
+            with self.m_decode.time():
+                batch = self._decode(data, dev)
+            if batch is not None and len(batch):
+                self._pending_batches.setdefault(dev, []).append(batch)
+        except Exception as e:
+            print(f"数据处理错误: {repr(e)}")
+
+    def _console_due(self) -> bool:
+        """本块是否送到接收区显示（暂停 / 抽样跳过的块只计数）"""
+        if self.console_paused:
+            self.m_console_skipped.add()
+            return False
+        self._console_seq += 1
+        if self.console_every_n > 1 and self._console_seq % self.console_every_n:
+            self.m_console_skipped.add()
+            return False
+        return True
+
+    def _format_display(self, data: bytes, device_id: str = "") -> str:
+        display_text = ""
+        if self.show_timestamp:
+            display_text += f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] "
+        if len(self.pipelines) > 1:
+            display_text += f"[{device_id}] "
+
+        # 超长的块只显示开头，避免一块数据生成几十 KB 的一行
+        shown = data
+        limit = self.console_max_bytes
+        if 0 < limit < len(data):
+            shown = data[:limit]
+
+        # 如果开启了二进制协议，建议强制/自动按 Hex 显示，方便调试
+        if self.hex_display or self.binary_mode:
+            display_text += shown.hex(' ').upper()
+        else:
+            display_text += shown.decode(errors='replace')
+        if shown is not data:
+            display_text += f" …(共 {len(data)} 字节)"
+        return display_text
+
+    def _decode(self, data: bytes, device_id: str):
+        """本设备的解码（二进制为 15 字节帧，见 decoders.decode_binary_frames）；换算 + 滤波在交付时整批做"""
+        pipeline = self.pipelines[device_id]
+        pipeline.binary_mode = self.binary_mode
+        # JSON 模式下开着 Hex显示 时不解析 (避免把 Hex 字符串当 JSON 解)
+        if not self.binary_mode and self.hex_display:
+            return None
+        return pipeline.decode(data)
+
+    # ---------- 限频交付 ----------
+    def _push_if_due(self):
+        if time.perf_counter() - self._last_push >= self.emit_interval_ms / 1000.0:
+            self._push_pending()
+
+    def _push_pending(self):
+        if not self._pending_batches and not self._pending_text:
+            return
+        with self.m_filter.time():
+            batches = {dev: self.pipelines[dev].process(FrameBatch.concat(parts))
+                       for dev, parts in self._pending_batches.items()}
+        chunk = DecodedChunk(batches, "\n".join(self._pending_text))
+        self._pending_batches = {}
+        self._pending_text.clear()
+        self._last_push = time.perf_counter()
+
+        self.output_queue.append(chunk)
+        self.max_queue_depth = max(self.max_queue_depth, len(self.output_queue))
+        if not self._notified:
+            self._notified = True
+            self.batches_ready.emit()
+
+
+class ReplayWorker(SerialWorker):
+    """
+    回放原始字节录制文件（raw_capture.py）：每块数据走与串口完全相同的 _handle_chunk -> 解码 -> 限频交付流程。
+    speed = 1.0 按录制时的节奏回放（>1 加速）；speed = 0 尽快回放（可作为解码 / 滤波 / 图表的吞吐基准，
+    此时 GUI 来不及取走结果会稍等，队列不超过 max_queue_depth_limit）
+    """
+    replay_finished = Signal()
+
+    def __init__(self, capture_path, cfg: AppConfig, speed: float = 1.0):
+        super().__init__(None, cfg, is_bluetooth=False, event_driven=False, device_id=port_tag(str(capture_path)))
+        self.reader = RawCaptureReader(capture_path)
+        self.speed = float(speed)
+        self.max_queue_depth_limit = 64
+        self.chunks_replayed = 0
+        self.bytes_replayed = 0
+        self.elapsed = 0.0
+
+    def read_data(self):
+        start = time.perf_counter()
+        try:
+            for t, data in self.reader.records():
+                if not self.running:
+                    break
+                if self.speed > 0:
+                    self._wait_until(start + t / self.speed)
+                else:
+                    while self.running and len(self.output_queue) >= self.max_queue_depth_limit:
+                        time.sleep(0.001)
+                self._handle_chunk(data)
+                self.chunks_replayed += 1
+                self.bytes_replayed += len(data)
+                self._push_if_due()
+        except Exception as e:
+            self.error_occurred.emit(repr(e))
+        self._push_pending()
+        self.elapsed = time.perf_counter() - start
+        self.running = False
+        self.replay_finished.emit()
+
+    def _wait_until(self, deadline: float):
+        # 等待期间照常按 emit_interval_ms 交付已解析的数据
+        while self.running:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, self.emit_interval_ms / 1000.0))
+            self._push_if_due()
 
 
 # =========================
@@ -258,22 +353,28 @@ class SerialWorker(QObject):
 # =========================
 
 class SerialPage(QWidget):
-    data_received = Signal(dict)
+    data_received = Signal(str, object)  # 设备 ID, FrameBatch
+    ports_listed = Signal(object)   # 后台线程枚举到的串口列表（ListPortInfo）
 
-    def __init__(self):
+    def __init__(self, cfg: AppConfig):
         super().__init__()
+        self.cfg = cfg
         self.serial_port = None
+        self.extra_ports = {}           # 同时采集的其他设备：设备 ID -> serial.Serial（与主串口同样的参数）
         self.worker = None
         self.worker_thread = None
-
-        # 缓存区
-        self.json_buffer = ""
-        self.binary_buffer = bytearray()  # 【新增】二进制缓存
+        self.captures = {}              # 原始字节录制：设备 ID -> RawCaptureWriter，在工作线程里直接写入
 
         self.is_connected = False
         self._is_bluetooth = False
+        self._listing_ports = False
+        self._port_info = {}            # 端口名 -> ListPortInfo（选择端口时不再重新枚举）
+
+        self.m_queue = METRICS.gauge("worker.queue_depth")
+        self.m_console = METRICS.timer("ui.console")
 
         self.init_ui()
+        self.ports_listed.connect(self._on_ports_listed)
         self.refresh_ports()
 
     def init_ui(self):
@@ -294,9 +395,14 @@ class SerialPage(QWidget):
         self.com_label = QLabel("当前设备: 无")
         self.com_label.setMinimumWidth(200)
 
+        # 解析结果队列深度：持续增大说明界面处理不过来（背压）
+        self.queue_label = QLabel("队列: 0 (峰值 0)")
+        self.queue_label.setMinimumWidth(150)
+
         status_layout.addWidget(self.status_label)
         status_layout.addWidget(self.com_label)
         status_layout.addStretch()
+        status_layout.addWidget(self.queue_label)
         main_layout.addWidget(status_frame)
         main_layout.addSpacing(5)
 
@@ -370,8 +476,30 @@ class SerialPage(QWidget):
         self.save_params = QCheckBox("保存参数")
         options_layout.addWidget(self.auto_connect)
         options_layout.addWidget(self.save_params)
+
+        # 原始字节录制 / 离线回放（复现现场问题）
+        self.capture_check = QCheckBox("录制原始数据")
+        self.capture_check.setToolTip("把串口收到的原始字节连同时间戳录制到保存路径下的 .cgmraw 文件")
+        self.replay_speed_combo = QComboBox()
+        self.replay_speed_combo.addItem("原速", 1.0)
+        self.replay_speed_combo.addItem("10倍速", 10.0)
+        self.replay_speed_combo.addItem("最快", 0.0)
+        self.replay_btn = QPushButton("回放录制...")
+        options_layout.addStretch()
+        options_layout.addWidget(self.capture_check)
+        options_layout.addWidget(QLabel("回放速度:"))
+        options_layout.addWidget(self.replay_speed_combo)
+        options_layout.addWidget(self.replay_btn)
         device_control_layout.addLayout(options_layout, 2, 0, 1, 6)
 
+        # 多台设备同时采集：勾选的串口与上面选中的主串口一起打开，共用一个读取线程，
+        # 各自独立解码 / 滤波，数据按设备 ID（串口名）分开显示和保存
+        device_control_layout.addWidget(QLabel("同时采集:"), 3, 0)
+        self.extra_ports_list = QListWidget()
+        self.extra_ports_list.setMaximumHeight(60)
+        self.extra_ports_list.setToolTip("勾选要与主串口同时采集的其他串口（参数与主串口相同）")
+        device_control_layout.addWidget(self.extra_ports_list, 3, 1, 1, 5)
+
         upper_layout.addWidget(device_control_frame)
         upper_layout.addSpacing(5)
 
@@ -456,6 +584,16 @@ class SerialPage(QWidget):
         self.auto_scroll_check = QCheckBox("自动滚动")
         self.auto_scroll_check.setChecked(True)
 
+        # 接收区只是调试用的原始数据窗口：可暂停或抽样显示，采集和解析照常全速进行
+        self.pause_display_check = QCheckBox("暂停显示")
+        self.pause_display_check.setToolTip("暂停接收区刷新（数据仍在接收、解析和录制）")
+        self.display_every_spin = QSpinBox()
+        self.display_every_spin.setRange(1, 10000)
+        self.display_every_spin.setValue(1)
+        self.display_every_spin.setPrefix("每 ")
+        self.display_every_spin.setSuffix(" 块显示 1 块")
+        self.display_every_spin.setToolTip("高速数据时只抽样显示，降低界面负担")
+
         # 【新增】二进制协议开关
         self.binary_mode_check = QCheckBox("二进制协议")
         self.binary_mode_check.setStyleSheet("color: blue; font-weight: bold;")
@@ -465,13 +603,15 @@ class SerialPage(QWidget):
         receive_btn_layout.addWidget(self.hex_receive_check)
         receive_btn_layout.addWidget(self.timestamp_check)
         receive_btn_layout.addWidget(self.auto_scroll_check)
+        receive_btn_layout.addWidget(self.pause_display_check)
+        receive_btn_layout.addWidget(self.display_every_spin)
         receive_btn_layout.addWidget(self.binary_mode_check)  # 添加到布局
 
         receive_title_layout.addLayout(receive_btn_layout)
 
         self.receive_text = QPlainTextEdit()
         self.receive_text.setReadOnly(True)
-        self.receive_text.document().setMaximumBlockCount(1000)
+        self.receive_text.setMaximumBlockCount(max(1, int(self.cfg.ui.console_max_lines)))
 
         receive_layout.addLayout(receive_title_layout)
         receive_layout.addWidget(self.receive_text)
@@ -487,6 +627,8 @@ class SerialPage(QWidget):
         self.refresh_btn.clicked.connect(self.refresh_ports)
         self.connect_btn.clicked.connect(self.toggle_connection)
         self.port_combo.currentIndexChanged.connect(self.on_port_selected)
+        self.capture_check.toggled.connect(self._on_capture_toggled)
+        self.replay_btn.clicked.connect(self.toggle_replay)
         self.send_btn.clicked.connect(self.send_data)
         self.clear_send_btn.clicked.connect(lambda: self.send_text.clear())
         self.clear_receive_btn.clicked.connect(lambda: self.receive_text.clear())
@@ -496,12 +638,52 @@ class SerialPage(QWidget):
         self.cmd_resume.clicked.connect(lambda: self.send_shortcut("RESUME"))
         self.cmd_force_pause.clicked.connect(lambda: self.send_shortcut("ForcePause"))
 
+        for chk in [self.hex_receive_check, self.timestamp_check, self.binary_mode_check,
+                    self.pause_display_check]:
+            chk.toggled.connect(self._sync_worker_options)
+        self.display_every_spin.valueChanged.connect(self._sync_worker_options)
+
     # ... (refresh_ports, on_port_selected, toggle_connection, open_serial, _async_open_serial, update_ui_connected_state, close_serial, start_worker, stop_worker 保持不变，为了节省篇幅省略，请直接复用原代码) ...
     # 为了完整性，这里列出没变的方法，你只需把原代码这部分保留即可。
 
     def refresh_ports(self):
+        """
+        在后台线程枚举串口，结果经 ports_listed 回到界面线程填入下拉框。
+        comports() 在 Windows 上要查询设备管理器，蓝牙串口多时可能要数秒，不能卡住启动和界面
+        """
+        if self._listing_ports:
+            return
+        self._listing_ports = True
+        self.refresh_btn.setEnabled(False)
+        self.port_combo.clear()
+        self.port_combo.addItem("正在扫描串口...", None)
+        self.connect_btn.setEnabled(False)
+        threading.Thread(target=self._list_ports, name="list-ports", daemon=True).start()
+
+    def _list_ports(self):
+        from serial.tools import list_ports
+        try:
+            ports = list_ports.comports()
+        except Exception as e:
+            print(f"枚举串口失败: {repr(e)}")
+            ports = []
+        try:
+            self.ports_listed.emit(ports)
+        except RuntimeError:
+            pass        # 枚举完成前窗口已关闭
+
+    def _on_ports_listed(self, ports):
+        self._listing_ports = False
+        self.refresh_btn.setEnabled(not self.is_connected)
+        self._port_info = {p.device: p for p in ports}
         self.port_combo.clear()
-        ports = serial.tools.list_ports.comports()
+        self.extra_ports_list.clear()
+        for p in ports:
+            item = QListWidgetItem(f"{p.device} ({p.description})")
+            item.setData(Qt.UserRole, p.device)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.extra_ports_list.addItem(item)
         if not ports:
             self.port_combo.addItem("无可用串口", None)
             self.device_info.clear()
@@ -521,13 +703,11 @@ class SerialPage(QWidget):
             self.device_info.clear()
             self.com_label.setText("当前设备: 无")
             return
-        ports = serial.tools.list_ports.comports()
-        for p in ports:
-            if p.device == port_name:
-                info = f"端口: {p.device}\n描述: {p.description}\n硬件ID: {p.hwid}\n"
-                self.device_info.setText(info)
-                self.com_label.setText(f"当前设备: {p.device}")
-                return
+        p = self._port_info.get(port_name)
+        if p is not None:
+            info = f"端口: {p.device}\n描述: {p.description}\n硬件ID: {p.hwid}\n"
+            self.device_info.setText(info)
+            self.com_label.setText(f"当前设备: {p.device}")
 
     def toggle_connection(self):
         if self.is_connected:
@@ -579,6 +759,11 @@ class SerialPage(QWidget):
                 port=port_name, baudrate=baudrate, bytesize=databits,
                 stopbits=stopbits, parity=parity, timeout=timeout
             )
+            for name in self._checked_extra_ports(port_name):
+                self.extra_ports[port_tag(name)] = serial.Serial(
+                    port=name, baudrate=baudrate, bytesize=databits,
+                    stopbits=stopbits, parity=parity, timeout=0.1
+                )
             if self.serial_port.is_open:
                 self.is_connected = True
                 self.update_ui_connected_state()
@@ -588,10 +773,29 @@ class SerialPage(QWidget):
                     self.start_worker()
         except PermissionError as e:
             QMessageBox.warning(self, "权限错误", f"无法打开串口：\n{repr(e)}")
-            self.serial_port = None
+            self._close_ports()
         except Exception as e:
             QMessageBox.warning(self, "错误", f"无法打开串口：\n{repr(e)}")
-            self.serial_port = None
+            self._close_ports()
+
+    def _checked_extra_ports(self, primary: str) -> list:
+        names = []
+        for row in range(self.extra_ports_list.count()):
+            item = self.extra_ports_list.item(row)
+            name = item.data(Qt.UserRole)
+            if item.checkState() == Qt.Checked and name != primary:
+                names.append(name)
+        return names
+
+    def _close_ports(self):
+        for port in [self.serial_port, *self.extra_ports.values()]:
+            if port is not None:
+                try:
+                    port.close()
+                except Exception:
+                    pass
+        self.serial_port = None
+        self.extra_ports = {}
 
     def update_ui_connected_state(self):
         self.status_label.setText("状态: 已连接")
@@ -604,15 +808,18 @@ class SerialPage(QWidget):
         self.stopbit_combo.setEnabled(False)
         self.parity_combo.setEnabled(False)
         self.refresh_btn.setEnabled(False)
+        self.extra_ports_list.setEnabled(False)
+        if self.extra_ports:
+            self.com_label.setText(f"当前设备: {self.port_combo.currentData()} 等 {1 + len(self.extra_ports)} 台")
 
     def close_serial(self):
         if self.serial_port and self.serial_port.is_open:
             self.stop_worker()
-            try:
-                self.serial_port.close()
-            except Exception:
-                pass
+        self._close_ports()
         self.reset_connection_state()
+        if self.port_combo.currentData():
+            self.com_label.setText(f"当前设备: {self.port_combo.currentData()}")
+        self.extra_ports_list.setEnabled(True)
         self.port_combo.setEnabled(True)
         self.baudrate_combo.setEnabled(True)
         self.databit_combo.setEnabled(True)
@@ -621,11 +828,20 @@ class SerialPage(QWidget):
         self.refresh_btn.setEnabled(True)
 
     def start_worker(self):
+        device_id = port_tag(self.serial_port.port)
+        self._run_worker(SerialWorker(self.serial_port, self.cfg, is_bluetooth=self._is_bluetooth,
+                                      device_id=device_id, extra_ports=self.extra_ports))
+        if self.capture_check.isChecked():
+            self._start_capture()
+
+    def _run_worker(self, worker: SerialWorker):
         self.worker_thread = QThread()
-        self.worker = SerialWorker(self.serial_port, is_bluetooth=self._is_bluetooth)
+        self.worker = worker
+        self._sync_worker_options()
         self.worker.moveToThread(self.worker_thread)
-        self.worker.data_received.connect(self.handle_data)
+        self.worker.batches_ready.connect(self.handle_results)
         self.worker.error_occurred.connect(self.handle_worker_error)
+        self.worker.device_lost.connect(self.handle_device_lost)
         self.worker_thread.started.connect(self.worker.start)
         self.worker_thread.start()
 
@@ -634,159 +850,176 @@ class SerialPage(QWidget):
             self.worker.stop()
             self.worker_thread.quit()
             self.worker_thread.wait()
+            self.handle_results()
             self.worker_thread = None
             self.worker = None
+        self._stop_capture()
 
-    # --- 【关键修改】处理数据入口 ---
-    def handle_data(self, data: bytes):
-        try:
-            # 1. 显示部分
-            display_text = ""
-
-            if self.timestamp_check.isChecked():
-                display_text += f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] "
-
-            # 如果开启了二进制协议，建议强制/自动按 Hex 显示，方便调试
-            if self.hex_receive_check.isChecked() or self.binary_mode_check.isChecked():
-                hex_str = ' '.join(f'{b:02X}' for b in data)
-                display_text += hex_str
-            else:
-                raw_text = data.decode(errors='replace')
-                display_text += raw_text
-
-            self.receive_text.appendPlainText(display_text)
-
-            if self.auto_scroll_check.isChecked():
-                self.receive_text.moveCursor(QTextCursor.End)
-
-            # 2. 解析部分 (分流)
-            if self.binary_mode_check.isChecked():
-                # --- 二进制路径 ---
-                self.binary_buffer.extend(data)
-                self.process_binary_buffer()
-            else:
-                # --- JSON 路径 ---
-                # 只有未开启 Hex显示 时才尝试解析字符串 (避免把 Hex 字符串当 JSON 解)
-                if not self.hex_receive_check.isChecked():
-                    self.json_buffer += data.decode(errors='ignore')
-                    self.process_json_buffer()
+    # ---------- 原始字节录制 ----------
+    def _on_capture_toggled(self, checked: bool):
+        if not self.is_connected or self.worker is None:
+            return
+        if checked:
+            self._start_capture()
+        else:
+            self._stop_capture()
 
+    def _start_capture(self):
+        """每台设备录到各自的 .cgmraw 文件（多设备时文件名带设备 ID）"""
+        if self.captures or self.worker is None:
+            return
+        try:
+            os.makedirs(self.cfg.save.save_path, exist_ok=True)
+            now = datetime.now().strftime("%Y%m%d_%H%M%S")
+            multi = len(self.worker.ports) > 1
+            for dev, port in self.worker.ports.items():
+                name = f"raw_{dev}_{now}.cgmraw" if multi else f"raw_{now}.cgmraw"
+                meta = {
+                    "port": port.port,
+                    "device_id": dev,
+                    "baudrate": int(self.baudrate_combo.currentText()),
+                    "binary_mode": self.binary_mode_check.isChecked(),
+                    "config": self.cfg.to_dict(),
+                }
+                self.captures[dev] = RawCaptureWriter(os.path.join(self.cfg.save.save_path, name), meta)
         except Exception as e:
-            print(f"数据处理错误: {repr(e)}")
+            QMessageBox.warning(self, "录制错误", f"无法创建录制文件：{repr(e)}")
+            for capture in self.captures.values():
+                capture.close()
+            self.captures = {}
+            self.capture_check.setChecked(False)
+            return
+        # 在工作线程里直接写（不经过 GUI 事件循环，录到的就是串口读到的原样分块）
+        self.worker.data_received.connect(self._capture_chunk, Qt.DirectConnection)
+        for capture in self.captures.values():
+            self.device_info.append(f"原始数据录制到：{capture.path}")
+
+    def _capture_chunk(self, device_id: str, data: bytes):
+        capture = self.captures.get(device_id)
+        if capture is not None:
+            capture.write(data)
+
+    def _stop_capture(self):
+        if not self.captures:
+            return
+        if self.worker is not None:
+            self.worker.data_received.disconnect(self._capture_chunk)
+        captures, self.captures = self.captures, {}
+        for dev, capture in captures.items():
+            capture.close()
+            self.device_info.append(f"录制结束 {dev}：{capture.chunks} 块 / {capture.bytes} 字节")
+
+    # ---------- 离线回放 ----------
+    def toggle_replay(self):
+        if isinstance(self.worker, ReplayWorker):
+            self.stop_replay()
+            return
+        if self.is_connected:
+            QMessageBox.warning(self, "提示", "请先关闭串口再回放")
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "选择原始数据录制文件", self.cfg.save.save_path,
+            "Raw Capture (*.cgmraw);;All Files (*)"
+        )
+        if path:
+            self.start_replay(path, self.replay_speed_combo.currentData())
 
-    # --- 【新增】二进制解析逻辑 ---
-    def process_binary_buffer(self):
-        """
-        解析 C 结构体：
-        Head(1) + Time(4) + Uric(2) + Ascorbic(2) + Glucose(2) + Code12(2) + Checksum(1) + Tail(1)
-        Total = 15 Bytes
-        """
-        FRAME_LEN = 15
-        HEAD = 0xA5
-        TAIL = 0x5A
-
-        while len(self.binary_buffer) >= FRAME_LEN:
-            # 1. 检查帧头
-            if self.binary_buffer[0] != HEAD:
-                self.binary_buffer.pop(0)
-                continue
+    def start_replay(self, path: str, speed: float = 1.0):
+        try:
+            worker = ReplayWorker(path, self.cfg, speed=speed)
+        except Exception as e:
+            QMessageBox.warning(self, "回放错误", f"无法读取录制文件：{repr(e)}")
+            return
+        if "binary_mode" in worker.reader.meta:
+            self.binary_mode_check.setChecked(bool(worker.reader.meta["binary_mode"]))
+        worker.replay_finished.connect(self.stop_replay)
+        self._run_worker(worker)
+
+        self.status_label.setText("状态: 回放中")
+        self.status_label.setStyleSheet("color: blue; font-weight: bold;")
+        self.com_label.setText(f"回放: {os.path.basename(path)}")
+        self.replay_btn.setText("停止回放")
+        self.connect_btn.setEnabled(False)
+        self.capture_check.setEnabled(False)
+
+    def stop_replay(self):
+        worker = self.worker
+        if not isinstance(worker, ReplayWorker):
+            return
+        self.stop_worker()
+        rate = worker.bytes_replayed / worker.elapsed / 1024 if worker.elapsed else 0.0
+        self.device_info.append(
+            f"回放结束：{worker.chunks_replayed} 块 / {worker.bytes_replayed} 字节，"
+            f"用时 {worker.elapsed:.2f} s（{rate:.0f} KiB/s）"
+        )
+        self.reset_connection_state()
+        self.com_label.setText("当前设备: 无")
+        self.replay_btn.setText("回放录制...")
+        self.connect_btn.setEnabled(self.port_combo.currentData() is not None)
+        self.capture_check.setEnabled(True)
 
-            # 2. 检查帧尾
-            if self.binary_buffer[FRAME_LEN - 1] != TAIL:
-                # 可能是假头，丢弃头部继续找
-                self.binary_buffer.pop(0)
-                continue
+    def apply_config(self, cfg: AppConfig):
+        self.cfg = cfg
+        self.receive_text.setMaximumBlockCount(max(1, int(cfg.ui.console_max_lines)))
+        if self.worker:
+            self.worker.apply_config(cfg)
 
-            # 3. 提取候选帧
-            frame_bytes = self.binary_buffer[:FRAME_LEN]
+    def reset_filters(self):
+        """数据监测页改了滤波参数 / 清空了数据：各设备的滤波状态在工作线程里按当前配置重建"""
+        if self.worker:
+            self.worker.reset_filters()
 
-            # 4. 校验和 (Payload 累加)
-            # Payload 范围：索引 1 到 12 (不含 13)
-            # sum(frame_bytes[1:13])
-            payload = frame_bytes[1:13]
-            calc_sum = sum(payload) & 0xFF
-            recv_sum = frame_bytes[13]
+    def _sync_worker_options(self, *args):
+        if not self.worker:
+            return
+        self.worker.binary_mode = self.binary_mode_check.isChecked()
+        self.worker.hex_display = self.hex_receive_check.isChecked()
+        self.worker.show_timestamp = self.timestamp_check.isChecked()
+        self.worker.console_paused = self.pause_display_check.isChecked()
+        self.worker.console_every_n = self.display_every_spin.value()
+
+    # --- 【关键修改】处理数据入口：只接收工作线程解析好的结果 ---
+    def handle_results(self):
+        worker = self.worker
+        if worker is None:
+            return
+        depth = worker.queue_depth()
+        results = worker.take_results()
+        self.m_queue.set(depth)
+        self.queue_label.setText(f"队列: {depth} (峰值 {worker.max_queue_depth})")
+        if not results:
+            return
 
-            if calc_sum == recv_sum:
-                # === 校验通过，解析数据 ===
-                try:
-                    # < = Little Endian
-                    # I = uint32 (Time)
-                    # H = uint16 (Uric, Asc, Glu, Code12)
-                    ms, uric, ascorbic, glucose, code12 = struct.unpack('<IHHHH', payload)
-
-                    # 转换电压 (Code12 -> Voltage)
-                    # 假设参考电压 3.3V, 12bit ADC (4095)
-                    voltage_v = (code12 / 4095.0) * 3.3
-
-                    # 构造标准字典
-                    data_dict = {
-                        "t": ms / 1000.0,  # 毫秒转秒
-                        "voltage": voltage_v,
-                        "uric": uric,
-                        "ascorbic": ascorbic,
-                        "glucose": glucose,
-                        "receive_time": datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                    }
-
-                    # 发送给 DataMonitorPage
-                    self.data_received.emit(data_dict)
-
-                except Exception as e:
-                    print(f"Binary Unpack Error: {e}")
-
-                # 消费掉这帧数据
-                del self.binary_buffer[:FRAME_LEN]
-            else:
-                # 校验失败
-                print(f"Checksum Fail: Calc={calc_sum:02X}, Recv={recv_sum:02X}")
-                self.binary_buffer.pop(0)
-
-    # --- JSON 解析逻辑 (保持不变) ---
-    def process_json_buffer(self):
-        buf = self.json_buffer
-        if not buf: return
-        objs = []
-        start = None
-        depth = 0
-        in_str = False
-        esc = False
-        for i, ch in enumerate(buf):
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == "\\":
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-                continue
-            if ch == '"': in_str = True; continue
-            if ch == "{":
-                if depth == 0: start = i
-                depth += 1
-            elif ch == "}":
-                if depth > 0:
-                    depth -= 1
-                    if depth == 0 and start is not None:
-                        objs.append((start, i))
-        last_consumed = -1
-        for s, e in objs:
-            json_str = buf[s:e + 1]
-            last_consumed = e
-            try:
-                d = json.loads(json_str)
-                d["receive_time"] = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                self.data_received.emit(d)
-            except json.JSONDecodeError:
-                continue
-        if last_consumed >= 0:
-            self.json_buffer = buf[last_consumed + 1:]
-        else:
-            idx = buf.rfind("{")
-            self.json_buffer = buf[idx:] if idx >= 0 else ""
+        # 一次最多追加 maximumBlockCount 段：再多也会被文档上限立即丢掉
+        texts = [r.text for r in results if r.text][-self.receive_text.maximumBlockCount():]
+        if texts and not self.pause_display_check.isChecked():
+            with self.m_console.time():
+                self.receive_text.appendPlainText("\n".join(texts))
+                if self.auto_scroll_check.isChecked():
+                    self.receive_text.moveCursor(QTextCursor.End)
+
+        # 按设备合并后交给数据监测页（同一设备的批次保持到达顺序）
+        per_device = {}
+        for r in results:
+            for dev, batch in r.batches.items():
+                per_device.setdefault(dev, []).append(batch)
+        for dev, parts in per_device.items():
+            batch = FrameBatch.concat(parts)
+            if len(batch):
+                self.data_received.emit(dev, batch)
 
     # ... (handle_worker_error, send_data, send_shortcut, reset_connection_state 保持不变) ...
 
+    def handle_device_lost(self, device_id: str, error_msg: str):
+        """多设备时某个串口出错：工作线程已不再读它，这里关闭串口，其余设备继续"""
+        port = self.extra_ports.pop(device_id, None)
+        if port is not None:
+            try:
+                port.close()
+            except Exception:
+                pass
+        self.device_info.append(f"设备 {device_id} 已断开，停止采集该设备：{error_msg}")
+
     def handle_worker_error(self, error_msg):
         QMessageBox.warning(self, "接收错误", f"数据接收失败: {error_msg}")
         self.close_serial()
@@ -830,51 +1063,67 @@ class SerialPage(QWidget):
 # =========================
 
 class DataMonitorPage(QWidget):
-    class KalmanFilter:
-        def __init__(self, Q=0.01, R=0.1):
-            self.Q = float(Q)
-            self.R = float(R)
-            self.x = None
-            self.P = 0.1
-
-        def update(self, z):
-            z = float(z)
-            if self.x is None:
-                self.x = z
-                return self.x
-            P_pred = self.P + self.Q
-            K = P_pred / (P_pred + self.R)
-            self.x = self.x + K * (z - self.x)
-            self.P = (1 - K) * P_pred
-            return float(self.x)
-
-        def reset(self):
-            self.x = None
-            self.P = 0.1
+    # 滤波参数改变 / 清空数据：滤波在采集线程里（见 acquisition.py），由 MainWindow 转给 SerialPage 重建
+    filters_changed = Signal()
+    # 循环伏安每一圈的颜色（按圈号循环使用）
+    CV_CYCLE_COLORS = (
+        QColor(255, 0, 0),      # 红
+        QColor(0, 0, 255),      # 蓝
+        QColor(0, 128, 0),      # 绿
+        QColor(255, 165, 0),    # 橙
+        QColor(128, 0, 128),    # 紫
+        QColor(0, 139, 139),    # 青
+    )
 
     def __init__(self, cfg: AppConfig):
         super().__init__()
         self.cfg = cfg
 
-        self._pending_data = []
+        # 待处理的批次（按到达顺序）；每拍处理多少帧、是否重绘由 scheduler 决定
+        self._pending_data = deque()
+        self._pending_frames = 0
+        self._redraw_pending = False
+        self.scheduler = FlushScheduler(self.cfg.ui.ui_update_interval_ms, max_fps=self._chart_fps())
         self._ui_update_timer = QTimer(self)
         self._ui_update_timer.timeout.connect(self._flush_pending_data)
         self._ui_update_timer.start(int(self.cfg.ui.ui_update_interval_ms))
 
+        # 时间曲线保留整个会话的历史，只按屏幕宽度抽稀后绘制；max_time_data 为“跟随最新”时的窗口长度
         self.max_time_data = 300
-        self.glucose_time_data = []
-        self.voltage_uric_data = []
-        self.voltage_ascorbic_data = []
-        self.voltage_glucose_data = []
-
-        self.filter_buffers = {"uric": [], "ascorbic": [], "glucose": [], "voltage": []}
-        self.kalman_filters = {}
-        if self.cfg.filt.filter_type == FilterType.KALMAN:
-            self._init_kalman_filters()
-
-        self.auto_save_timer = QTimer(self)
-        self.auto_save_timer.timeout.connect(self.auto_save_data)
-        self.cached_data = []
+        self.max_volt_data = 2000
+        self.glucose_time_data = LodSeries()
+        self._setting_time_range = False
+        self.voltage_uric_data = RingSeries(self.max_volt_data)
+        self.voltage_ascorbic_data = RingSeries(self.max_volt_data)
+        # 电压-葡萄糖按扫描方向增量切圈：已结束的圈冻结成独立曲线，最多显示 max_cv_cycles 圈
+        self.max_cv_cycles = 6
+        self.cv_segmenter = CvCycleSegmenter(dv_threshold=0.002, min_points=10, max_points=self.max_volt_data)
+        self._cv_closed = deque(maxlen=self.max_cv_cycles)     # 已结束、还没画到图上的圈
+        self._cv_frozen = deque()                               # 图上已冻结的圈：(CvCycle, QLineSeries)
+
+        # 收到的数据都已按设备解码、换算、滤波；每台设备写各自的会话文件，图表和表格只显示选中的一台
+        self.display_device = None
+
+        # 热路径指标（见 perf_metrics.py）：待显示帧数、每次刷新耗时、各图表更新耗时、CSV 写入耗时
+        self.m_pending = METRICS.gauge("ui.pending_frames")
+        self.m_flush = METRICS.timer("ui.flush")
+        self.m_flush_frames = METRICS.gauge("ui.flush_frames")
+        self.m_redraws = METRICS.counter("ui.redraws")
+        self.m_redraws_deferred = METRICS.counter("ui.redraws_deferred")
+        self.m_overloaded = METRICS.counter("ui.overloaded_ticks")
+        self.m_chart = [METRICS.timer(f"chart.{name}")
+                        for name in ("time_glucose", "volt_uric", "volt_ascorbic", "volt_glucose")]
+        self.m_csv = METRICS.timer("save.csv")
+        self.m_csv_rows = METRICS.counter("save.csv_rows")
+        self.peak_trackers = {k: PeakTracker() for k in FILTER_CHANNELS}
+        self.last_sweep_peaks = {}
+        self._reset_filters()
+
+        # 自动保存由后台写盘线程完成（见 recorder.py），GUI 只定时读取它的统计
+        self.recorders = {}             # 设备 ID -> SessionRecorder：该设备首批数据到达时创建，停止自动保存 / 清空数据时关闭
+        self._unfinished = []           # 关闭时写盘线程超时、还在写的 SessionRecorder（退出前再等）
+        self.save_status_timer = QTimer(self)
+        self.save_status_timer.timeout.connect(self._update_save_status)
         self.csv_header = ["时间(秒)", "尿酸(uA)", "抗坏血酸(uA)", "葡萄糖（mA）", "电压(V)", "接收时间"]
 
         self.init_ui()
@@ -883,11 +1132,12 @@ class DataMonitorPage(QWidget):
     def apply_config(self, cfg: AppConfig):
         self.cfg = cfg
         self._ui_update_timer.setInterval(int(self.cfg.ui.ui_update_interval_ms))
+        self.scheduler.configure(self.cfg.ui.ui_update_interval_ms, self._chart_fps())
 
         self.max_rows_spin.blockSignals(True)
         self.max_rows_spin.setValue(int(self.cfg.ui.max_table_rows))
         self.max_rows_spin.blockSignals(False)
-        self._trim_table_rows()
+        self.table_model.set_max_rows(self.cfg.ui.max_table_rows)
 
         self.filter_type_combo.blockSignals(True)
         self.filter_type_combo.setCurrentText(self.cfg.filt.filter_type.value)
@@ -897,6 +1147,14 @@ class DataMonitorPage(QWidget):
         self.window_size_spin.setValue(int(self.cfg.filt.window_size))
         self.window_size_spin.blockSignals(False)
 
+        self.savgol_order_spin.blockSignals(True)
+        self.savgol_order_spin.setValue(int(self.cfg.filt.savgol_order))
+        self.savgol_order_spin.blockSignals(False)
+
+        self.peak_prominence_edit.blockSignals(True)
+        self.peak_prominence_edit.setText(str(self.cfg.filt.peak_prominence))
+        self.peak_prominence_edit.blockSignals(False)
+
         self.kalman_Q_edit.blockSignals(True)
         self.kalman_Q_edit.setText(str(self.cfg.filt.kalman_Q))
         self.kalman_Q_edit.blockSignals(False)
@@ -907,22 +1165,22 @@ class DataMonitorPage(QWidget):
 
         is_kalman = self.cfg.filt.filter_type == FilterType.KALMAN
         self.window_size_spin.setEnabled(not is_kalman)
+        self.savgol_order_spin.setEnabled(self.cfg.filt.filter_type == FilterType.SAVGOL)
         self.kalman_param_group.setVisible(is_kalman)
         self._update_filter_status()
-
-        for k in self.filter_buffers:
-            self.filter_buffers[k].clear()
-        self.kalman_filters.clear()
-        if is_kalman:
-            self._init_kalman_filters()
+        self._reset_filters()
 
         if self.cfg.save.auto_save:
-            self.auto_save_timer.stop()
-            self.auto_save_timer.start(int(self.cfg.save.save_interval_ms))
+            for recorder in self.recorders.values():
+                recorder.flush_interval = max(0.001, self.cfg.save.save_interval_ms / 1000.0)
+                recorder.flush_rows = max(1, int(self.cfg.save.flush_rows))
+                recorder.durability = self.cfg.save.durability
+            self.save_status_timer.start(500)
             self.save_status_label.setText(f"保存状态：自动保存已启用（间隔{self.cfg.save.save_interval_ms}ms）")
             self.save_status_label.setStyleSheet("color: green;")
         else:
-            self.auto_save_timer.stop()
+            self.save_status_timer.stop()
+            self.close_session()
             self.save_status_label.setText("保存状态：未启用自动保存")
             self.save_status_label.setStyleSheet("color: #666;")
 
@@ -941,8 +1199,16 @@ class DataMonitorPage(QWidget):
         self.save_status_label = QLabel("保存状态：未启用自动保存")
         self.save_status_label.setStyleSheet("color: #666;")
 
+        # 多台设备同时采集时选择图表 / 表格显示哪一台（其余设备照常保存）
+        self.device_combo = QComboBox()
+        self.device_combo.setMinimumWidth(120)
+        self.device_combo.setToolTip("图表和表格显示的设备；所有设备都写入各自的会话文件")
+        self.device_combo.currentIndexChanged.connect(self._on_display_device_changed)
+
         save_ctrl_layout.addWidget(self.manual_save_btn)
         save_ctrl_layout.addWidget(self.clear_data_btn)
+        save_ctrl_layout.addWidget(QLabel("显示设备:"))
+        save_ctrl_layout.addWidget(self.device_combo)
         save_ctrl_layout.addStretch()
         save_ctrl_layout.addWidget(self.save_status_label)
         main_layout.addLayout(save_ctrl_layout)
@@ -975,6 +1241,19 @@ class DataMonitorPage(QWidget):
         self.window_size_spin.setValue(int(self.cfg.filt.window_size))
         self.window_size_spin.valueChanged.connect(self.update_filter_config)
         base_filter_layout.addWidget(self.window_size_spin)
+
+        base_filter_layout.addWidget(QLabel("S-G阶数:"))
+        self.savgol_order_spin = QSpinBox()
+        self.savgol_order_spin.setRange(1, 4)
+        self.savgol_order_spin.setValue(int(self.cfg.filt.savgol_order))
+        self.savgol_order_spin.valueChanged.connect(self.update_filter_config)
+        base_filter_layout.addWidget(self.savgol_order_spin)
+
+        base_filter_layout.addWidget(QLabel("判峰突出度:"))
+        self.peak_prominence_edit = QLineEdit(str(self.cfg.filt.peak_prominence))
+        self.peak_prominence_edit.setMaximumWidth(80)
+        self.peak_prominence_edit.textChanged.connect(self.update_peak_params)
+        base_filter_layout.addWidget(self.peak_prominence_edit)
         base_filter_layout.addStretch()
         filter_ctrl_layout.addLayout(base_filter_layout)
 
@@ -996,6 +1275,10 @@ class DataMonitorPage(QWidget):
 
         self.filter_status_label = QLabel("")
         filter_ctrl_layout.addWidget(self.filter_status_label)
+
+        # 每个扫描段结束后显示各通道的峰电位 / 峰电流
+        self.peak_label = QLabel("峰值：等待完整扫描段")
+        filter_ctrl_layout.addWidget(self.peak_label)
         main_layout.addLayout(filter_ctrl_layout)
 
         chart_switch_layout = QHBoxLayout()
@@ -1015,26 +1298,39 @@ class DataMonitorPage(QWidget):
         chart_switch_layout.addWidget(self.volt_ascorbic_btn)
         chart_switch_layout.addWidget(self.voltage_glucose_btn)
         chart_switch_layout.addWidget(self.clear_chart_btn)
+
+        # 时间曲线：勾选时显示最近 max_time_data 秒；在图上横向框选可放大查看任意历史段
+        self.time_follow_check = QCheckBox("跟随最新")
+        self.time_follow_check.setChecked(True)
+        self.time_follow_check.toggled.connect(lambda _: self._redraw_chart(0))
+        chart_switch_layout.addWidget(self.time_follow_check)
         main_layout.addLayout(chart_switch_layout)
 
         data_group = QGroupBox("实时数据（滤波后）")
         data_layout = QVBoxLayout(data_group)
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(6)
-        self.data_table.setHorizontalHeaderLabels(self.csv_header)
+        self.table_model = FrameTableModel(self.csv_header, int(self.cfg.ui.max_table_rows), self)
+        self.data_table = QTableView()
+        self.data_table.setModel(self.table_model)
         self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.data_table.verticalHeader().setVisible(False)
-        self.data_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # 固定行高：视图不必逐行测量内容
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.setEditTriggers(QTableView.NoEditTriggers)
         data_layout.addWidget(self.data_table)
         main_layout.addWidget(data_group, 1)
 
+        # 四个图表页先放空白页，第一次显示某页时才创建图表（QtCharts 也在那时才加载），见 _ensure_chart
         self.chart_stack = QStackedWidget()
+        for _ in range(4):
+            page = QWidget()
+            QVBoxLayout(page)
+            self.chart_stack.addWidget(page)
         main_layout.addWidget(self.chart_stack, 4)
-
-        self.init_time_glucose_chart()
-        self.init_volt_uric_chart()
-        self.init_volt_ascorbic_chart()
-        self.init_volt_glucose_chart()
+        self._chart_built = [False] * 4
+        self._chart_builders = (self.init_time_glucose_chart, self.init_volt_uric_chart,
+                                self.init_volt_ascorbic_chart, self.init_volt_glucose_chart)
+        self._chart_updaters = (self.update_time_glucose_chart, self.update_volt_uric_chart,
+                                self.update_volt_ascorbic_chart, self.update_volt_glucose_chart)
 
         self.time_chart_btn.clicked.connect(lambda: self.switch_chart(0))
         self.volt_uric_btn.clicked.connect(lambda: self.switch_chart(1))
@@ -1044,13 +1340,44 @@ class DataMonitorPage(QWidget):
 
         self.apply_config(self.cfg)
 
-    def _init_kalman_filters(self):
-        self.kalman_filters = {
-            "uric": self.KalmanFilter(Q=self.cfg.filt.kalman_Q, R=self.cfg.filt.kalman_R),
-            "ascorbic": self.KalmanFilter(Q=self.cfg.filt.kalman_Q, R=self.cfg.filt.kalman_R),
-            "glucose": self.KalmanFilter(Q=self.cfg.filt.kalman_Q, R=self.cfg.filt.kalman_R),
-            "voltage": self.KalmanFilter(Q=self.cfg.filt.kalman_Q, R=self.cfg.filt.kalman_R),
-        }
+    def _reset_filters(self):
+        """按当前配置重建滤波状态：判峰状态在本页直接清空，各设备的滤波窗口 / 卡尔曼估计通知采集线程重建"""
+        for tracker in self.peak_trackers.values():
+            tracker.prominence = float(self.cfg.filt.peak_prominence)
+            tracker.reset()
+        self.filters_changed.emit()
+
+    def update_peak_params(self, *args):
+        try:
+            prominence = float(self.peak_prominence_edit.text().strip())
+        except ValueError:
+            return
+        if prominence <= 0:
+            return
+        self.cfg.filt.peak_prominence = prominence
+        for tracker in self.peak_trackers.values():
+            tracker.prominence = prominence
+
+    def _update_peaks(self, voltage: np.ndarray, filtered_cols: np.ndarray):
+        """滤波后的数据送入判峰器（每个新样本只检查一次），有扫描段结束时刷新显示"""
+        changed = False
+        for col, key in enumerate(FILTER_CHANNELS):
+            finished = self.peak_trackers[key].feed(voltage, filtered_cols[:, col])
+            if finished:
+                self.last_sweep_peaks[key] = finished[-1]
+                changed = True
+        if not changed:
+            return
+        names = {"uric": "尿酸", "ascorbic": "抗坏血酸", "glucose": "葡萄糖"}
+        parts = []
+        for key in FILTER_CHANNELS:
+            sweep = self.last_sweep_peaks.get(key)
+            if sweep is None:
+                continue
+            direction = "正扫" if sweep.direction > 0 else "负扫"
+            peaks = ", ".join(f"{v:.3f}V/{i:.4g}" for v, i in sweep.peaks) or "无峰"
+            parts.append(f"{names[key]}[{direction}#{sweep.index}] {peaks}")
+        self.peak_label.setText("峰值：" + "；".join(parts))
 
     def update_kalman_params(self, *args):
         if self.cfg.filt.filter_type != FilterType.KALMAN:
@@ -1062,7 +1389,7 @@ class DataMonitorPage(QWidget):
                 return
             self.cfg.filt.kalman_Q = q
             self.cfg.filt.kalman_R = r
-            self._init_kalman_filters()
+            self._reset_filters()
             self._update_filter_status()
         except Exception:
             pass
@@ -1070,137 +1397,136 @@ class DataMonitorPage(QWidget):
     def update_filter_config(self, *args):
         self.cfg.filt.filter_type = _safe_filter_type(self.filter_type_combo.currentText(), default=FilterType.MOVING_AVG)
         self.cfg.filt.window_size = int(self.window_size_spin.value())
+        self.cfg.filt.savgol_order = int(self.savgol_order_spin.value())
 
         is_kalman = self.cfg.filt.filter_type == FilterType.KALMAN
         self.window_size_spin.setEnabled(not is_kalman)
+        self.savgol_order_spin.setEnabled(self.cfg.filt.filter_type == FilterType.SAVGOL)
         self.kalman_param_group.setVisible(is_kalman)
 
-        for k in self.filter_buffers:
-            self.filter_buffers[k].clear()
-        self.kalman_filters.clear()
-        if is_kalman:
-            self._init_kalman_filters()
-
+        self._reset_filters()
         self._update_filter_status()
 
     def _update_filter_status(self):
         if self.cfg.filt.filter_type == FilterType.KALMAN:
             self.filter_status_label.setText(f"当前：卡尔曼滤波（Q={self.cfg.filt.kalman_Q:.4f}, R={self.cfg.filt.kalman_R:.4f}）")
+        elif self.cfg.filt.filter_type == FilterType.SAVGOL:
+            self.filter_status_label.setText(f"当前：S-G平滑（窗口{self.cfg.filt.window_size}，{self.cfg.filt.savgol_order}阶，因果）")
         else:
             self.filter_status_label.setText(f"当前：{self.cfg.filt.filter_type.value}（窗口{self.cfg.filt.window_size}）")
 
-    def _apply_filter(self, key: str, raw_value: float) -> float:
-        ft = self.cfg.filt.filter_type
-
-        if ft == FilterType.KALMAN:
-            if key not in self.kalman_filters:
-                self._init_kalman_filters()
-            return self.kalman_filters[key].update(raw_value)
-
-        buf = self.filter_buffers[key]
-        buf.append(float(raw_value))
-        max_buf = int(self.cfg.filt.window_size) * 2
-        if len(buf) > max_buf:
-            del buf[:len(buf) - max_buf]
-
-        if ft == FilterType.NONE:
-            return float(raw_value)
+    def _chart_fps(self) -> float:
+        """图表重绘上限：配置的 max_chart_fps 与屏幕刷新率取小"""
+        fps = float(self.cfg.ui.max_chart_fps)
+        screen = QApplication.primaryScreen()
+        if screen is not None and screen.refreshRate() > 0:
+            fps = min(fps, screen.refreshRate())
+        return fps
 
-        w = min(int(self.cfg.filt.window_size), len(buf))
-        if w <= 0:
-            return float(raw_value)
-
-        if ft == FilterType.MOVING_AVG:
-            return sum(buf[-w:]) / w
-
-        if ft == FilterType.MEDIAN:
-            s = sorted(buf[-w:])
-            return s[len(s) // 2]
-
-        return float(raw_value)
-
-    def update_data(self, data: dict):
-        self._pending_data.append(data)
+    def update_data(self, device_id: str, batch: FrameBatch):
+        # 写盘只是入队，每台设备收到就交给各自的写盘线程；只有显示中的设备进入刷新队列
+        if self.cfg.save.auto_save:
+            self._record(device_id, batch)
+        if self.display_device is None:
+            self.display_device = device_id
+        if self.device_combo.findData(device_id) < 0:
+            self.device_combo.blockSignals(True)
+            self.device_combo.addItem(device_id or "默认", device_id)
+            self.device_combo.setCurrentIndex(self.device_combo.findData(self.display_device))
+            self.device_combo.blockSignals(False)
+        if device_id != self.display_device:
+            return
+        self._pending_data.append(batch)
+        self._pending_frames += len(batch)
+        self.scheduler.note_arrival(len(batch), time.perf_counter())
+        self.m_pending.set(self._pending_frames)
+
+    def _take_pending(self, n: int) -> FrameBatch:
+        """从队头取 n 帧（只拆开最后一个批次，其余批次原样取走）"""
+        parts = []
+        while n > 0 and self._pending_data:
+            head = self._pending_data[0]
+            if len(head) <= n:
+                parts.append(self._pending_data.popleft())
+                n -= len(head)
+            else:
+                parts.append(head[:n])
+                self._pending_data[0] = head[n:]
+                n = 0
+        batch = FrameBatch.concat(parts)
+        self._pending_frames -= len(batch)
+        return batch
 
     def _flush_pending_data(self):
-        if not self._pending_data:
+        if not self._pending_frames and not self._redraw_pending:
             return
 
-        MAX_PER_TICK = 50
-        batch = self._pending_data[:MAX_PER_TICK]
-        self._pending_data = self._pending_data[MAX_PER_TICK:]
-
-        for d in batch:
-            self._process_single_data(d)
-
-        idx = self.chart_stack.currentIndex()
-        if idx == 0:
-            self.update_time_glucose_chart()
-        elif idx == 1:
-            self.update_volt_uric_chart()
-        elif idx == 2:
-            self.update_volt_ascorbic_chart()
-        elif idx == 3:
-            self.update_volt_glucose_chart()
-
-        if self.data_table.rowCount() > 0:
-            self.data_table.scrollToBottom()
-
-    def _process_single_data(self, data: dict):
-        frame = parse_frame(data, self.cfg)
-        seconds, voltage, uric_uA, ascorbic_uA, glucose_mA = frame_to_engineering(frame, self.cfg)
-        receive_time = data.get("receive_time", "")
-
-        uric_f = self._apply_filter("uric", uric_uA)
-        ascorbic_f = self._apply_filter("ascorbic", ascorbic_uA)
-        glucose_f = self._apply_filter("glucose", glucose_mA)
-        voltage_f = voltage
-
-        row = self.data_table.rowCount()
-        self.data_table.insertRow(row)
-        data_row = [
-            round(seconds, 4),
-            round(uric_f, 4),
-            round(ascorbic_f, 4),
-            round(glucose_f, 4),
-            round(voltage_f, 4),
-            receive_time
-        ]
-        for col, val in enumerate(data_row):
-            self.data_table.setItem(row, col, QTableWidgetItem(str(val)))
-
-        self._trim_table_rows()
-
-        if self.cfg.save.auto_save:
-            self.cached_data.append(data_row)
-
-        self.glucose_time_data.append((seconds, glucose_f))
-        self.voltage_uric_data.append((voltage_f, uric_f))
-        self.voltage_ascorbic_data.append((voltage_f, ascorbic_f))
-        self.voltage_glucose_data.append((voltage_f, glucose_f))
-
-        self.glucose_time_data = [(t, g) for t, g in self.glucose_time_data if t >= (seconds - self.max_time_data)]
-        max_volt_data = 2000
-        self.voltage_uric_data = self.voltage_uric_data[-max_volt_data:]
-        self.voltage_ascorbic_data = self.voltage_ascorbic_data[-max_volt_data:]
-        self.voltage_glucose_data = self.voltage_glucose_data[-max_volt_data:]
+        t0 = time.perf_counter()
+        plan = self.scheduler.plan(self._pending_frames, t0)
+        if plan.overloaded:
+            self.m_overloaded.add()
+
+        # 1. 数据：判峰、表格 / 图表缓冲（每一帧都处理，过载时也不丢）
+        if plan.frames:
+            self._process_batch(self._take_pending(plan.frames))
+            self._redraw_pending = True
+        self.m_pending.set(self._pending_frames)
+        self.m_flush_frames.set(plan.frames)
+        t1 = time.perf_counter()
+
+        # 2. 显示：重绘合并到刷新率上限，过载时降频；没轮到的这一拍只记一笔，数据已在缓冲里
+        redraw_s = None
+        if self._redraw_pending and plan.redraw:
+            self._redraw_chart(self.chart_stack.currentIndex())
+            if self.table_model.rowCount() > 0:
+                self.data_table.scrollToBottom()
+            self._redraw_pending = False
+            self.m_redraws.add()
+            redraw_s = time.perf_counter() - t1
+        elif self._redraw_pending:
+            self.m_redraws_deferred.add()
+
+        self.scheduler.done(plan.frames, t1 - t0, redraw_s, t0)
+        self.m_flush.add(time.perf_counter() - t0)
+
+    def _process_batch(self, filtered: FrameBatch):
+        """显示中设备的一批数据（采集线程已换算成工程量并滤波）-> 判峰、表格、图表缓冲"""
+        uric_f, ascorbic_f, glucose_f = filtered.uric, filtered.ascorbic, filtered.glucose
+        voltage_f = filtered.voltage
+        self._update_peaks(voltage_f, np.column_stack([getattr(filtered, k) for k in FILTER_CHANNELS]))
+
+        # 表格超过 max_table_rows 时由模型一次性移除最旧的行
+        self.table_model.append_batch(filtered)
+
+        seconds = filtered.t
+        self.glucose_time_data.extend(seconds, glucose_f)
+        self.voltage_uric_data.extend(voltage_f, uric_f)
+        self.voltage_ascorbic_data.extend(voltage_f, ascorbic_f)
+        self._cv_closed.extend(self.cv_segmenter.feed(voltage_f, glucose_f))
+
+    def _on_display_device_changed(self, index: int):
+        """换显示设备：图表、表格、判峰从新设备的下一批数据开始（数据一直在各自的会话文件里）"""
+        device_id = self.device_combo.itemData(index)
+        if index < 0 or device_id == self.display_device:
+            return
+        self.display_device = device_id
+        self.table_model.clear()
+        self.clear_charts()
+        self._pending_data.clear()
+        self._pending_frames = 0
+        self.scheduler.reset()
+        for tracker in self.peak_trackers.values():
+            tracker.reset()
+        self.last_sweep_peaks.clear()
+        self.peak_label.setText("峰值：等待完整扫描段")
 
     def _update_max_rows(self, value: int):
         self.cfg.ui.max_table_rows = int(value)
-        self._trim_table_rows()
-
-    def _trim_table_rows(self):
-        max_rows = int(self.cfg.ui.max_table_rows)
-        rc = self.data_table.rowCount()
-        if rc > max_rows:
-            extra = rc - max_rows
-            for _ in range(extra):
-                self.data_table.removeRow(0)
+        self.table_model.set_max_rows(self.cfg.ui.max_table_rows)
 
     def init_time_glucose_chart(self):
+        from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
         yname = "葡萄糖（mA）"
-        w = QWidget()
-        lay = QVBoxLayout(w)
 
         self.time_glucose_chart = QChart()
         self.time_glucose_chart.setTitle("时间-葡萄糖监测数据（滤波后）")
@@ -1224,16 +1550,17 @@ class DataMonitorPage(QWidget):
         self.time_glucose_chart.addAxis(self.time_glucose_axis_y, Qt.AlignLeft)
         self.time_glucose_series.attachAxis(self.time_glucose_axis_x)
         self.time_glucose_series.attachAxis(self.time_glucose_axis_y)
+        self.time_glucose_axis_x.rangeChanged.connect(self._on_time_range_changed)
 
         view = QChartView(self.time_glucose_chart)
         view.setRenderHint(QPainter.Antialiasing)
-        lay.addWidget(view)
-        self.chart_stack.addWidget(w)
+        # 左键横向框选放大，右键缩小
+        view.setRubberBand(QChartView.HorizontalRubberBand)
+        self.chart_stack.widget(0).layout().addWidget(view)
 
     def init_volt_uric_chart(self):
+        from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
         yname = "尿酸（uA）"
-        w = QWidget()
-        lay = QVBoxLayout(w)
 
         self.volt_uric_chart = QChart()
         self.volt_uric_chart.setTitle("电压-尿酸监测数据（滤波后）")
@@ -1260,13 +1587,11 @@ class DataMonitorPage(QWidget):
 
         view = QChartView(self.volt_uric_chart)
         view.setRenderHint(QPainter.Antialiasing)
-        lay.addWidget(view)
-        self.chart_stack.addWidget(w)
+        self.chart_stack.widget(1).layout().addWidget(view)
 
     def init_volt_ascorbic_chart(self):
+        from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
         yname = "抗坏血酸（uA）"
-        w = QWidget()
-        lay = QVBoxLayout(w)
 
         self.volt_ascorbic_chart = QChart()
         self.volt_ascorbic_chart.setTitle("电压-抗坏血酸监测数据（滤波后）")
@@ -1293,13 +1618,11 @@ class DataMonitorPage(QWidget):
 
         view = QChartView(self.volt_ascorbic_chart)
         view.setRenderHint(QPainter.Antialiasing)
-        lay.addWidget(view)
-        self.chart_stack.addWidget(w)
+        self.chart_stack.widget(2).layout().addWidget(view)
 
     def init_volt_glucose_chart(self):
+        from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
         yname = "葡萄糖（mA）"
-        w = QWidget()
-        lay = QVBoxLayout(w)
 
         self.volt_glucose_chart = QChart()
         self.volt_glucose_chart.setTitle("电压-葡萄糖循环伏安")
@@ -1317,19 +1640,37 @@ class DataMonitorPage(QWidget):
         self.volt_glucose_chart.addAxis(self.volt_glucose_axis_x, Qt.AlignBottom)
         self.volt_glucose_chart.addAxis(self.volt_glucose_axis_y, Qt.AlignLeft)
 
+        # 进行中的这一圈；结束的圈另建曲线冻结（见 update_volt_glucose_chart）
         self.volt_glucose_series = QLineSeries()
-        self.volt_glucose_series.setName(yname)
-        self.volt_glucose_series.setColor(QColor(255, 165, 0))
+        self._style_cv_series(self.volt_glucose_series, self.cv_segmenter.current_index)
         self.volt_glucose_chart.addSeries(self.volt_glucose_series)
         self.volt_glucose_series.attachAxis(self.volt_glucose_axis_x)
         self.volt_glucose_series.attachAxis(self.volt_glucose_axis_y)
 
         view = QChartView(self.volt_glucose_chart)
         view.setRenderHint(QPainter.Antialiasing)
-        lay.addWidget(view)
-        self.chart_stack.addWidget(w)
+        self.chart_stack.widget(3).layout().addWidget(view)
+
+    def _ensure_chart(self, index: int):
+        """第一次用到某个图表页时才创建它，并用缓冲里已有的数据画一次（数据缓冲一直在更新，与图表是否创建无关）"""
+        if self._chart_built[index]:
+            return
+        self._chart_built[index] = True
+        self._chart_builders[index]()
+        self._redraw_chart(index)
+
+    def _redraw_chart(self, index: int):
+        if not self._chart_built[index]:
+            return
+        with self.m_chart[index].time():
+            self._chart_updaters[index]()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._ensure_chart(self.chart_stack.currentIndex())
 
     def switch_chart(self, index):
+        self._ensure_chart(index)
         self.chart_stack.setCurrentIndex(index)
         all_btns = [self.time_chart_btn, self.volt_uric_btn, self.volt_ascorbic_btn, self.voltage_glucose_btn]
         for btn in all_btns:
@@ -1343,89 +1684,144 @@ class DataMonitorPage(QWidget):
         elif index == 3:
             self.voltage_glucose_btn.setStyleSheet("background-color: #ccc; font-weight: bold;")
 
+    @staticmethod
+    def _replace_series(series, ring: RingSeries):
+        """整条曲线一次性替换（连续视图直接交给 Qt，不逐点 append）；返回坐标范围"""
+        series.replaceNp(ring.xs(), ring.ys())
+        return ring.bounds()
+
+    @staticmethod
+    def _set_y_range(axis, min_y, max_y):
+        margin = max(1, (max_y - min_y) * 0.1)
+        axis.setRange(min_y - margin, max_y + margin)
+
     def update_time_glucose_chart(self):
-        if not self.glucose_time_data:
+        hist = self.glucose_time_data
+        if not len(hist):
             return
-        self.time_glucose_series.clear()
-        for t, g in self.glucose_time_data:
-            self.time_glucose_series.append(t, g)
+        follow = self.time_follow_check.isChecked()
+        if follow:
+            max_time = hist.last_x()
+            min_time = max(0, max_time - self.max_time_data)
+        else:
+            min_time, max_time = self.time_glucose_axis_x.min(), self.time_glucose_axis_x.max()
 
-        max_time = max(t for t, _ in self.glucose_time_data)
-        min_time = max(0, max_time - self.max_time_data)
-        self.time_glucose_axis_x.setRange(min_time, max_time)
+        # 只绘制屏幕分辨率的子集：每个像素列保留最小、最大两个点
+        width = int(self.time_glucose_chart.plotArea().width()) or 800
+        xs, ys = hist.decimate(min_time, max_time, width)
+        self.time_glucose_series.replaceNp(xs, ys)
+        if not len(ys):
+            return
 
-        max_g = max(g for _, g in self.glucose_time_data)
-        min_g = min(g for _, g in self.glucose_time_data)
-        margin = max(1, (max_g - min_g) * 0.1)
-        self.time_glucose_axis_y.setRange(min_g - margin, max_g + margin)
+        if follow:
+            self._setting_time_range = True
+            self.time_glucose_axis_x.setRange(min_time, max_time)
+            self._setting_time_range = False
+        self._set_y_range(self.time_glucose_axis_y, float(ys.min()), float(ys.max()))
 
-    def update_volt_uric_chart(self):
-        if not self.voltage_uric_data:
+    def _on_time_range_changed(self, *args):
+        """用户框选放大 / 右键缩小：停止跟随，并按新的可见范围重新抽稀"""
+        if self._setting_time_range:
             return
-        self.volt_uric_series.clear()
-        for v, u in self.voltage_uric_data:
-            self.volt_uric_series.append(v, u)
+        if self.time_follow_check.isChecked():
+            self.time_follow_check.blockSignals(True)
+            self.time_follow_check.setChecked(False)
+            self.time_follow_check.blockSignals(False)
+        self._setting_time_range = True
+        try:
+            self.update_time_glucose_chart()
+        finally:
+            self._setting_time_range = False
 
-        max_v = max(v for v, _ in self.voltage_uric_data)
-        min_v = min(v for v, _ in self.voltage_uric_data)
+    def update_volt_uric_chart(self):
+        if not len(self.voltage_uric_data):
+            return
+        min_v, max_v, min_u, max_u = self._replace_series(self.volt_uric_series, self.voltage_uric_data)
         self.volt_uric_axis_x.setRange(min_v - 0.1, max_v + 0.1)
-
-        max_u = max(u for _, u in self.voltage_uric_data)
-        min_u = min(u for _, u in self.voltage_uric_data)
-        margin = max(1, (max_u - min_u) * 0.1)
-        self.volt_uric_axis_y.setRange(min_u - margin, max_u + margin)
+        self._set_y_range(self.volt_uric_axis_y, min_u, max_u)
 
     def update_volt_ascorbic_chart(self):
-        if not self.voltage_ascorbic_data:
+        if not len(self.voltage_ascorbic_data):
             return
-        self.volt_ascorbic_series.clear()
-        for v, a in self.voltage_ascorbic_data:
-            self.volt_ascorbic_series.append(v, a)
-
-        max_v = max(v for v, _ in self.voltage_ascorbic_data)
-        min_v = min(v for v, _ in self.voltage_ascorbic_data)
+        min_v, max_v, min_a, max_a = self._replace_series(self.volt_ascorbic_series, self.voltage_ascorbic_data)
         self.volt_ascorbic_axis_x.setRange(min_v - 0.1, max_v + 0.1)
-
-        max_a = max(a for _, a in self.voltage_ascorbic_data)
-        min_a = min(a for _, a in self.voltage_ascorbic_data)
-        margin = max(1, (max_a - min_a) * 0.1)
-        self.volt_ascorbic_axis_y.setRange(min_a - margin, max_a + margin)
+        self._set_y_range(self.volt_ascorbic_axis_y, min_a, max_a)
+
+    def _style_cv_series(self, series, index: int):
+        series.setName(f"第 {index} 圈")
+        series.setColor(self.CV_CYCLE_COLORS[(index - 1) % len(self.CV_CYCLE_COLORS)])
+
+    def _freeze_cv_cycle(self, cycle):
+        """把一段已结束的圈画成独立曲线（只画这一次），超过 max_cv_cycles 时移除最旧的一圈"""
+        from PySide6.QtCharts import QLineSeries
+        series = QLineSeries()
+        self._style_cv_series(series, cycle.index)
+        series.replaceNp(cycle.x, cycle.y)
+        self.volt_glucose_chart.addSeries(series)
+        series.attachAxis(self.volt_glucose_axis_x)
+        series.attachAxis(self.volt_glucose_axis_y)
+        self._cv_frozen.append((cycle, series))
+        while len(self._cv_frozen) > self.max_cv_cycles:
+            _, old = self._cv_frozen.popleft()
+            self.volt_glucose_chart.removeSeries(old)
+            old.deleteLater()
 
     def update_volt_glucose_chart(self):
-        if not self.voltage_glucose_data:
+        seg = self.cv_segmenter
+        if self._cv_closed:
+            while self._cv_closed:
+                self._freeze_cv_cycle(self._cv_closed.popleft())
+            # 进行中的圈换了编号：重新着色，并挪到图例最后
+            live = self.volt_glucose_series
+            self.volt_glucose_chart.removeSeries(live)
+            self._style_cv_series(live, seg.current_index)
+            self.volt_glucose_chart.addSeries(live)
+            live.attachAxis(self.volt_glucose_axis_x)
+            live.attachAxis(self.volt_glucose_axis_y)
+
+        # 每次只重画进行中的这一圈，代价与已记录的圈数无关
+        self.volt_glucose_series.replaceNp(seg.current_x(), seg.current_y())
+
+        parts = [c.bounds for c, _ in self._cv_frozen]
+        if seg.current_bounds() is not None:
+            parts.append(seg.current_bounds())
+        if not parts:
             return
-        self.volt_glucose_series.clear()
-        for v, g in self.voltage_glucose_data:
-            self.volt_glucose_series.append(v, g)
-
-        max_v = max(v for v, _ in self.voltage_glucose_data)
-        min_v = min(v for v, _ in self.voltage_glucose_data)
-        self.volt_glucose_axis_x.setRange(min_v - 0.1, max_v + 0.1)
-
-        max_g = max(g for _, g in self.voltage_glucose_data)
-        min_g = min(g for _, g in self.voltage_glucose_data)
-        margin = max(1, (max_g - min_g) * 0.1)
-        self.volt_glucose_axis_y.setRange(min_g - margin, max_g + margin)
+        self.volt_glucose_axis_x.setRange(min(p[0] for p in parts) - 0.1, max(p[1] for p in parts) + 0.1)
+        self._set_y_range(self.volt_glucose_axis_y, min(p[2] for p in parts), max(p[3] for p in parts))
 
     def clear_charts(self):
         self.glucose_time_data.clear()
         self.voltage_uric_data.clear()
         self.voltage_ascorbic_data.clear()
-        self.voltage_glucose_data.clear()
-
-        self.time_glucose_series.clear()
-        self.volt_uric_series.clear()
-        self.volt_ascorbic_series.clear()
-        self.volt_glucose_series.clear()
-
-        self.time_glucose_axis_x.setRange(0, self.max_time_data)
-        self.time_glucose_axis_y.setRange(0, 2000)
-        self.volt_uric_axis_x.setRange(0, 5)
-        self.volt_uric_axis_y.setRange(0, 2000)
-        self.volt_ascorbic_axis_x.setRange(0, 5)
-        self.volt_ascorbic_axis_y.setRange(0, 2000)
-        self.volt_glucose_axis_x.setRange(0, 5)
-        self.volt_glucose_axis_y.setRange(0, 2000)
+        self.cv_segmenter.reset()
+        self._cv_closed.clear()
+        while self._cv_frozen:
+            _, series = self._cv_frozen.popleft()
+            self.volt_glucose_chart.removeSeries(series)
+            series.deleteLater()
+
+        # 还没创建的图表页创建时本来就是初始状态
+        built = self._chart_built
+        if built[0]:
+            self.time_glucose_series.clear()
+            self._setting_time_range = True
+            self.time_glucose_axis_x.setRange(0, self.max_time_data)
+            self._setting_time_range = False
+            self.time_glucose_axis_y.setRange(0, 2000)
+        if built[1]:
+            self.volt_uric_series.clear()
+            self.volt_uric_axis_x.setRange(0, 5)
+            self.volt_uric_axis_y.setRange(0, 2000)
+        if built[2]:
+            self.volt_ascorbic_series.clear()
+            self.volt_ascorbic_axis_x.setRange(0, 5)
+            self.volt_ascorbic_axis_y.setRange(0, 2000)
+        if built[3]:
+            self.volt_glucose_series.clear()
+            self._style_cv_series(self.volt_glucose_series, self.cv_segmenter.current_index)
+            self.volt_glucose_axis_x.setRange(0, 5)
+            self.volt_glucose_axis_y.setRange(0, 2000)
 
     def clear_all_data(self):
         reply = QMessageBox.question(
@@ -1437,17 +1833,17 @@ class DataMonitorPage(QWidget):
         if reply != QMessageBox.Yes:
             return
 
-        self.data_table.setRowCount(0)
+        self.table_model.clear()
         self.clear_charts()
         self._pending_data.clear()
+        self._pending_frames = 0
+        self.scheduler.reset()
 
-        for k in self.filter_buffers:
-            self.filter_buffers[k].clear()
+        self._reset_filters()
+        self.last_sweep_peaks.clear()
+        self.peak_label.setText("峰值：等待完整扫描段")
 
-        for f in self.kalman_filters.values():
-            f.reset()
-
-        self.cached_data.clear()
+        self.close_session()
         QMessageBox.information(self, "清空成功", "所有监测数据已完全清空！")
 
     def _ensure_save_path_exists(self):
@@ -1475,26 +1871,22 @@ class DataMonitorPage(QWidget):
             if not filename.endswith(".csv"):
                 filename += ".csv"
 
+        import csv
         try:
-            with open(filename, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                if os.path.getsize(filename) == 0:
-                    writer.writerow(self.csv_header)
-                writer.writerows(data_rows)
+            with self.m_csv.time():
+                with open(filename, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    if os.path.getsize(filename) == 0:
+                        writer.writerow(self.csv_header)
+                    writer.writerows(data_rows)
+            self.m_csv_rows.add(len(data_rows))
             return True
         except Exception as e:
             QMessageBox.warning(self, "保存错误", f"数据保存失败：{repr(e)}")
             return False
 
     def manual_save_data(self):
-        all_data = []
-        row_count = self.data_table.rowCount()
-        for row in range(row_count):
-            row_vals = []
-            for col in range(6):
-                item = self.data_table.item(row, col)
-                row_vals.append(item.text() if item else "")
-            all_data.append(row_vals)
+        all_data = self.table_model.row_texts()
 
         if not all_data:
             QMessageBox.warning(self, "无数据", "表格中没有可保存的数据！")
@@ -1511,13 +1903,59 @@ class DataMonitorPage(QWidget):
         if self._write_data_to_csv(all_data, filename):
             QMessageBox.information(self, "保存成功", f"数据已保存到：\n{filename}")
 
-    def auto_save_data(self):
-        if not self.cached_data:
+    def _record(self, device_id: str, batch: FrameBatch):
+        """交给该设备的写盘线程（只入队，不做文件 I/O）"""
+        recorder = self.recorders.get(device_id)
+        if recorder is None:
+            sv = self.cfg.save
+            now = datetime.now().strftime("%Y%m%d_%H%M%S")
+            name = f"session_{device_id}_{now}.cgms" if device_id else f"session_{now}.cgms"
+            recorder = SessionRecorder(
+                os.path.join(sv.save_path, name), config=dict(self.cfg.to_dict(), device={"id": device_id}),
+                flush_rows=sv.flush_rows, flush_interval_ms=sv.save_interval_ms,
+                durability=sv.durability, max_queue=sv.max_queue_batches,
+            )
+            recorder.start()
+            self.recorders[device_id] = recorder
+        recorder.submit(batch)
+
+    def _update_save_status(self):
+        if not self.recorders:
             return
-        if self._write_data_to_csv(self.cached_data):
-            self.cached_data.clear()
+        stats = [r.stats() for r in self.recorders.values()]
+        rows = sum(st["rows_written"] for st in stats)
+        text = (f"保存状态：已写入 {rows} 行，写盘 {max(st['last_write_ms'] for st in stats):.1f} ms"
+                f"（最大 {max(st['max_write_ms'] for st in stats):.1f} ms），"
+                f"队列 {sum(st['queue_depth'] for st in stats)}")
+        if len(stats) > 1:
+            text += f"，{len(stats)} 台设备"
+        dropped_batches = sum(st["dropped_batches"] for st in stats)
+        if dropped_batches or any(st["write_errors"] for st in stats):
+            text += f"，丢弃 {dropped_batches} 批 / {sum(st['dropped_rows'] for st in stats)} 行"
             self.save_status_label.setStyleSheet("color: red;")
-            QTimer.singleShot(500, lambda: self.save_status_label.setStyleSheet("color: green;"))
+        else:
+            self.save_status_label.setStyleSheet("color: green;")
+        self.save_status_label.setText(text)
+        self.save_status_label.setToolTip("\n".join(f"{st['file']}\n{st['last_error']}".strip() for st in stats))
+
+    def close_session(self):
+        """停止各设备的写盘线程：写完队列中剩余的数据并写入会话文件索引；下次自动保存时新建文件"""
+        if not self.recorders:
+            return
+        unfinished = [r for r in self.recorders.values() if not r.stop()]
+        self._update_save_status()
+        self.recorders = {}
+        if unfinished:
+            self._unfinished.extend(unfinished)
+            self.save_status_label.setText(f"保存状态：{len(unfinished)} 个会话文件仍在写盘（磁盘过慢），写完前请勿退出")
+            self.save_status_label.setStyleSheet("color: red;")
+
+    def wait_unfinished(self, timeout: float = 30.0) -> list:
+        """退出前调用：等仍在写盘的会话结束，返回超时仍未写完（没有索引）的文件"""
+        deadline = time.monotonic() + timeout
+        left = [r for r in self._unfinished if not r.wait(max(0.0, deadline - time.monotonic()))]
+        self._unfinished = left
+        return [r.stats()["file"] for r in left]
 
 
 # =========================
@@ -1549,6 +1987,18 @@ class SettingsPage(QWidget):
         self.save_interval_edit.textChanged.connect(self._on_ui_changed)
         save_layout.addRow("自动保存间隔(ms):", self.save_interval_edit)
 
+        self.flush_rows_edit = QLineEdit()
+        self.flush_rows_edit.setPlaceholderText("攒够多少行立即写盘，例如 4096")
+        self.flush_rows_edit.textChanged.connect(self._on_ui_changed)
+        save_layout.addRow("写盘块大小(行):", self.flush_rows_edit)
+
+        self.durability_combo = QComboBox()
+        self.durability_combo.addItem("不刷新（最快，崩溃可能丢数据）", "none")
+        self.durability_combo.addItem("交给系统（程序崩溃不丢）", "flush")
+        self.durability_combo.addItem("fsync 落盘（断电不丢，最慢）", "fsync")
+        self.durability_combo.currentIndexChanged.connect(self._on_ui_changed)
+        save_layout.addRow("写盘持久性:", self.durability_combo)
+
         path_layout = QHBoxLayout()
         self.save_path_edit = QLineEdit()
         self.select_path_btn = QPushButton("选择路径")
@@ -1580,14 +2030,20 @@ class SettingsPage(QWidget):
         self.auto_save_check.blockSignals(True)
         self.save_interval_edit.blockSignals(True)
         self.save_path_edit.blockSignals(True)
+        self.flush_rows_edit.blockSignals(True)
+        self.durability_combo.blockSignals(True)
 
         self.auto_save_check.setChecked(bool(self.cfg.save.auto_save))
         self.save_interval_edit.setText(str(int(self.cfg.save.save_interval_ms)))
         self.save_path_edit.setText(str(self.cfg.save.save_path))
+        self.flush_rows_edit.setText(str(int(self.cfg.save.flush_rows)))
+        self.durability_combo.setCurrentIndex(max(0, self.durability_combo.findData(self.cfg.save.durability)))
 
         self.auto_save_check.blockSignals(False)
         self.save_interval_edit.blockSignals(False)
         self.save_path_edit.blockSignals(False)
+        self.flush_rows_edit.blockSignals(False)
+        self.durability_combo.blockSignals(False)
 
     def _on_ui_changed(self, *args):
         self.cfg.save.auto_save = self.auto_save_check.isChecked()
@@ -1599,6 +2055,12 @@ class SettingsPage(QWidget):
             interval = 1000
         self.cfg.save.save_interval_ms = interval
 
+        try:
+            self.cfg.save.flush_rows = max(1, int(self.flush_rows_edit.text().strip()))
+        except Exception:
+            self.cfg.save.flush_rows = 4096
+        self.cfg.save.durability = self.durability_combo.currentData() or "flush"
+
         p = self.save_path_edit.text().strip()
         if p:
             self.cfg.save.save_path = p
@@ -1619,6 +2081,8 @@ class SettingsPage(QWidget):
         self.cfg.save.auto_save = False
         self.cfg.save.save_interval_ms = 1000
         self.cfg.save.save_path = "./serial_data"
+        self.cfg.save.flush_rows = 4096
+        self.cfg.save.durability = "flush"
         self.apply_config(self.cfg)
         self.config_changed.emit(self.cfg)
         QMessageBox.information(self, "提示", "保存设置已恢复默认值")
@@ -1644,7 +2108,7 @@ class MainWindow(QMainWindow):
 
         self.stacked_widget = QStackedWidget()
 
-        self.serial_page = SerialPage()
+        self.serial_page = SerialPage(self.cfg)
         self.data_page = DataMonitorPage(self.cfg)
         self.settings_page = SettingsPage(self.cfg)
 
@@ -1663,12 +2127,25 @@ class MainWindow(QMainWindow):
         self.add_nav_btn(nav_layout, "数据监测", 1)
         self.add_nav_btn(nav_layout, "设置", 2)
 
+        # 性能概况（每秒刷新，悬停看全部指标）
+        self.perf_label = QLabel("")
+        self.perf_label.setStyleSheet("color: #555; border: none;")
+        nav_layout.addWidget(self.perf_label)
+
         main_layout.addWidget(self.stacked_widget)
         main_layout.addWidget(self.bottom_nav)
 
         self.serial_page.data_received.connect(self.data_page.update_data)
+        self.data_page.filters_changed.connect(self.serial_page.reset_filters)
         self.settings_page.config_changed.connect(self.on_config_changed)
 
+        # 每秒取一次指标快照；每 metrics_dump_interval_s 秒追加写入一行到 save_path/metrics_*.jsonl
+        self.metrics_dump = None
+        self._last_metrics_dump = time.monotonic()
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self._update_metrics)
+        self.metrics_timer.start(1000)
+
         self.switch_page(0)
 
     def add_nav_btn(self, layout, text: str, index: int):
@@ -1689,9 +2166,52 @@ class MainWindow(QMainWindow):
             btn.setChecked(is_active)
             btn.setStyleSheet("background-color: #d0d0d0; font-weight: bold;" if is_active else "")
 
+    def _update_metrics(self, final: bool = False):
+        snap = METRICS.snapshot()
+        c, g, t = snap["counters"], snap["gauges"], snap["timers"]
+
+        def rate(name):
+            return c[name]["rate"] if name in c else 0.0
+
+        def total(name):
+            return c[name]["total"] if name in c else 0
+
+        flush = t.get("ui.flush", {})
+        self.perf_label.setText(
+            f"接收 {rate('serial.bytes') / 1024:.1f} KB/s | {rate('decode.frames'):.0f} 帧/s | "
+            f"校验失败 {total('decode.checksum_errors')} | 待显示 {g.get('ui.pending_frames', {}).get('value', 0)} | "
+            f"刷新 {flush.get('avg_ms', 0.0):.1f}/{flush.get('max_ms', 0.0):.1f} ms"
+        )
+        lines = [f"{k}: {v['total']}（{v['rate']:.1f}/s）" for k, v in sorted(c.items())]
+        lines += [f"{k}: {v['value']}（峰值 {v['peak']}）" for k, v in sorted(g.items())]
+        lines += [f"{k}: 平均 {v['avg_ms']:.2f} ms，最大 {v['max_ms']:.2f} ms，{v['count']} 次"
+                  for k, v in sorted(t.items())]
+        self.perf_label.setToolTip("\n".join(lines))
+
+        interval = self.cfg.ui.metrics_dump_interval_s
+        now = time.monotonic()
+        if interval > 0 and (final or now - self._last_metrics_dump >= interval):
+            self._last_metrics_dump = now
+            if self.metrics_dump is None:
+                stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                self.metrics_dump = MetricsDump(os.path.join(self.cfg.save.save_path, f"metrics_{stamp}.jsonl"))
+            self.metrics_dump.write(snap)
+
+    def closeEvent(self, event):
+        self.data_page.close_session()
+        unfinished = self.data_page.wait_unfinished()
+        if unfinished:
+            QMessageBox.warning(self, "保存未完成",
+                                "以下会话文件没有写完索引（已写入的数据块可用 SessionReader 扫描恢复）：\n"
+                                + "\n".join(unfinished))
+        if self.metrics_dump is not None:
+            self._update_metrics(final=True)
+        super().closeEvent(event)
+
     def on_config_changed(self, cfg):
         self.cfg = cfg
         self.cfg.save_to()
+        self.serial_page.apply_config(cfg)
         self.data_page.apply_config(cfg)
 
 
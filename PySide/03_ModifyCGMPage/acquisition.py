@@ -0,0 +1,213 @@
+# acquisition.py
+# 采集层（不依赖 Qt）：每台设备一套独立的解码 + 换算 + 滤波状态；多个串口共用一个 I/O 线程。
+# GUI 的 SerialWorker 与无界面的 cgm_daemon.py 都用这里的 AcquisitionPipeline / MultiPortReader
+from __future__ import annotations
+
+import math
+import os
+import re
+import select
+import time
+
+import numpy as np
+
+from app_config import AppConfig, FrameParser, batch_to_engineering, binary_frames_to_batch
+from decoders import BinaryFrameDecoder, JsonFrameDecoder
+from filters import StreamFilterBank
+from frame_batch import FrameBatch
+from perf_metrics import METRICS
+
+# 参与滤波的通道（电压直接用原始值）
+FILTER_CHANNELS = ("uric", "ascorbic", "glucose")
+
+
+def port_tag(name: str) -> str:
+    """端口名 -> 设备 ID / 文件名标签（/dev/ttyUSB0 -> ttyUSB0，COM3 -> COM3）"""
+    return re.sub(r"[^0-9A-Za-z_-]+", "_", os.path.basename(name.rstrip("/\\"))) or "port"
+
+
+class AcquisitionPipeline:
+    """
+    一台设备的解码 + 工程量换算 + 滤波状态；feed(data) 返回滤波后的 FrameBatch（可能为空）。
+    feed() = process(decode(data))：调用方也可以逐块 decode()、攒一批再 process()，减少逐次调用的开销。
+    这三个方法只在采集线程里调用；reconfigure() 可在任意线程调用，只登记新配置，
+    由采集线程在下一次 decode() / process() 时换上（解码 / 滤波状态只由采集线程修改）
+    """
+
+    def __init__(self, cfg: AppConfig, binary_mode: bool, device_id: str = ""):
+        self.device_id = device_id
+        self.binary_mode = binary_mode
+        self.binary_decoder = BinaryFrameDecoder()
+        self.json_decoder = JsonFrameDecoder(cfg.proto.line_delimiter)
+        self.frame_parser = FrameParser(cfg)
+        self.filter_bank = StreamFilterBank(len(FILTER_CHANNELS))
+        self.bytes_in = 0
+        self.frames_out = 0
+
+        # (序号, 配置)：reconfigure() 整体替换这个元组，采集线程比较序号决定是否重建
+        self._requested = (0, cfg)
+        self._applied = -1
+        self._apply_config()
+
+        # 热路径指标（见 perf_metrics.py），在采集线程写
+        self.m_frames = METRICS.counter("decode.frames")
+        self.m_checksum = METRICS.counter("decode.checksum_errors")
+        self.m_resync = METRICS.counter("decode.resync_bytes")
+        self.m_bad_json = METRICS.counter("decode.bad_objects")
+
+    def reconfigure(self, cfg: AppConfig):
+        """换配置（含滤波参数变化 / 清空滤波状态）：下一次 feed() 时生效"""
+        self._requested = (self._requested[0] + 1, cfg)
+
+    def _apply_config(self):
+        seq, cfg = self._requested
+        if seq == self._applied:
+            return
+        self._applied = seq
+        self.cfg = cfg
+        self.json_decoder.line_delimiter = cfg.proto.line_delimiter
+        self.frame_parser.cfg = cfg
+        self.frame_parser.invalidate()
+        f = cfg.filt
+        self.filter_bank.configure(f.filter_type, f.window_size, f.kalman_Q, f.kalman_R, f.savgol_order)
+
+    def feed(self, data: bytes) -> FrameBatch:
+        batch = self.decode(data)
+        if not len(batch):
+            return batch
+        return self.process(batch)
+
+    def decode(self, data: bytes) -> FrameBatch:
+        """字节 -> 原始帧批次（未换算）"""
+        self._apply_config()
+        self.bytes_in += len(data)
+        recv_ts = time.time()
+        if self.binary_mode:
+            dec = self.binary_decoder
+            bad_before, skipped_before = dec.checksum_errors, dec.discarded_bytes
+            frames = dec.feed(data)
+            if dec.checksum_errors != bad_before:
+                self.m_checksum.add(dec.checksum_errors - bad_before)
+            if dec.discarded_bytes != skipped_before:
+                self.m_resync.add(dec.discarded_bytes - skipped_before)
+            if len(frames) == 0:
+                return FrameBatch.empty()
+            return binary_frames_to_batch(frames, recv_ts=recv_ts)
+
+        dec = self.json_decoder
+        bad_before = dec.bad_objects
+        objs = dec.feed(data)
+        if dec.bad_objects != bad_before:
+            self.m_bad_json.add(dec.bad_objects - bad_before)
+        if not objs:
+            return FrameBatch.empty()
+        return self.frame_parser.parse_batch(objs, recv_ts=recv_ts)
+
+    def process(self, batch: FrameBatch) -> FrameBatch:
+        """原始帧批次 -> 工程量 + 三个通道整批滤波"""
+        self._apply_config()
+        eng = batch_to_engineering(batch, self.cfg)
+        filtered = self.filter_bank.process(np.column_stack([getattr(eng, k) for k in FILTER_CHANNELS]))
+        self.frames_out += len(eng)
+        self.m_frames.add(len(eng))
+        return eng.with_columns(**{k: filtered[:, i] for i, k in enumerate(FILTER_CHANNELS)})
+
+    @property
+    def checksum_errors(self) -> int:
+        return self.binary_decoder.checksum_errors
+
+
+class MultiPortReader:
+    """
+    一个线程同时读多个串口：chunks(stop) 依次产出 (设备 ID, 数据)。
+      - POSIX：所有串口 fd 注册到同一个 poll()，哪个可读读哪个（一次系统调用等待全部端口）；
+        一次唤醒里把就绪的端口读到没有新数据（每个端口最多 chunk_size 字节）再按设备交出，
+        数据持续到达时每块更大，解码 / 滤波的逐块固定开销不随端口数成倍增加
+      - 其他平台：轮询各端口的 in_waiting，全部无数据时短暂休眠
+    超时无数据时产出 (None, b"")，调用方借此检查退出条件；
+    某个端口出错（拔出等）时产出 (设备 ID, 异常对象) 并不再读取该端口，其余端口继续。
+    """
+
+    def __init__(self, ports: dict, chunk_size: int = 65536, wait_timeout: float = 0.2):
+        self.ports = dict(ports)            # 设备 ID -> serial.Serial
+        self.chunk_size = int(chunk_size)
+        self.wait_timeout = float(wait_timeout)
+
+        self._by_fd = {}
+        self._poller = None
+        if hasattr(select, "poll"):
+            try:
+                self._by_fd = {port.fileno(): dev for dev, port in self.ports.items()}
+            except Exception:
+                self._by_fd = {}
+        if self._by_fd:
+            self._poller = select.poll()
+            for fd in self._by_fd:
+                self._poller.register(fd, select.POLLIN | select.POLLERR | select.POLLHUP)
+
+    @property
+    def active(self) -> int:
+        return len(self.ports)
+
+    def chunks(self, stop):
+        read = self._chunks_poll if self._poller is not None else self._chunks_polling
+        yield from read(stop)
+
+    def _drop(self, dev: str):
+        port = self.ports.pop(dev, None)
+        for fd, d in list(self._by_fd.items()):
+            if d == dev:
+                self._poller.unregister(fd)
+                del self._by_fd[fd]
+        return port
+
+    def _chunks_poll(self, stop):
+        timeout_ms = max(0, math.ceil(self.wait_timeout * 1000))
+        while not stop.is_set() and self._by_fd:
+            events = self._poller.poll(timeout_ms)
+            if not events:
+                yield None, b""
+                continue
+            got = {}
+            errors = []
+            while events:
+                for fd, ev in events:
+                    dev = self._by_fd.get(fd)
+                    if dev is None:
+                        continue
+                    buf = got.setdefault(dev, bytearray())
+                    try:
+                        if ev & select.POLLIN:
+                            data = os.read(fd, self.chunk_size - len(buf))
+                            if not data:
+                                raise OSError("device reports readiness to read but returned no data")
+                            buf += data
+                        elif ev & (select.POLLERR | select.POLLHUP):
+                            raise OSError("串口已断开 (POLLHUP/POLLERR)")
+                    except OSError as e:
+                        self._drop(dev)
+                        errors.append((dev, e))
+                # 不等待地再看一次：还有新数据、且没攒满的端口接着读
+                events = [(fd, ev) for fd, ev in self._poller.poll(0)
+                          if len(got.get(self._by_fd.get(fd), b"")) < self.chunk_size]
+            for dev, buf in got.items():
+                if buf:
+                    yield dev, bytes(buf)
+            for dev, e in errors:
+                yield dev, e
+
+    def _chunks_polling(self, stop):
+        while not stop.is_set() and self.ports:
+            got = False
+            for dev, port in list(self.ports.items()):
+                try:
+                    n = port.in_waiting
+                    if n:
+                        got = True
+                        yield dev, port.read(min(n, self.chunk_size))
+                except Exception as e:
+                    self.ports.pop(dev, None)
+                    yield dev, e
+            if not got:
+                time.sleep(0.002)
+                yield None, b""
@@ -0,0 +1,398 @@
+# app_config.py
+# 配置与协议解析（不依赖 Qt）：GUI（01_ReadSerial.py）和无界面采集程序（cgm_daemon.py）共用
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+
+import numpy as np
+
+from filters import FilterType
+from frame_batch import FrameBatch
+from recorder import DURABILITY_MODES
+
+
+@dataclass
+class UIConfig:
+    ui_update_interval_ms: int = 50
+    max_table_rows: int = 2000
+    max_chart_fps: int = 30              # 图表重绘上限（帧/秒），过载时自动降低
+    metrics_dump_interval_s: int = 60    # 性能指标写入 save_path/metrics_*.jsonl 的间隔（秒），0 = 不写
+    console_max_lines: int = 1000        # 接收区最多保留的行数（超出后丢弃最旧的行）
+    console_max_chunk_bytes: int = 256   # 接收区每块数据最多显示的字节数（其余只显示字节数）
+
+
+@dataclass
+class FilterConfig:
+    filter_type: FilterType = FilterType.MOVING_AVG
+    window_size: int = 5
+    kalman_Q: float = 0.01
+    kalman_R: float = 0.1
+    savgol_order: int = 2            # S-G 平滑多项式阶数
+    peak_prominence: float = 0.1     # 判峰突出度（与电流同单位）
+
+
+@dataclass
+class SaveConfig:
+    auto_save: bool = False
+    save_interval_ms: int = 1000     # 按时间写盘：最长间隔
+    save_path: str = "./serial_data"
+    flush_rows: int = 4096           # 按大小写盘：攒够多少行立即写一块
+    durability: str = "flush"        # "none" / "flush" / "fsync"
+    max_queue_batches: int = 1024    # 写盘队列上限（满了丢弃并计数，不阻塞采集）
+
+
+@dataclass
+class ProtocolConfig:
+    # 你设备的 JSON 字段名可能不同，可在这里扩展/修改
+    time_keys: tuple = ("t", "time", "sec", "seconds", "timestamp")
+    voltage_keys: tuple = ("voltage", "V", "v")
+    uric_keys: tuple = ("uric", "uric_uA", "UA", "uA_uric")
+    ascorbic_keys: tuple = ("ascorbic", "ascorbic_uA", "AA", "uA_ascorbic")
+    glucose_keys: tuple = ("glucose", "glucose_mA", "GLU", "mA_glucose")
+
+    # 工程量缩放（默认透传：若你的数据是 ADC 计数/原始量，需要在此设置倍率）
+    time_unit: str = "auto"          # "auto" / "ms" / "s"
+    voltage_scale: float = 1.0       # raw -> V
+    uric_scale: float = 1.0          # raw -> uA
+    ascorbic_scale: float = 1.0      # raw -> uA
+    glucose_scale: float = 1.0       # raw -> mA
+
+    # 行协议（STM32 每行一条 JSON + '\n'）；置空则只按括号匹配切分
+    line_delimiter: str = "\n"
+
+
+@dataclass
+class AppConfig:
+    ui: UIConfig = field(default_factory=UIConfig)
+    filt: FilterConfig = field(default_factory=FilterConfig)
+    save: SaveConfig = field(default_factory=SaveConfig)
+    proto: ProtocolConfig = field(default_factory=ProtocolConfig)
+
+    @staticmethod
+    def _config_path() -> Path:
+        return Path(__file__).with_name("app_config.json")
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        path 为空：读取程序旁的 app_config.json，不存在或损坏时写入默认配置；
+        指定 path：只读（多个采集进程可共用同一份配置文件），读不到直接抛异常
+        """
+        if path is not None:
+            return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+        p = cls._config_path()
+        if not p.exists():
+            cfg = cls()
+            cfg.save_to()
+            return cfg
+
+        try:
+            raw = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            cfg = cls()
+            cfg.save_to()
+            return cfg
+        return cls.from_dict(raw)
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "AppConfig":
+        """to_dict() 的逆过程；缺少的字段保持默认值"""
+        cfg = cls()
+
+        # ui
+        ui = raw.get("ui", {})
+        cfg.ui.ui_update_interval_ms = int(ui.get("ui_update_interval_ms", cfg.ui.ui_update_interval_ms))
+        cfg.ui.max_table_rows = int(ui.get("max_table_rows", cfg.ui.max_table_rows))
+        cfg.ui.max_chart_fps = int(ui.get("max_chart_fps", cfg.ui.max_chart_fps))
+        cfg.ui.metrics_dump_interval_s = int(ui.get("metrics_dump_interval_s", cfg.ui.metrics_dump_interval_s))
+        cfg.ui.console_max_lines = int(ui.get("console_max_lines", cfg.ui.console_max_lines))
+        cfg.ui.console_max_chunk_bytes = int(ui.get("console_max_chunk_bytes", cfg.ui.console_max_chunk_bytes))
+
+        # filt
+        flt = raw.get("filt", {})
+        ft = flt.get("filter_type", cfg.filt.filter_type.value)
+        cfg.filt.filter_type = _safe_filter_type(ft, default=cfg.filt.filter_type)
+        cfg.filt.window_size = int(flt.get("window_size", cfg.filt.window_size))
+        cfg.filt.kalman_Q = float(flt.get("kalman_Q", cfg.filt.kalman_Q))
+        cfg.filt.kalman_R = float(flt.get("kalman_R", cfg.filt.kalman_R))
+        cfg.filt.savgol_order = int(flt.get("savgol_order", cfg.filt.savgol_order))
+        cfg.filt.peak_prominence = float(flt.get("peak_prominence", cfg.filt.peak_prominence))
+
+        # save
+        sv = raw.get("save", {})
+        cfg.save.auto_save = bool(sv.get("auto_save", cfg.save.auto_save))
+        cfg.save.save_interval_ms = int(sv.get("save_interval_ms", cfg.save.save_interval_ms))
+        cfg.save.save_path = str(sv.get("save_path", cfg.save.save_path))
+        cfg.save.flush_rows = int(sv.get("flush_rows", cfg.save.flush_rows))
+        durability = str(sv.get("durability", cfg.save.durability))
+        cfg.save.durability = durability if durability in DURABILITY_MODES else cfg.save.durability
+        cfg.save.max_queue_batches = int(sv.get("max_queue_batches", cfg.save.max_queue_batches))
+
+        # proto
+        pr = raw.get("proto", {})
+        cfg.proto.time_unit = str(pr.get("time_unit", cfg.proto.time_unit))
+        cfg.proto.voltage_scale = float(pr.get("voltage_scale", cfg.proto.voltage_scale))
+        cfg.proto.uric_scale = float(pr.get("uric_scale", cfg.proto.uric_scale))
+        cfg.proto.ascorbic_scale = float(pr.get("ascorbic_scale", cfg.proto.ascorbic_scale))
+        cfg.proto.glucose_scale = float(pr.get("glucose_scale", cfg.proto.glucose_scale))
+        cfg.proto.line_delimiter = str(pr.get("line_delimiter", cfg.proto.line_delimiter))
+
+        return cfg
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+
+        # Enum 序列化为 value
+        data["filt"]["filter_type"] = self.filt.filter_type.value
+        return data
+
+    def save_to(self):
+        p = self._config_path()
+        data = self.to_dict()
+        p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _safe_filter_type(v, default: FilterType) -> FilterType:
+    # 既支持 value，也支持 name
+    for ft in FilterType:
+        if v == ft.value or v == ft.name:
+            return ft
+    return default
+
+
+def _pick_first_key(d: dict, keys: tuple):
+    for k in keys:
+        if k in d:
+            return d.get(k)
+    return None
+
+
+def _to_float(x, default=0.0):
+    try:
+        if x is None:
+            return default
+        return float(x)
+    except Exception:
+        return default
+
+
+def parse_frame(data: dict, cfg: AppConfig) -> dict:
+    """
+    将串口 JSON dict 归一化为统一字段：
+    { "t": seconds, "voltage": V, "uric": uA, "ascorbic": uA, "glucose": mA }
+    """
+    pr = cfg.proto
+
+    t_raw = _pick_first_key(data, pr.time_keys)
+    v_raw = _pick_first_key(data, pr.voltage_keys)
+    u_raw = _pick_first_key(data, pr.uric_keys)
+    a_raw = _pick_first_key(data, pr.ascorbic_keys)
+    g_raw = _pick_first_key(data, pr.glucose_keys)
+
+    t = _to_float(t_raw, 0.0)
+
+    # 时间单位处理
+    if pr.time_unit == "ms":
+        t_sec = t / 1000.0
+    elif pr.time_unit == "s":
+        t_sec = t
+    else:
+        # auto：经验判断，> 1e4 认为是 ms
+        t_sec = t / 1000.0 if t > 1e4 else t
+
+    frame = {
+        "t": t_sec,
+        "voltage": _to_float(v_raw, 0.0),
+        "uric": _to_float(u_raw, 0.0),
+        "ascorbic": _to_float(a_raw, 0.0),
+        "glucose": _to_float(g_raw, 0.0),
+    }
+    return frame
+
+
+# 通道顺序与 FrameBatch 的 t / voltage / uric / ascorbic / glucose 一致
+_PROTO_KEY_FIELDS = ("time_keys", "voltage_keys", "uric_keys", "ascorbic_keys", "glucose_keys")
+_AUTO_MS_THRESHOLD = 1e4
+
+
+def _column_to_float(values: list) -> np.ndarray:
+    """一列原始值 -> float64；转换失败 / None 的元素按 _to_float 规则处理（缺省 0.0）"""
+    try:
+        arr = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_to_float(v, 0.0) for v in values], dtype=np.float64)
+    nan = np.isnan(arr)
+    if nan.any():
+        # None 也会被转成 nan：逐个按 _to_float 重新处理这些位置
+        for i in np.flatnonzero(nan).tolist():
+            arr[i] = _to_float(values[i], 0.0)
+    return arr
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """
+    由一帧样本编译出的字段映射：每个通道实际使用的键（缺失为 None）。
+    只要后续帧的键集合与样本相同，别名查找结果必然相同，可直接按键取值。
+    """
+    key_set: frozenset
+    keys: tuple
+
+    @classmethod
+    def compile(cls, sample: dict, pr: ProtocolConfig) -> "FieldPlan":
+        keys = tuple(
+            next((k for k in getattr(pr, name) if k in sample), None)
+            for name in _PROTO_KEY_FIELDS
+        )
+        return cls(frozenset(sample.keys()), keys)
+
+    def matches(self, d: dict) -> bool:
+        return d.keys() == self.key_set
+
+
+class FrameParser:
+    """
+    带缓存的 parse_frame：首帧编译 FieldPlan，之后同构的帧 / 整批直接套用。
+    以下情况重新编译：协议配置（别名、time_unit）变化，或某帧键集合与计划不符。
+    time_unit="auto" 时，一旦出现 t > 1e4 就锁定为 ms，不再逐帧判断。
+    """
+
+    def __init__(self, cfg: AppConfig):
+        self.cfg = cfg
+        self.plan = None
+        self.compiles = 0
+        self._signature = None
+        self._ms_locked = False
+
+    def invalidate(self):
+        self.plan = None
+        self._signature = None
+        self._ms_locked = False
+
+    def _check_config(self):
+        pr = self.cfg.proto
+        sig = tuple(getattr(pr, name) for name in _PROTO_KEY_FIELDS) + (pr.time_unit,)
+        if sig != self._signature:
+            self.invalidate()
+            self._signature = sig
+
+    def _plan_for(self, d: dict) -> FieldPlan:
+        if self.plan is None or not self.plan.matches(d):
+            self.plan = FieldPlan.compile(d, self.cfg.proto)
+            self.compiles += 1
+        return self.plan
+
+    def _seconds(self, t: np.ndarray) -> np.ndarray:
+        unit = self.cfg.proto.time_unit
+        if unit == "ms":
+            return t / 1000.0
+        if unit == "s":
+            return t
+        # auto：锁定前 t 都不超过阈值（原样当秒），首个超阈值的点起按 ms 处理
+        if not self._ms_locked:
+            over = np.flatnonzero(t > _AUTO_MS_THRESHOLD)
+            if not over.size:
+                return t
+            self._ms_locked = True
+            t = t.copy()
+            t[over[0]:] /= 1000.0
+            return t
+        return t / 1000.0
+
+    def _columns(self, run: list, plan: FieldPlan) -> list:
+        n = len(run)
+        cols = []
+        for k in plan.keys:
+            if k is None:
+                cols.append(np.zeros(n, dtype=np.float64))
+            else:
+                cols.append(_column_to_float([d[k] for d in run]))
+        return cols
+
+    def parse_batch(self, objs: list, recv_ts=None) -> FrameBatch:
+        """一组串口 JSON dict -> FrameBatch；相邻的同构帧整段按列转换"""
+        self._check_config()
+        parts = []
+        run = []
+        plan = None
+        for d in objs:
+            if plan is not None and plan.matches(d):
+                run.append(d)
+                continue
+            if run:
+                parts.append(self._columns(run, plan))
+            plan = self._plan_for(d)
+            run = [d]
+        if run:
+            parts.append(self._columns(run, plan))
+
+        if not parts:
+            return FrameBatch.from_columns([], [], [], [], [], recv_ts=recv_ts)
+        cols = parts[0] if len(parts) == 1 else [np.concatenate(c) for c in zip(*parts)]
+        cols[0] = self._seconds(cols[0])
+        return FrameBatch.from_columns(*cols, recv_ts=recv_ts)
+
+    def parse(self, data: dict) -> dict:
+        """单帧版本，返回值与 parse_frame 相同"""
+        b = self.parse_batch([data])
+        return {
+            "t": float(b.t[0]),
+            "voltage": float(b.voltage[0]),
+            "uric": float(b.uric[0]),
+            "ascorbic": float(b.ascorbic[0]),
+            "glucose": float(b.glucose[0]),
+        }
+
+
+def parse_frames(objs: list, cfg: AppConfig, recv_ts=None) -> FrameBatch:
+    """一组串口 JSON dict -> 归一化后的 FrameBatch（一次性调用；连续数据流请复用 FrameParser）"""
+    return FrameParser(cfg).parse_batch(objs, recv_ts=recv_ts)
+
+
+def frame_to_engineering(frame: dict, cfg: AppConfig):
+    """
+    工程量换算（倍率默认 1.0=透传）
+    返回：seconds, voltage(V), uric(uA), ascorbic(uA), glucose(mA)
+    """
+    pr = cfg.proto
+    seconds = _to_float(frame.get("t"), 0.0)
+    voltage = _to_float(frame.get("voltage"), 0.0) * pr.voltage_scale
+    uric = _to_float(frame.get("uric"), 0.0) * pr.uric_scale
+    ascorbic = _to_float(frame.get("ascorbic"), 0.0) * pr.ascorbic_scale
+    glucose = _to_float(frame.get("glucose"), 0.0) * pr.glucose_scale
+    return seconds, voltage, uric, ascorbic, glucose
+
+
+def batch_to_engineering(batch: FrameBatch, cfg: AppConfig) -> FrameBatch:
+    """frame_to_engineering 的整批版本：每列乘一次倍率"""
+    pr = cfg.proto
+    return batch.with_columns(
+        voltage=batch.voltage * pr.voltage_scale,
+        uric=batch.uric * pr.uric_scale,
+        ascorbic=batch.ascorbic * pr.ascorbic_scale,
+        glucose=batch.glucose * pr.glucose_scale,
+    )
+
+
+# 二进制帧的 Code12 -> 电压：参考电压 3.3V、12bit ADC，合成一个系数，每帧只做一次乘法
+CODE12_VREF = 3.3
+CODE12_MAX = 4095
+_VOLTS_PER_CODE12 = CODE12_VREF / CODE12_MAX
+
+
+def binary_frames_to_batch(frames: np.ndarray, recv_ts=None) -> FrameBatch:
+    """
+    二进制帧（decoders.FRAME_DTYPE 结构化数组）-> FrameBatch
+    列式换算：毫秒转秒；Code12 -> 电压
+    """
+    return FrameBatch.from_columns(
+        frames["ms"] / 1000.0,
+        frames["code12"] * _VOLTS_PER_CODE12,
+        frames["uric"],
+        frames["ascorbic"],
+        frames["glucose"],
+        recv_ts=recv_ts,
+    )
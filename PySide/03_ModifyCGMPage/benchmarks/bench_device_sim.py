@@ -0,0 +1,93 @@
+# bench_device_sim.py
+# 设备模拟器 -> 伪终端 -> 采集层（MultiPortReader + AcquisitionPipeline）的吞吐与端到端延迟
+# 延迟 = 接收时间 - 帧的计划发送时间（模拟器开始时间 + 帧时间），包含发送节拍、波特率排队、读取和解码
+# 用法（仅 POSIX）：python benchmarks/bench_device_sim.py [--rates 1000,5000,20000] [--seconds 5] [--json]
+#                  [--baud 0] [--noise 0] [--corrupt 0] [--drop 0]
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import serial
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from acquisition import AcquisitionPipeline, MultiPortReader
+from app_config import AppConfig
+from device_sim import DeviceSimulator, make_waveform, open_pty, pty_writer, pump
+
+
+def run(rate: float, seconds: float, binary: bool, baud: int, noise: float, corrupt: float,
+        drop: float, seed: int = 0):
+    master, slave, name = open_pty()
+    port = serial.Serial(name, baudrate=115200, timeout=0.1)
+    sim = DeviceSimulator(binary=binary, frame_rate=rate, waveform=make_waveform("cv", rate),
+                          noise=noise, corrupt_rate=corrupt, drop_rate=drop, seed=seed)
+    pipeline = AcquisitionPipeline(AppConfig(), binary)
+
+    stop = threading.Event()
+    result = {}
+    sender = threading.Thread(
+        target=lambda: result.update(pump(sim, pty_writer(master), baud=baud, stop=stop, duration=seconds)),
+        daemon=True,
+    )
+
+    latencies = []
+    reader_stop = threading.Event()
+    sender.start()
+    deadline = time.perf_counter() + seconds + 1.0
+    for dev, data in MultiPortReader({"sim": port}, wait_timeout=0.05).chunks(reader_stop):
+        if isinstance(data, Exception):
+            break
+        if data:
+            batch = pipeline.feed(data)
+            if len(batch):
+                latencies.append(batch.recv_ts - (sim.start_wall + batch.t))
+        if not sender.is_alive() and time.perf_counter() > deadline:
+            break
+    stop.set()
+    sender.join()
+    port.close()
+    os.close(master)
+    os.close(slave)
+
+    lat_ms = np.concatenate(latencies) * 1000.0 if latencies else np.empty(0)
+    return {
+        "rate": rate,
+        "frames_sent": result.get("frames", 0),
+        "frames_decoded": pipeline.frames_out,
+        "checksum_errors": pipeline.checksum_errors,
+        "mb_per_s": result.get("bytes_sent", 0) / max(result.get("elapsed", seconds), 1e-9) / 1e6,
+        "backlog": result.get("backlog", 0) + result.get("overflow_bytes", 0),
+        "p50_ms": float(np.percentile(lat_ms, 50)) if lat_ms.size else float("nan"),
+        "p99_ms": float(np.percentile(lat_ms, 99)) if lat_ms.size else float("nan"),
+        "max_ms": float(lat_ms.max()) if lat_ms.size else float("nan"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rates", default="1000,5000,20000,50000", help="逗号分隔的帧率列表（帧/秒）")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--json", action="store_true", help="JSON 行协议（缺省为二进制帧）")
+    ap.add_argument("--baud", type=int, default=0, help="模拟器波特率，0 = 不限速（测采集层上限）")
+    ap.add_argument("--noise", type=float, default=0.0)
+    ap.add_argument("--corrupt", type=float, default=0.0)
+    ap.add_argument("--drop", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print(f"{'rate':>8} {'sent':>9} {'decoded':>9} {'cksum':>6} {'MB/s':>6} {'backlog':>8} "
+          f"{'p50ms':>7} {'p99ms':>7} {'maxms':>7}")
+    for rate in (float(r) for r in args.rates.split(",")):
+        r = run(rate, args.seconds, not args.json, args.baud, args.noise, args.corrupt, args.drop, args.seed)
+        print(f"{r['rate']:>8.0f} {r['frames_sent']:>9} {r['frames_decoded']:>9} {r['checksum_errors']:>6} "
+              f"{r['mb_per_s']:>6.2f} {r['backlog']:>8} {r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} {r['max_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# bench_json_scanner.py
+# JSON 流切分耗时：旧 process_json_buffer（每包从头重扫整个缓存）vs JsonFrameDecoder（可续扫 + 按行快速路径）
+# 用法：python benchmarks/bench_json_scanner.py [--chunk 64]
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from decoders import JsonFrameDecoder
+
+
+class LegacyJsonBuffer:
+    """旧版 SerialPage.process_json_buffer 的算法（去掉 Qt 部分），作为对照"""
+
+    def __init__(self):
+        self.json_buffer = ""
+
+    def feed(self, data: bytes) -> list:
+        self.json_buffer += data.decode(errors="ignore")
+        buf = self.json_buffer
+        out = []
+        spans = []
+        start = None
+        depth = 0
+        in_str = False
+        esc = False
+        for i, ch in enumerate(buf):
+            if in_str:
+                if esc:
+                    esc = False
+                elif ch == "\\":
+                    esc = True
+                elif ch == '"':
+                    in_str = False
+                continue
+            if ch == '"':
+                in_str = True
+                continue
+            if ch == "{":
+                if depth == 0:
+                    start = i
+                depth += 1
+            elif ch == "}":
+                if depth > 0:
+                    depth -= 1
+                    if depth == 0 and start is not None:
+                        spans.append((start, i))
+        last_consumed = -1
+        for s, e in spans:
+            last_consumed = e
+            try:
+                out.append(json.loads(buf[s:e + 1]))
+            except json.JSONDecodeError:
+                continue
+        if last_consumed >= 0:
+            self.json_buffer = buf[last_consumed + 1:]
+        else:
+            idx = buf.rfind("{")
+            self.json_buffer = buf[idx:] if idx >= 0 else ""
+        return out
+
+
+def ndjson_stream(n_frames: int) -> bytes:
+    lines = [json.dumps({"Ms": i * 10, "Uric": 1.2345, "AA": 0.5678, "Glu": 2.3456, "Code12": 2048})
+             for i in range(n_frames)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def braces_stream(n_frames: int) -> bytes:
+    """不带分隔符、对象首尾相接的设备（{...}{...}）"""
+    return "".join(json.dumps({"Ms": i * 10, "Uric": 1.2345, "Code12": 2048})
+                   for i in range(n_frames)).encode()
+
+
+def big_object(n_items: int) -> bytes:
+    """一个跨越很多个串口包的大对象（例如一次性上传整条扫描曲线）"""
+    obj = {"Ms": 0,
+           "V": [round(i * 0.001, 4) for i in range(n_items)],
+           "I": [round(i * 0.5, 3) for i in range(n_items)]}
+    return (json.dumps(obj) + "\n").encode()
+
+
+def run(decoder, raw: bytes, chunk: int):
+    t0 = time.perf_counter()
+    count = 0
+    for pos in range(0, len(raw), chunk):
+        count += len(decoder.feed(raw[pos:pos + chunk]))
+    return time.perf_counter() - t0, count
+
+
+def check_latency(raw: bytes, chunk: int):
+    """逐块对照：旧算法每包收到完整对象就交出，新解码器在每一包之后交出的对象数必须与之相同"""
+    old, new = LegacyJsonBuffer(), JsonFrameDecoder("\n")
+    n_old = n_new = 0
+    for pos in range(0, len(raw), chunk):
+        n_old += len(old.feed(raw[pos:pos + chunk]))
+        n_new += len(new.feed(raw[pos:pos + chunk]))
+        assert n_old == n_new, (pos, n_old, n_new)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chunk", type=int, default=64, help="每次 feed 的字节数（模拟串口小包）")
+    args = ap.parse_args()
+
+    print(f"chunk = {args.chunk} B")
+    print(f"{'case':<20}{'bytes':>9}{'legacy ms':>11}{'new ms':>9}{'speedup':>9}")
+    cases = [(f"ndjson x{n}", ndjson_stream(n)) for n in (1000, 4000, 16000)]
+    # 大对象需小于 JsonFrameDecoder.MAX_OBJECT_LEN（64 KiB）
+    cases += [(f"big object x{n}", big_object(n)) for n in (500, 1000, 2000, 4000)]
+    cases += [(f"braces only x{n}", braces_stream(n)) for n in (1000, 4000)]
+    for chunk in (7, args.chunk):
+        check_latency(braces_stream(24), chunk)
+        check_latency(ndjson_stream(24), chunk)
+    for name, raw in cases:
+        t_old, n_old = run(LegacyJsonBuffer(), raw, args.chunk)
+        t_new, n_new = run(JsonFrameDecoder("\n"), raw, args.chunk)
+        assert n_old == n_new, (name, n_old, n_new)
+        print(f"{name:<20}{len(raw):>9}{t_old * 1e3:>11.1f}{t_new * 1e3:>9.1f}{t_old / t_new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_replay.py
+# 原始字节回放吞吐：录制文件以“最快”速度走完整流水线（解码 -> 解析 -> 滤波 -> 表格 / 图表），不需要硬件
+# 用法：python benchmarks/bench_replay.py [capture.cgmraw] [--frames 50000] [--chunk 256] [--json]
+#   不给录制文件时生成一段合成的二进制帧（或 --json 时为 JSON 行）录制
+import argparse
+import importlib.util
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from raw_capture import RawCaptureWriter
+
+
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("read_serial_app", HERE.parent / "01_ReadSerial.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def make_frame(i: int) -> bytes:
+    code12 = int(2048 + 2000 * np.sin(i / 200.0))
+    payload = struct.pack("<IHHHH", i * 10, 1000 + i % 50, 2000 + i % 30, 3000 + i % 70, code12)
+    return bytes([0xA5]) + payload + bytes([sum(payload) & 0xFF, 0x5A])
+
+
+def make_capture(path: str, n_frames: int, chunk: int, use_json: bool):
+    """合成录制：按 chunk 字节切块，时间戳按 115200 波特率的传输时间递增"""
+    if use_json:
+        raw = "".join(json.dumps({"t": i * 0.01, "voltage": float(np.sin(i / 200.0)), "uric": i % 50,
+                                  "ascorbic": i % 30, "glucose": i % 70}) + "\n" for i in range(n_frames)).encode()
+    else:
+        raw = b"".join(make_frame(i) for i in range(n_frames))
+    w = RawCaptureWriter(path, {"binary_mode": not use_json, "synthetic": True})
+    ns_per_byte = int(1e9 * 10 / 115200)
+    t0 = time.monotonic_ns()
+    for pos in range(0, len(raw), chunk):
+        w.write(raw[pos:pos + chunk], t0 + pos * ns_per_byte)
+    w.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("capture", nargs="?", help="原始字节录制文件（.cgmraw）")
+    ap.add_argument("--frames", type=int, default=50000, help="合成录制的帧数")
+    ap.add_argument("--chunk", type=int, default=256, help="合成录制每块的字节数")
+    ap.add_argument("--json", action="store_true", help="合成 JSON 行而不是二进制帧")
+    args = ap.parse_args()
+
+    path = args.capture
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.cgmraw")
+        make_capture(path, args.frames, args.chunk, args.json)
+
+    app_mod = load_app_module()
+    app = app_mod.QApplication.instance() or app_mod.QApplication([])
+    window = app_mod.MainWindow()
+    window.data_page.switch_chart(0)
+    sp, dp = window.serial_page, window.data_page
+
+    sp.start_replay(path, speed=0.0)
+    worker = sp.worker
+    t0 = time.perf_counter()
+    while sp.worker is not None:
+        app.processEvents()
+    dp._flush_pending_data()
+    while dp._pending_data:
+        dp._flush_pending_data()
+    wall = time.perf_counter() - t0
+
+    frames = len(dp.glucose_time_data)
+    print(f"capture      : {path}")
+    print(f"chunks/bytes : {worker.chunks_replayed} / {worker.bytes_replayed}")
+    print(f"frames       : {frames}")
+    print(f"decode thread: {worker.elapsed:.3f} s")
+    print(f"end to end   : {wall:.3f} s  ({frames / wall:,.0f} frames/s, "
+          f"{worker.bytes_replayed / wall / 1e6:.2f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
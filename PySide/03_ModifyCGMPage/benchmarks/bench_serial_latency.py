@@ -0,0 +1,104 @@
+# bench_serial_latency.py
+# 伪终端回环测量“字节写入 -> 帧解析完成”的延迟：旧轮询模式 vs 事件驱动模式
+# 用法（仅 POSIX）：python benchmarks/bench_serial_latency.py [--seconds 10]
+import argparse
+import importlib.util
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import serial
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("read_serial_app", HERE.parent / "01_ReadSerial.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def make_frame(seq: int) -> bytes:
+    payload = struct.pack("<IHHHH", seq, 2048, 2048, 2048, 2048)
+    return bytes([0xA5]) + payload + bytes([sum(payload) & 0xFF, 0x5A])
+
+
+def run(app_mod, event_driven: bool, seconds: float, emit_interval_ms: int = 20, seed: int = 0):
+    master, slave = os.openpty()
+    port = serial.Serial(os.ttyname(slave), baudrate=115200, timeout=0.1)
+
+    sent = {}
+    latencies = []
+
+    # 解析在工作线程内完成；这里在交付时刻（batches_ready）取结果计时
+    worker = app_mod.SerialWorker(port, app_mod.AppConfig(), is_bluetooth=False, event_driven=event_driven)
+    worker.binary_mode = True
+    worker.emit_interval_ms = emit_interval_ms
+
+    def on_ready():
+        now = time.perf_counter()
+        for r in worker.take_results():
+            for batch in r.batches.values():
+                for t in batch.t.tolist():
+                    t0 = sent.get(int(round(t * 1000)))
+                    if t0 is not None:
+                        latencies.append(now - t0)
+
+    # 基准里没有 Qt 事件循环：直接在读线程里回调
+    worker.batches_ready.connect(on_ready, app_mod.Qt.DirectConnection)
+    reader = threading.Thread(target=worker.start, daemon=True)
+    reader.start()
+
+    # 写入端：突发若干帧，然后随机空闲 0~800ms（模拟设备暂停后恢复发送）
+    rng = random.Random(seed)
+    seq = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(rng.randint(1, 20)):
+            sent[seq] = time.perf_counter()
+            os.write(master, make_frame(seq))
+            seq += 1
+            time.sleep(0.001)
+        time.sleep(rng.uniform(0.0, 0.8))
+
+    time.sleep(0.6)
+    worker.stop()
+    reader.join(timeout=2)
+    port.close()
+    os.close(master)
+
+    lat_ms = np.asarray(latencies) * 1000.0
+    return {
+        "mode": ("event" if event_driven else "poll") + f"/{emit_interval_ms}ms",
+        "frames_sent": seq,
+        "frames_decoded": int(lat_ms.size),
+        "p50_ms": float(np.percentile(lat_ms, 50)) if lat_ms.size else float("nan"),
+        "p99_ms": float(np.percentile(lat_ms, 99)) if lat_ms.size else float("nan"),
+        "max_ms": float(lat_ms.max()) if lat_ms.size else float("nan"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--emit-interval-ms", type=int, default=20, help="工作线程向 GUI 交付结果的最小间隔")
+    args = ap.parse_args()
+
+    app_mod = load_app_module()
+    for event_driven in (False, True):
+        r = run(app_mod, event_driven, args.seconds, args.emit_interval_ms)
+        print(f"{r['mode']:>10}: sent={r['frames_sent']} decoded={r['frames_decoded']} "
+              f"p50={r['p50_ms']:.2f}ms p99={r['p99_ms']:.2f}ms max={r['max_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
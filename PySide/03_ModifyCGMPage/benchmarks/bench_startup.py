@@ -0,0 +1,142 @@
+# bench_startup.py
+# GUI 冷启动耗时（offscreen Qt）：每轮起一个新的 Python 进程，分阶段计时，并用 -X importtime 统计各模块的导入耗时
+#   import      : 载入 01_ReadSerial.py（含其导入的全部模块）
+#   qapp        : 创建 QApplication
+#   window      : 构造 MainWindow
+#   show        : 显示主窗口并处理完首批事件（到这里用户就能看到界面）
+#   ports       : 串口枚举结果回到界面（后台线程，与上面各阶段重叠，从进程启动算起）
+#   data_page   : 第一次切到数据监测页（创建当前图表）
+#   all_charts  : 依次切到其余三个图表页
+# 用法：python benchmarks/bench_startup.py [--repeat 5] [--top 15] [--out result.json]
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+APP_DIR = HERE.parent
+
+PHASES = ("import", "qapp", "window", "show", "ports", "data_page", "all_charts")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+APP_MARKER = "--- app start ---"
+
+
+def child():
+    """子进程：按阶段计时，结果以一行 JSON 打印到 stdout"""
+    t_start = time.perf_counter()
+    sys.path.insert(0, str(APP_DIR))
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import importlib.util
+
+    # 此前的导入属于本脚本自身，不计入导入耗时统计
+    sys.stderr.write(APP_MARKER + "\n")
+    sys.stderr.flush()
+    out = {}
+    t0 = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("read_serial_app", APP_DIR / "01_ReadSerial.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    out["import"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    app = mod.QApplication.instance() or mod.QApplication([])
+    out["qapp"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    window = mod.MainWindow()
+    out["window"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    window.resize(1280, 800)
+    window.show()
+    app.processEvents()
+    out["show"] = time.perf_counter() - t0
+
+    # 等串口下拉框填好（旧版本在构造时同步枚举，这里立即满足）
+    page = window.serial_page
+    deadline = time.perf_counter() + 10.0
+    while getattr(page, "_listing_ports", False) and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    out["ports"] = time.perf_counter() - t_start
+
+    t0 = time.perf_counter()
+    window.switch_page(1)
+    app.processEvents()
+    out["data_page"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for index in (1, 2, 3):
+        window.data_page.switch_chart(index)
+        app.processEvents()
+    out["all_charts"] = time.perf_counter() - t0
+
+    window.data_page.close_session()
+    window.close()
+    print(json.dumps(out))
+
+
+def parse_importtime(stderr: str) -> dict:
+    """-X importtime 的输出 -> {模块: 累计耗时(秒)}，只取程序开始之后的顶层导入（缩进最少的行）"""
+    rows = []
+    for line in stderr.split(APP_MARKER, 1)[-1].splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            rows.append((len(m.group(3)), m.group(4), int(m.group(2)) / 1e6))
+    if not rows:
+        return {}
+    top = min(depth for depth, _, _ in rows)
+    return {name: cum for depth, name, cum in rows if depth == top}
+
+
+def run_once() -> tuple:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", __file__, "--child"],
+                          capture_output=True, text=True, env=env, cwd=str(APP_DIR))
+    total = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    phases["process"] = total
+    return phases, parse_importtime(proc.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5, help="启动次数（取中位数）")
+    ap.add_argument("--top", type=int, default=15, help="列出导入耗时最多的前 N 个模块")
+    ap.add_argument("--out", help="把结果写成 JSON")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child()
+        return
+
+    runs = [run_once() for _ in range(args.repeat)]
+    phases = {k: statistics.median(r[0][k] for r in runs) for k in PHASES + ("process",)}
+    names = set().union(*(r[1] for r in runs))
+    imports = {n: statistics.median(r[1].get(n, 0.0) for r in runs) for n in names}
+
+    print(f"启动阶段（{args.repeat} 次中位数，毫秒）")
+    for k in PHASES:
+        print(f"  {k:<12} {phases[k] * 1000.0:>9.1f}")
+    print(f"  {'process':<12} {phases['process'] * 1000.0:>9.1f}  （整个子进程，含解释器启动与退出）")
+
+    print("\n导入耗时（顶层模块，含其依赖，毫秒）")
+    for name, cum in sorted(imports.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<32} {cum * 1000.0:>9.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"phases": phases, "imports": imports, "repeat": args.repeat}, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# bench_suite.py
+# 分阶段基准套件（无界面，offscreen Qt，合成数据流）：结果写成 JSON，可与基线比较、超出阈值即判为回退
+#   decode.*  : BinaryFrameDecoder / JsonFrameDecoder 切帧吞吐（帧/秒）
+#   parse.*   : 逐帧 parse_frame + frame_to_engineering，整批 FrameParser + batch_to_engineering（帧/秒）
+#   filter.*  : StreamFilterBank 各滤波类型，批量处理三个通道（帧/秒）
+#   .batch.N  : 整批处理的各项按 GUI_BATCHES 中每种批量各测一次——GUI 每拍处理的帧数由 FlushScheduler
+#               按到达速率与耗时决定，从 min_batch（轻载）到数千帧（高速率 / 追赶积压）都会出现
+#   chart.*   : 各图表在 300 / 2000 / 20000 点时一次刷新的耗时（毫秒）；.render 另含一次完整绘制
+#               （offscreen 下窗口不会收到绘制事件，用 QChartView.grab() 强制绘制）
+#   save.*    : 手动保存 CSV（表格文本 -> _write_data_to_csv）与会话文件写入（行/秒）
+# 用法：python benchmarks/bench_suite.py [--quick] [--only chart] [--out result.json]
+#                                       [--baseline base.json] [--threshold 0.2]
+#   有回退时退出码为 1；缺省把结果写到 benchmarks/results/bench_<时间>.json
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from app_config import AppConfig, FrameParser, batch_to_engineering, frame_to_engineering, parse_frame
+from chart_buffer import RingSeries
+from decoders import BinaryFrameDecoder, JsonFrameDecoder
+from filters import FilterType, StreamFilterBank
+from flush_scheduler import FlushScheduler
+from frame_batch import FrameBatch
+from session_file import SessionWriter
+
+CHART_POINTS = (300, 2000, 20000)
+GUI_BATCHES = (FlushScheduler().min_batch, 500, 4000)     # GUI 每拍处理的帧数：轻载下限 ~ 高速率
+
+
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("read_serial_app", HERE.parent / "01_ReadSerial.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+# =========================
+# 合成数据
+# =========================
+def make_binary_stream(n: int) -> bytes:
+    frames = []
+    for i in range(n):
+        code12 = int(2048 + 2000 * np.sin(i / 200.0))
+        payload = struct.pack("<IHHHH", i * 10, 1000 + i % 50, 2000 + i % 30, 3000 + i % 70, code12)
+        frames.append(bytes([0xA5]) + payload + bytes([sum(payload) & 0xFF, 0x5A]))
+    return b"".join(frames)
+
+
+def make_json_objs(n: int) -> list:
+    return [{"t": i * 0.01, "voltage": float(np.sin(i / 200.0)), "uric": 1000 + i % 50,
+             "ascorbic": 2000 + i % 30, "glucose": 3000 + i % 70} for i in range(n)]
+
+
+def make_json_stream(n: int) -> bytes:
+    return "".join(json.dumps(o) + "\n" for o in make_json_objs(n)).encode()
+
+
+def make_batch(n: int, sweep: bool = False) -> FrameBatch:
+    """sweep=True 时电压单调上升（电压-葡萄糖图上是一整圈进行中的扫描）"""
+    i = np.arange(n, dtype=np.float64)
+    voltage = np.linspace(0.0, 0.8, n) if sweep else 0.4 + 0.4 * np.sin(i / 200.0)
+    return FrameBatch.from_columns(i * 0.01, voltage, 1000 + i % 50, 2000 + i % 30, 3000 + i % 70,
+                                   recv_ts=time.time())
+
+
+def chunks(data: bytes, size: int):
+    return [data[p:p + size] for p in range(0, len(data), size)]
+
+
+def best_of(fn, repeat: int) -> float:
+    """重复 repeat 次取最快一次的耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+# =========================
+# 各阶段
+# =========================
+def bench_decode(n: int, repeat: int) -> dict:
+    bin_chunks = chunks(make_binary_stream(n), 256)
+    json_chunks = chunks(make_json_stream(n), 256)
+
+    def run_binary():
+        dec = BinaryFrameDecoder()
+        got = sum(len(dec.feed(c)) for c in bin_chunks)
+        assert got == n, got
+
+    def run_json():
+        dec = JsonFrameDecoder()
+        got = sum(len(dec.feed(c)) for c in json_chunks)
+        assert got == n, got
+
+    return {
+        "decode.binary": metric(n / best_of(run_binary, repeat), "frames/s", "higher"),
+        "decode.json": metric(n / best_of(run_json, repeat), "frames/s", "higher"),
+    }
+
+
+def bench_parse(n: int, repeat: int) -> dict:
+    cfg = AppConfig()
+    objs = make_json_objs(n)
+
+    def run_per_frame():
+        for o in objs:
+            frame_to_engineering(parse_frame(o, cfg), cfg)
+
+    def run_batch(size):
+        parser = FrameParser(cfg)
+        for p in range(0, n, size):
+            batch_to_engineering(parser.parse_batch(objs[p:p + size]), cfg)
+
+    out = {"parse.per_frame": metric(n / best_of(run_per_frame, repeat), "frames/s", "higher")}
+    for size in GUI_BATCHES:
+        out[f"parse.batch.{size}"] = metric(n / best_of(lambda: run_batch(size), repeat), "frames/s", "higher")
+    return out
+
+
+def bench_filters(n: int, repeat: int) -> dict:
+    values = np.column_stack([1000 + np.sin(np.arange(n) / 50.0) * 100 + np.random.default_rng(0).normal(0, 5, n)
+                              for _ in range(3)])
+    out = {}
+    for size in GUI_BATCHES:
+        blocks = [values[p:p + size] for p in range(0, n, size)]
+        for ft in FilterType:
+            def run(ft=ft):
+                bank = StreamFilterBank(3, ft, window_size=5, kalman_Q=0.01, kalman_R=0.1, savgol_order=2)
+                for b in blocks:
+                    bank.process(b)
+            out[f"filter.{ft.name.lower()}.batch.{size}"] = metric(n / best_of(run, repeat), "frames/s", "higher")
+    return out
+
+
+def bench_charts(app_mod, app, repeat: int) -> dict:
+    from PySide6.QtCharts import QChartView
+    window = app_mod.MainWindow()
+    window.resize(1280, 800)
+    window.show()
+    dp = window.data_page
+    app.processEvents()
+
+    charts = (
+        ("time_glucose", 0, dp.update_time_glucose_chart, False),
+        ("volt_uric", 1, dp.update_volt_uric_chart, False),
+        ("volt_glucose", 3, dp.update_volt_glucose_chart, True),
+    )
+    out = {}
+    for name, index, update, sweep in charts:
+        dp.switch_chart(index)
+        view = dp.chart_stack.widget(index).findChild(QChartView)
+        for points in CHART_POINTS:
+            dp.clear_charts()
+            dp._reset_filters()
+            # 电压曲线的环形缓冲缺省只保留 max_volt_data 点：按本轮点数重建，测的是该点数下的刷新代价
+            dp.voltage_uric_data = RingSeries(points)
+            dp.voltage_ascorbic_data = RingSeries(points)
+            dp._process_batch(make_batch(points, sweep=sweep))
+
+            def render():
+                update()
+                view.grab()
+
+            render()
+            # 单次刷新很快：一轮内连续刷新 10 次取平均，再取各轮最快
+            out[f"chart.{name}.{points}"] = metric(
+                best_of(lambda: [update() for _ in range(10)], repeat) / 10 * 1000.0, "ms", "lower")
+            out[f"chart.{name}.{points}.render"] = metric(
+                best_of(lambda: [render() for _ in range(10)], repeat) / 10 * 1000.0, "ms", "lower")
+    dp.close_session()
+    window.close()
+    return out
+
+
+def bench_save(app_mod, app, n: int, repeat: int) -> dict:
+    window = app_mod.MainWindow()
+    dp = window.data_page
+    dp.table_model.set_max_rows(n)
+    dp.table_model.append_batch(make_batch(n))
+    tmp = tempfile.mkdtemp()
+    batch = make_batch(n)
+
+    counter = iter(range(1 << 30))
+
+    def run_csv():
+        rows = dp.table_model.row_texts()
+        assert dp._write_data_to_csv(rows, os.path.join(tmp, f"csv_{next(counter)}.csv"))
+
+    def run_session(size):
+        with SessionWriter(os.path.join(tmp, f"session_{next(counter)}.cgms"), {}) as w:
+            for p in range(0, n, size):
+                w.append(batch[p:p + size])
+
+    out = {"save.csv": metric(n / best_of(run_csv, repeat), "rows/s", "higher")}
+    for size in GUI_BATCHES:
+        out[f"save.session.batch.{size}"] = metric(n / best_of(lambda: run_session(size), repeat), "rows/s", "higher")
+    window.close()
+    return out
+
+
+# =========================
+# 结果与回退判断
+# =========================
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """返回 [(名称, 基线, 当前, 变化比例, 是否回退)]；变化比例 > 0 表示变好"""
+    rows = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        if cur["better"] == "higher":
+            change = cur["value"] / base["value"] - 1.0
+        else:
+            change = base["value"] / cur["value"] - 1.0 if cur["value"] else float("inf")
+        rows.append((name, base["value"], cur["value"], change, change < -threshold))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quick", action="store_true", help="缩小数据量（冒烟检查，数字不作基线）")
+    ap.add_argument("--repeat", type=int, default=5, help="每项重复次数（取最快一次）")
+    ap.add_argument("--only", help="只跑名称以此开头的阶段：decode / parse / filter / chart / save")
+    ap.add_argument("--out", help="结果 JSON 路径（缺省 benchmarks/results/bench_<时间>.json）")
+    ap.add_argument("--baseline", help="基线结果 JSON；与之比较并判断回退")
+    ap.add_argument("--threshold", type=float, default=0.2, help="允许的最大变差比例（0.2 = 20%%）")
+    args = ap.parse_args()
+
+    n = 20000 if args.quick else 100000
+    repeat = 2 if args.quick else args.repeat
+
+    def wanted(stage: str) -> bool:
+        return not args.only or stage.startswith(args.only)
+
+    results = {}
+    if wanted("decode"):
+        results.update(bench_decode(n, repeat))
+    if wanted("parse"):
+        results.update(bench_parse(n // 5, repeat))
+    if wanted("filter"):
+        results.update(bench_filters(n, repeat))
+    if wanted("chart") or wanted("save"):
+        app_mod = load_app_module()
+        app = app_mod.QApplication.instance() or app_mod.QApplication([])
+        if wanted("chart"):
+            results.update(bench_charts(app_mod, app, repeat))
+        if wanted("save"):
+            results.update(bench_save(app_mod, app, n // 5, repeat))
+
+    for name, m in results.items():
+        print(f"{name:<32} {m['value']:>14,.3f} {m['unit']}")
+
+    doc = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "numpy": np.__version__, "node": platform.node()},
+        "args": {"quick": args.quick, "repeat": repeat, "frames": n},
+        "results": results,
+    }
+    out = args.out or str(HERE / "results" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {out}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    rows = compare(results, baseline, args.threshold)
+    print(f"\n与基线比较（{args.baseline}，阈值 {args.threshold:.0%}）")
+    for name, base, cur, change, regressed in rows:
+        print(f"{name:<32} {base:>14,.3f} -> {cur:>14,.3f}  {change:>+7.1%}{'  <-- 回退' if regressed else ''}")
+    regressions = [r for r in rows if r[4]]
+    if regressions:
+        print(f"{len(regressions)} 项回退")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# cgm_daemon.py
+# 无界面采集程序：读串口 -> 解码 -> 工程量换算 -> 滤波 -> 写二进制会话文件（不加载 Qt）
+# 与 GUI 共用 acquisition（每台设备的解码 / 换算 / 滤波）/ recorder。
+# 一个进程可同时采集多个串口（共用一个 I/O 线程，每台设备独立的解码 / 滤波状态和会话文件）；
+# 串口以独占方式打开，也可以在一台机器上并行运行多个进程
+#
+# 用法：
+#   python cgm_daemon.py --port /dev/ttyUSB0 [--baud 115200] [--binary] [--out ./serial_data]
+#   python cgm_daemon.py --port board1=/dev/ttyUSB0 --port board2=/dev/ttyUSB1 --binary
+#   python cgm_daemon.py --port COM3 --config lab1.json --duration 86400
+#   python cgm_daemon.py --replay raw_20240101_120000.cgmraw --speed 0     # 回放原始录制（不需要硬件）
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+import serial
+
+from acquisition import AcquisitionPipeline, MultiPortReader, port_tag
+from app_config import AppConfig
+from raw_capture import RawCaptureReader
+from recorder import DURABILITY_MODES, SessionRecorder
+
+
+def open_serial(port: str, baud: int):
+    kwargs = {"port": port, "baudrate": baud, "timeout": 0.1}
+    if os.name == "posix":
+        # 同一串口只允许一个进程打开：并行运行时避免两个进程互相抢数据
+        kwargs["exclusive"] = True
+    return serial.Serial(**kwargs)
+
+
+def parse_port_spec(spec: str):
+    """"设备ID=串口" 或 "串口"（设备 ID 取串口名）"""
+    if "=" in spec:
+        dev, port = spec.split("=", 1)
+        return port_tag(dev), port
+    return port_tag(spec), spec
+
+
+def replay_chunks(dev: str, path: str, speed: float, stop: threading.Event):
+    start = time.perf_counter()
+    for t, data in RawCaptureReader(path).records():
+        if stop.is_set():
+            return
+        if speed > 0:
+            delay = start + t / speed - time.perf_counter()
+            if delay > 0 and stop.wait(delay):
+                return
+        yield dev, data
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="CGM 无界面采集：串口 -> 解码 -> 滤波 -> 会话文件（.cgms）")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--port", action="append",
+                     help="串口，可写成 设备ID=串口；重复给出即同时采集多台设备")
+    src.add_argument("--replay", help="原始字节录制文件（.cgmraw），代替串口作为数据源")
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--binary", action="store_true", help="15 字节二进制帧协议（缺省为 JSON 行）")
+    ap.add_argument("--speed", type=float, default=1.0, help="回放速度倍数，0 = 尽快")
+    ap.add_argument("--config", help="配置文件（缺省为程序旁的 app_config.json），只读")
+    ap.add_argument("--out", help="会话文件目录（缺省为配置里的 save_path）")
+    ap.add_argument("--name", help="回放时的设备 ID（缺省取录制文件名）")
+    ap.add_argument("--durability", choices=DURABILITY_MODES, help="覆盖配置里的写盘持久性")
+    ap.add_argument("--duration", type=float, default=0.0, help="运行多少秒后自动退出，0 = 一直运行")
+    ap.add_argument("--status-interval", type=float, default=10.0, help="状态输出间隔（秒），0 = 不输出")
+    args = ap.parse_args(argv)
+
+    cfg = AppConfig.load(args.config)
+    sv = cfg.save
+    out_dir = args.out or sv.save_path
+    os.makedirs(out_dir, exist_ok=True)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    # 数据源：设备 ID -> 端口名；同一进程内的所有串口由一个 MultiPortReader 读取
+    binary_mode = args.binary
+    ports = {}
+    if args.port:
+        specs = [parse_port_spec(p) for p in args.port]
+        if len({dev for dev, _ in specs}) != len(specs):
+            print("设备 ID 重复，请用 设备ID=串口 区分", file=sys.stderr)
+            return 2
+        for dev, name in specs:
+            try:
+                ports[dev] = open_serial(name, args.baud)
+            except Exception as e:
+                print(f"无法打开串口 {name}: {e!r}", file=sys.stderr)
+                for p in ports.values():
+                    p.close()
+                return 2
+        devices = {dev: name for dev, name in specs}
+        chunks = MultiPortReader(ports).chunks(stop)
+    else:
+        dev = port_tag(args.name or args.replay)
+        binary_mode = binary_mode or bool(RawCaptureReader(args.replay).meta.get("binary_mode", False))
+        devices = {dev: args.replay}
+        chunks = replay_chunks(dev, args.replay, args.speed, stop)
+
+    # 每台设备独立的解码 / 滤波状态和会话文件（设备 ID 写进文件名和文件头）
+    now = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pipelines = {}
+    recorders = {}
+    for dev, source in devices.items():
+        pipelines[dev] = AcquisitionPipeline(cfg, binary_mode, device_id=dev)
+        path = os.path.join(out_dir, f"session_{dev}_{now}_{os.getpid()}.cgms")
+        header = dict(cfg.to_dict(), device={"id": dev, "source": source, "binary_mode": binary_mode})
+        recorders[dev] = SessionRecorder(
+            path, config=header, flush_rows=sv.flush_rows, flush_interval_ms=sv.save_interval_ms,
+            durability=args.durability or sv.durability, max_queue=sv.max_queue_batches,
+        )
+        recorders[dev].start()
+        print(f"[{dev}] {source} -> {path}（{'二进制' if binary_mode else 'JSON'}协议）", flush=True)
+
+    t_start = time.monotonic()
+    next_status = t_start + args.status_interval
+
+    def status(dev: str) -> str:
+        pl, st = pipelines[dev], recorders[dev].stats()
+        return (f"[{dev}] {time.monotonic() - t_start:.0f}s 收到 {pl.bytes_in} 字节，"
+                f"{pl.frames_out} 帧，校验失败 {pl.checksum_errors}，"
+                f"已写入 {st['rows_written']} 行，丢弃 {st['dropped_rows']} 行")
+
+    try:
+        for dev, data in chunks:
+            if isinstance(data, Exception):
+                print(f"[{dev}] 串口错误，停止采集该设备: {data!r}", file=sys.stderr)
+                recorders[dev].stop()
+                ports.pop(dev).close()
+            elif data:
+                batch = pipelines[dev].feed(data)
+                if len(batch):
+                    recorders[dev].submit(batch)
+            now_m = time.monotonic()
+            if args.duration and now_m - t_start >= args.duration:
+                break
+            if args.status_interval and now_m >= next_status:
+                for d in pipelines:
+                    print(status(d), flush=True)
+                next_status = now_m + args.status_interval
+    except Exception as e:
+        print(f"采集中断: {e!r}", file=sys.stderr)
+    finally:
+        stop.set()
+        unfinished = [dev for dev, rec in recorders.items() if not rec.stop()]
+        for p in ports.values():
+            p.close()
+
+    # 写盘线程是守护线程，进程退出就没了：没写完的再等一会儿，仍未结束的报告出来（文件没有索引）
+    failed = False
+    for dev in unfinished:
+        print(f"[{dev}] 等待写盘线程写完剩余数据…", file=sys.stderr, flush=True)
+        if not recorders[dev].wait(60.0):
+            print(f"[{dev}] 写盘未完成，会话文件没有索引（可扫描恢复）: {recorders[dev].stats()['file']}",
+                  file=sys.stderr)
+            failed = True
+    for dev, rec in recorders.items():
+        print(status(dev), flush=True)
+        st = rec.stats()
+        if st["last_error"]:
+            print(f"[{dev}] 写盘错误: {st['last_error']}", file=sys.stderr)
+        failed = failed or bool(st["write_errors"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+# chart_buffer.py
+# 曲线数据缓冲（不依赖 Qt）：定长环形缓冲（批量追加、连续视图直接喂给 QLineSeries.replaceNp、O(1) 取坐标轴范围）
+# 以及整段历史 + min/max 金字塔抽稀
+from __future__ import annotations
+
+import numpy as np
+
+
+class RingSeries:
+    """
+    最多保留 capacity 个 (x, y) 点，超出后丢弃最旧的点。
+    - 底层数组长度为 2 * capacity，写满时把有效数据整体搬回开头（均摊 O(1)），
+      因此 xs() / ys() 始终是连续视图，可以直接交给 replaceNp（不拷贝）
+    - 坐标范围按固定大小的块维护：每个完整块只在写入时算一次 min/max，
+      bounds() 只需合并 capacity / BLOCK 个块摘要，再加上首尾两个不完整块
+    """
+
+    BLOCK = 64
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._x = np.empty(2 * self.capacity, dtype=np.float64)
+        self._y = np.empty(2 * self.capacity, dtype=np.float64)
+        self._start = 0         # 有效数据在底层数组中的起点
+        self._end = 0
+        self._total = 0         # 累计写入点数（块编号按它计算）
+
+        # 完整块摘要：第 i 行对应块编号 _block0 + i，列为 xmin, xmax, ymin, ymax
+        self._blocks = np.empty((0, 4), dtype=np.float64)
+        self._block0 = 0
+        self._bounds = None
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def xs(self) -> np.ndarray:
+        return self._x[self._start:self._end]
+
+    def ys(self) -> np.ndarray:
+        return self._y[self._start:self._end]
+
+    def clear(self):
+        self._start = self._end = 0
+        self._total = 0
+        self._blocks = np.empty((0, 4), dtype=np.float64)
+        self._block0 = 0
+        self._bounds = None
+
+    def extend(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n = x.shape[0]
+        if n == 0:
+            return
+        if n > self.capacity:
+            # 一批就超过容量：只有最后 capacity 个点会留下
+            self._total += n - self.capacity
+            x, y = x[-self.capacity:], y[-self.capacity:]
+            n = self.capacity
+
+        size = len(self)
+        keep = min(size, self.capacity - n)
+        if self._end + n > self._x.shape[0]:
+            # 搬移：把仍保留的旧点挪到开头
+            src = slice(self._end - keep, self._end)
+            self._x[:keep] = self._x[src]
+            self._y[:keep] = self._y[src]
+            self._start, self._end = 0, keep
+        else:
+            self._start = self._end - keep
+        self._x[self._end:self._end + n] = x
+        self._y[self._end:self._end + n] = y
+        self._end += n
+
+        first_new = self._total
+        self._total += n
+        self._update_blocks(first_new)
+        self._bounds = None
+
+    # ---------- 块摘要 ----------
+    def _abs_start(self) -> int:
+        return self._total - len(self)
+
+    def _update_blocks(self, first_new: int):
+        B = self.BLOCK
+        # 本次写入后新完成、且起点仍在缓冲内的块：[b_lo, b_hi)
+        abs0 = self._abs_start()
+        b_lo = max(first_new // B, -(-abs0 // B))
+        b_hi = self._total // B
+        if b_hi > b_lo:
+            off = self._start + (b_lo * B - abs0)
+            cnt = (b_hi - b_lo) * B
+            xs = self._x[off:off + cnt].reshape(-1, B)
+            ys = self._y[off:off + cnt].reshape(-1, B)
+            new = np.column_stack((xs.min(axis=1), xs.max(axis=1), ys.min(axis=1), ys.max(axis=1)))
+            if self._block0 + len(self._blocks) != b_lo:
+                self._blocks = self._blocks[:0]
+                self._block0 = b_lo
+            self._blocks = np.concatenate((self._blocks, new))
+        self._drop_stale_blocks()
+
+    def _drop_stale_blocks(self):
+        # 起点不在有效区间内的块（已被部分 / 全部丢弃）不再使用，首部残块在 bounds() 里直接计算
+        first_full = -(-self._abs_start() // self.BLOCK)
+        drop = first_full - self._block0
+        if drop > 0:
+            self._blocks = self._blocks[drop:]
+            self._block0 = first_full
+
+    def bounds(self):
+        """(xmin, xmax, ymin, ymax)；无数据返回 None。结果缓存到下次写入"""
+        if self._bounds is not None or not len(self):
+            return self._bounds
+        B = self.BLOCK
+        abs0 = self._abs_start()
+        n_blocks = len(self._blocks)
+        lo = (self._block0 * B - abs0) if n_blocks else len(self)
+        hi = lo + n_blocks * B if n_blocks else len(self)
+
+        parts = []
+        for a, b in ((0, lo), (hi, len(self))):
+            if b > a:
+                xs = self._x[self._start + a:self._start + b]
+                ys = self._y[self._start + a:self._start + b]
+                parts.append((xs.min(), xs.max(), ys.min(), ys.max()))
+        if n_blocks:
+            blk = self._blocks
+            parts.append((blk[:, 0].min(), blk[:, 1].max(), blk[:, 2].min(), blk[:, 3].max()))
+
+        self._bounds = (
+            float(min(p[0] for p in parts)),
+            float(max(p[1] for p in parts)),
+            float(min(p[2] for p in parts)),
+            float(max(p[3] for p in parts)),
+        )
+        return self._bounds
+
+
+class LodSeries:
+    """
+    整个会话的 (x, y) 历史（x 单调不减，例如设备时间），按屏幕分辨率抽稀后再交给图表。
+    - 原始数据存在按倍数扩容的 float64 数组里（每点 16 字节，几天的数据也只有几十 MB）
+    - 抽稀用 min/max 金字塔：第 k 层每个桶覆盖 BASE * 2**k 个点，记录桶内 y 最小 / 最大值的下标；
+      追加数据时只补算新完成的桶（均摊 O(1)），查询时选桶数不超过像素宽度的那一层，
+      每桶输出最小、最大两个点（按出现顺序），尖峰不会被抽掉
+    - decimate(x0, x1, width) 的代价只与像素宽度有关，与历史长度无关
+    x 回退（设备重启、计时清零）时不丢历史：回退点之后的数据整体平移，接在已有历史的末尾
+    （累计平移量见 x_offset，新数据的 x = 设备时间 + x_offset）
+    """
+
+    BASE = 8
+
+    def __init__(self, initial_capacity: int = 4096):
+        cap = max(16, int(initial_capacity))
+        self._x = np.empty(cap, dtype=np.float64)
+        self._y = np.empty(cap, dtype=np.float64)
+        self._n = 0
+        self.x_offset = 0.0
+        # 每层：[imin 数组, imax 数组, 已完成桶数]（按桶编号；数组与 _x/_y 一样按倍数扩容，只有前 count 个有效）
+        self._levels = []
+
+    def __len__(self) -> int:
+        return self._n
+
+    def xs(self) -> np.ndarray:
+        return self._x[:self._n]
+
+    def ys(self) -> np.ndarray:
+        return self._y[:self._n]
+
+    def last_x(self):
+        return float(self._x[self._n - 1]) if self._n else None
+
+    def clear(self):
+        self._n = 0
+        self.x_offset = 0.0
+        self._levels = []
+
+    def extend(self, x, y):
+        x = np.asarray(x, dtype=np.float64) + self.x_offset
+        y = np.asarray(y, dtype=np.float64)
+        n = x.shape[0]
+        if n == 0:
+            return
+        # 回退点（很少出现，逐个处理）：之后的点平移到与前一点同一时刻，x 保持单调不减
+        prev = self._x[self._n - 1] if self._n else x[0]
+        for i in np.flatnonzero(np.diff(x, prepend=prev) < 0):
+            shift = (x[i - 1] if i else prev) - x[i]
+            x[i:] += shift
+            self.x_offset += shift
+        need = self._n + n
+        if need > self._x.shape[0]:
+            cap = max(need, 2 * self._x.shape[0])
+            for name in ("_x", "_y"):
+                old = getattr(self, name)
+                new = np.empty(cap, dtype=np.float64)
+                new[:self._n] = old[:self._n]
+                setattr(self, name, new)
+        self._x[self._n:need] = x
+        self._y[self._n:need] = y
+        self._n = need
+        self._update_levels()
+
+    # ---------- 金字塔 ----------
+    def _update_levels(self):
+        y = self._y
+        size = self.BASE
+        k = 0
+        while self._n // size:
+            n_done = self._n // size
+            if k == len(self._levels):
+                cap = max(16, self._x.shape[0] // size)
+                self._levels.append([np.empty(cap, dtype=np.int64), np.empty(cap, dtype=np.int64), 0])
+            level = self._levels[k]
+            b0 = level[2]
+            if n_done > b0:
+                if n_done > level[0].shape[0]:
+                    cap = max(n_done, 2 * level[0].shape[0])
+                    for j in (0, 1):
+                        new = np.empty(cap, dtype=np.int64)
+                        new[:b0] = level[j][:b0]
+                        level[j] = new
+                if k == 0:
+                    blk = y[b0 * size:n_done * size].reshape(-1, size)
+                    off = np.arange(b0, n_done, dtype=np.int64) * size
+                    new_min = off + blk.argmin(axis=1)
+                    new_max = off + blk.argmax(axis=1)
+                else:
+                    # 由下一层的相邻两个桶合并
+                    cmin, cmax, _ = self._levels[k - 1]
+                    lo_min, hi_min = cmin[2 * b0:2 * n_done:2], cmin[2 * b0 + 1:2 * n_done:2]
+                    lo_max, hi_max = cmax[2 * b0:2 * n_done:2], cmax[2 * b0 + 1:2 * n_done:2]
+                    new_min = np.where(y[hi_min] < y[lo_min], hi_min, lo_min)
+                    new_max = np.where(y[hi_max] > y[lo_max], hi_max, lo_max)
+                level[0][b0:n_done] = new_min
+                level[1][b0:n_done] = new_max
+                level[2] = n_done
+            size *= 2
+            k += 1
+
+    @staticmethod
+    def _edge_extrema(y: np.ndarray, a: int, b: int) -> list:
+        if b <= a:
+            return []
+        seg = y[a:b]
+        return [a + int(seg.argmin()), a + int(seg.argmax())]
+
+    def decimate(self, x0: float, x1: float, width: int):
+        """
+        x ∈ [x0, x1] 内的点抽稀到约 2 * width 个（多带区间外各一个点，线条能连到边缘）。
+        返回 (xs, ys) 连续数组；点数不多时直接返回原始数据的视图。
+        """
+        n = self._n
+        if n == 0:
+            e = np.empty(0, dtype=np.float64)
+            return e, e
+        xs = self._x[:n]
+        i0 = max(0, int(np.searchsorted(xs, x0, side="left")) - 1)
+        i1 = min(n, int(np.searchsorted(xs, x1, side="right")) + 1)
+        count = i1 - i0
+        width = max(1, int(width))
+        # 点数不到一个桶时还没有金字塔，本来也没几个点
+        if count <= 2 * width or not self._levels:
+            return self._x[i0:i1], self._y[i0:i1]
+
+        # 选择桶数不超过 width 的最细一层（层数不够时用最高层）
+        k = 0
+        size = self.BASE
+        while count / size > width and k + 1 < len(self._levels):
+            size *= 2
+            k += 1
+        imin, imax, done = self._levels[k]
+        b0 = -(-i0 // size)
+        b1 = min(i1 // size, done)
+
+        y = self._y
+        if b1 > b0:
+            lo = np.minimum(imin[b0:b1], imax[b0:b1])
+            hi = np.maximum(imin[b0:b1], imax[b0:b1])
+            mid = np.column_stack((lo, hi)).reshape(-1)
+            head = self._edge_extrema(y, i0, b0 * size)
+            tail = self._edge_extrema(y, b1 * size, i1)
+        else:
+            mid = np.empty(0, dtype=np.int64)
+            head = self._edge_extrema(y, i0, i1)
+            tail = []
+        idx = np.concatenate((
+            [i0], sorted(head), mid, sorted(tail), [i1 - 1],
+        )).astype(np.int64)
+        return self._x[idx], y[idx]
@@ -0,0 +1,147 @@
+# cv_cycles.py
+# 循环伏安（CV）按扫描方向增量切圈（不依赖 Qt）：只处理新到的点，已结束的圈冻结不再变化
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CvCycle:
+    """一段已结束的扫描（“一圈”）；index 只对保留下来的圈计数（从 1 开始）"""
+    index: int
+    direction: int          # +1 上扫，-1 下扫
+    x: np.ndarray
+    y: np.ndarray
+    bounds: tuple           # (xmin, xmax, ymin, ymax)
+
+
+class CvCycleSegmenter:
+    """
+    与逐点切圈算法一致：
+      - 相邻两点电压差 |dv| < dv_threshold 视为抖动，点照常加入当前圈
+      - 方向第一次确定后，出现相反方向的一步即换圈：新圈从上一个点 + 当前点开始（曲线连续）
+      - 点数少于 min_points 的圈丢弃
+      - max_points 非 None 时每圈只保留最近 max_points 个点：电压长时间不换向（恒电位 / 非扫描数据）时，
+        进行中的圈不会随会话无限增长，每次重画的点数有上限
+    feed(v, y) 返回本批结束并保留的圈；进行中的圈通过 current_x() / current_y() / current_bounds() 读取
+    """
+
+    def __init__(self, dv_threshold: float = 0.002, min_points: int = 10, max_points: int = None):
+        self.dv_threshold = float(dv_threshold)
+        self.min_points = int(min_points)
+        self.max_points = None if max_points is None else max(self.min_points, int(max_points))
+        self.reset()
+
+    def reset(self):
+        self._x = np.empty(256, dtype=np.float64)
+        self._y = np.empty(256, dtype=np.float64)
+        self._n = 0
+        self._dir = 0               # 当前圈方向，0 = 尚未确定
+        self._bounds = None         # 当前圈的 (xmin, xmax, ymin, ymax)，只增不减
+        self.cycles_kept = 0
+        self.cycles_dropped = 0
+
+    def _start(self) -> int:
+        return self._n - self.max_points if self.max_points is not None and self._n > self.max_points else 0
+
+    def current_x(self) -> np.ndarray:
+        return self._x[self._start():self._n]
+
+    def current_y(self) -> np.ndarray:
+        return self._y[self._start():self._n]
+
+    def current_bounds(self):
+        return self._bounds
+
+    @property
+    def current_index(self) -> int:
+        """进行中的圈若被保留，它将得到的编号"""
+        return self.cycles_kept + 1
+
+    def feed(self, v, y) -> list:
+        v = np.asarray(v, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if v.shape[0] == 0:
+            return []
+
+        # 每一步的方向：与上一个点比较（跨批时“上一个点”是当前圈的最后一点）
+        if self._n:
+            dv = np.diff(v, prepend=self._x[self._n - 1])
+        else:
+            dv = np.concatenate(([0.0], np.diff(v)))
+        step = np.where(np.abs(dv) < self.dv_threshold, 0, np.sign(dv)).astype(np.int8)
+
+        # 找出换向位置：非零步的方向与前一个非零步（含上一批延续下来的方向）不同
+        nz = np.flatnonzero(step)
+        dirs = step[nz]
+        prev_dirs = np.concatenate(([self._dir], dirs[:-1]))
+        breaks = nz[(prev_dirs != 0) & (dirs != prev_dirs)]
+
+        closed = []
+        start = 0
+        for b in breaks.tolist():
+            # b 之前的点属于当前圈；新圈从 b - 1（上一个点）开始
+            self._append(v[start:b], y[start:b])
+            closed.extend(self._close())
+            if b > 0:
+                prev_v, prev_y = v[b - 1], y[b - 1]
+            else:
+                prev_v, prev_y = self._last_closed
+            self._append(np.array([prev_v]), np.array([prev_y]))
+            self._dir = int(step[b])
+            start = b
+        self._append(v[start:], y[start:])
+        if self._dir == 0 and dirs.size:
+            self._dir = int(dirs[0])
+        return closed
+
+    def _append(self, x: np.ndarray, y: np.ndarray):
+        n = x.shape[0]
+        if n == 0:
+            return
+        need = self._n + n
+        if need > self._x.shape[0]:
+            cap = max(need, 2 * self._x.shape[0])
+            self._x = np.concatenate((self._x[:self._n], np.empty(cap - self._n)))
+            self._y = np.concatenate((self._y[:self._n], np.empty(cap - self._n)))
+        self._x[self._n:need] = x
+        self._y[self._n:need] = y
+        self._n = need
+        b = (float(x.min()), float(x.max()), float(y.min()), float(y.max()))
+        if self._bounds is None:
+            self._bounds = b
+        else:
+            o = self._bounds
+            self._bounds = (min(o[0], b[0]), max(o[1], b[1]), min(o[2], b[2]), max(o[3], b[3]))
+        if self.max_points is not None and self._n > 2 * self.max_points:
+            self._trim()
+
+    def _trim(self):
+        """只留最近 max_points 个点（攒到两倍才挪一次，均摊 O(1)），范围按留下的点重算"""
+        keep = self.max_points
+        self._x[:keep] = self._x[self._n - keep:self._n]
+        self._y[:keep] = self._y[self._n - keep:self._n]
+        self._n = keep
+        self._bounds = self._window_bounds()
+
+    def _window_bounds(self) -> tuple:
+        x, y = self.current_x(), self.current_y()
+        return float(x.min()), float(x.max()), float(y.min()), float(y.max())
+
+    def _close(self) -> list:
+        """结束当前圈：够点数就冻结成 CvCycle，然后清空当前圈"""
+        out = []
+        if self._n:
+            self._last_closed = (self._x[self._n - 1], self._y[self._n - 1])
+        if self._n >= self.min_points:
+            self.cycles_kept += 1
+            bounds = self._window_bounds() if self._start() else self._bounds
+            out.append(CvCycle(self.cycles_kept, self._dir, self.current_x().copy(),
+                               self.current_y().copy(), bounds))
+        elif self._n:
+            self.cycles_dropped += 1
+        self._n = 0
+        self._bounds = None
+        return out
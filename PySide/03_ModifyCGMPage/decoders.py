@@ -0,0 +1,269 @@
+# decoders.py
+# 串口字节流 -> 帧 的解析器（不依赖 Qt，可在 GUI / 工作线程 / 无界面脚本中复用）
+from __future__ import annotations
+
+import json
+import re
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# =========================
+# 1) 二进制协议 (STM32 DataPacket)
+# =========================
+# Head(1) + Time(4) + Uric(2) + Ascorbic(2) + Glucose(2) + Code12(2) + Checksum(1) + Tail(1)
+# Total = 15 Bytes, Little Endian
+
+FRAME_LEN = 15
+FRAME_HEAD = 0xA5
+FRAME_TAIL = 0x5A
+
+FRAME_DTYPE = np.dtype([
+    ("head", "u1"),
+    ("ms", "<u4"),
+    ("uric", "<u2"),
+    ("ascorbic", "<u2"),
+    ("glucose", "<u2"),
+    ("code12", "<u2"),
+    ("checksum", "u1"),
+    ("tail", "u1"),
+])
+
+
+def decode_binary_frames(buffer):
+    """
+    一次 NumPy 扫描找出 buffer 中所有合法帧。
+    返回 (frames, consumed, n_bad)：
+        frames   : FRAME_DTYPE 结构化数组
+        consumed : 应从 buffer 头部丢弃的字节数（已解析帧 + 无法对齐的垃圾字节）
+        n_bad    : 帧头帧尾正确但校验和失败的候选帧数量
+    结果与逐字节 pop(0) 重新对齐的旧算法完全一致。
+    """
+    buf = np.frombuffer(buffer, dtype=np.uint8)
+    n = buf.size
+    if n < FRAME_LEN:
+        return np.empty(0, dtype=FRAME_DTYPE), 0, 0
+
+    # 1. 帧头 / 帧尾掩码（只看能放下完整一帧的起点）
+    last = n - FRAME_LEN
+    starts = np.flatnonzero(buf[:last + 1] == FRAME_HEAD)
+    starts = starts[buf[starts + FRAME_LEN - 1] == FRAME_TAIL]
+
+    # 2. 校验和掩码：在步长视图上对 Payload(索引 1..12) 求和
+    windows = sliding_window_view(buf, FRAME_LEN)[starts]
+    calc_sum = windows[:, 1:13].sum(axis=1, dtype=np.uint32) & 0xFF
+    ok = calc_sum == windows[:, 13]
+    valid = starts[ok]
+
+    # 3. 贪心对齐：接受一帧后，落在该帧内部的候选起点不再考虑（极少见，走慢路径）
+    if valid.size > 1 and np.any(np.diff(valid) < FRAME_LEN):
+        keep = []
+        next_free = -1
+        for s in valid.tolist():
+            if s >= next_free:
+                keep.append(s)
+                next_free = s + FRAME_LEN
+        valid = np.asarray(keep, dtype=np.intp)
+
+    # 4. 只统计落在已接受帧之外的校验失败
+    bad = starts[~ok]
+    if bad.size and valid.size:
+        idx = np.searchsorted(valid, bad, side="right") - 1
+        covered = (idx >= 0) & (bad < valid[np.maximum(idx, 0)] + FRAME_LEN)
+        bad = bad[~covered]
+
+    # 5. 最后一帧之后、不足一帧长度的尾巴保留到下一包
+    end = int(valid[-1]) + FRAME_LEN if valid.size else 0
+    consumed = max(end, last + 1)
+
+    frames = np.ascontiguousarray(sliding_window_view(buf, FRAME_LEN)[valid]).view(FRAME_DTYPE).reshape(-1)
+    return frames, consumed, int(bad.size)
+
+
+class BinaryFrameDecoder:
+    """带缓存的批量二进制解析器：feed(bytes) -> 本次新解析出的全部帧（结构化数组，按列访问）"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.frames_decoded = 0
+        self.checksum_errors = 0
+        self.discarded_bytes = 0
+
+    def feed(self, data: bytes) -> np.ndarray:
+        self.buffer.extend(data)
+        frames, consumed, n_bad = decode_binary_frames(self.buffer)
+        if consumed:
+            del self.buffer[:consumed]
+
+        self.frames_decoded += len(frames)
+        self.checksum_errors += n_bad
+        self.discarded_bytes += consumed - len(frames) * FRAME_LEN
+        return frames
+
+    def reset(self):
+        self.buffer.clear()
+
+
+# =========================
+# 2) JSON 协议（{...} 对象流，可跨包拼接）
+# =========================
+
+# 扫描时只需要关心这四个字符，其余字符用正则整段跳过
+_JSON_TOKEN = re.compile(r'[{}"\\]')
+
+
+class JsonStreamScanner:
+    """
+    可续扫的 JSON 对象切分器：深度 / 是否在字符串内 / 转义状态在两次 feed 之间保留，
+    每个字节只扫描一次；未完成对象的文本按块暂存，完成时只拼接一次。
+    feed(text) -> 本次完成的对象文本列表（"{...}"）
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self._parts = []        # 当前未完成对象已收到的文本块
+        self._pending = 0       # 这些文本块的总长度
+
+    def pending_len(self) -> int:
+        return self._pending
+
+    @property
+    def idle(self) -> bool:
+        """不在任何对象内部（可以走按行快速路径）"""
+        return self.depth == 0 and not self._parts
+
+    def feed(self, text: str) -> list:
+        out = []
+        start = 0 if self.depth > 0 else None    # 当前对象在本块中的起点
+        skip = -1                                  # 被反斜杠转义的下标
+        if self.esc:
+            skip = 0
+            self.esc = False
+
+        for m in _JSON_TOKEN.finditer(text):
+            i = m.start()
+            if i == skip:
+                continue
+            ch = m.group()
+            if self.in_str:
+                if ch == "\\":
+                    if i + 1 < len(text):
+                        skip = i + 1
+                    else:
+                        self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+                continue
+            if ch == '"':
+                # 对象外的引号只可能是垃圾数据，不进入字符串状态
+                self.in_str = self.depth > 0
+            elif ch == "{":
+                if self.depth == 0:
+                    start = i
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    out.append("".join(self._parts) + text[start:i + 1])
+                    self._parts = []
+                    self._pending = 0
+                    start = None
+
+        if self.depth > 0 and start is not None:
+            self._parts.append(text[start:])
+            self._pending += len(text) - start
+        return out
+
+
+class JsonFrameDecoder:
+    """
+    feed(bytes) -> 本次拼出的完整 JSON 对象（dict 列表）；不完整的对象留在扫描器里等下一包。
+    line_delimiter 非空时，对“一行一个对象”的数据走快速路径：整行直接 json.loads，
+    只有解析失败 / 对象跨行时才逐字符扫描。
+    重新同步：对象未闭合时，遇到顶格以 "{" 开头的新行、字符串跨行或累计超过 MAX_OBJECT_LEN，
+    丢弃这个残缺对象（计入 bad_objects）。
+    """
+
+    MAX_OBJECT_LEN = 64 * 1024
+
+    def __init__(self, line_delimiter: str = "\n"):
+        self.line_delimiter = line_delimiter
+        self.scanner = JsonStreamScanner()
+        self.bad_objects = 0
+        self._tail = ""         # 快速路径下尚未遇到分隔符的行尾
+        self._line_start = True  # 下一块数据是否从新行开头开始
+
+    def feed(self, data: bytes) -> list:
+        text = data.decode(errors="ignore")
+        objs = []
+        delim = self.line_delimiter
+
+        if not delim:
+            self._scan(text, objs)
+            return objs
+
+        if self._tail:
+            text = self._tail + text
+            self._tail = ""
+
+        lines = text.split(delim)
+        tail = lines.pop()
+        fresh = self._line_start
+        for line in lines:
+            if fresh and not self.scanner.idle and line[:1] == "{":
+                self._discard_partial()
+            fresh = True
+            if self.scanner.idle:
+                stripped = line.strip()
+                if stripped[:1] == "{" and stripped[-1:] == "}":
+                    try:
+                        d = json.loads(stripped)
+                    except ValueError:
+                        d = None
+                    if isinstance(d, dict):
+                        objs.append(d)
+                        continue
+            self._scan(line + delim, objs)
+            if self.scanner.in_str:
+                # 合法 JSON 的字符串里不会出现原始换行
+                self._discard_partial()
+
+        if len(tail) < 4096 and self.scanner.idle and "}" not in tail:
+            # 一行的开头还没收全：先攒着，等分隔符到了整行走快速路径。
+            # 已在对象内部（例如设备不发分隔符、对象紧挨着发送）或行尾可能含完整对象时直接交给可续扫的扫描器，不等分隔符
+            self._tail = tail
+            self._line_start = fresh
+        else:
+            self._scan(tail, objs)
+            self._line_start = False
+        return objs
+
+    def _scan(self, text: str, objs: list):
+        self._load_all(self.scanner.feed(text), objs)
+        if self.scanner.depth > 0 and self.scanner.pending_len() > self.MAX_OBJECT_LEN:
+            self._discard_partial()
+
+    def _discard_partial(self):
+        self.bad_objects += 1
+        self.scanner.reset()
+
+    def _load_all(self, texts: list, objs: list):
+        for t in texts:
+            try:
+                d = json.loads(t)
+            except json.JSONDecodeError:
+                self.bad_objects += 1
+                continue
+            if isinstance(d, dict):
+                objs.append(d)
+
+    def reset(self):
+        self.scanner.reset()
+        self._tail = ""
+        self._line_start = True
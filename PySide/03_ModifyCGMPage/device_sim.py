@@ -0,0 +1,343 @@
+# device_sim.py
+# STM32 设备模拟器 / 负载发生器（不依赖 Qt）：按设定的帧率和波特率向伪终端写 15 字节二进制帧或 JSON 行，
+# 可注入噪声、校验和错误和丢字节；电压波形取 DPV（01_Learn/MyFunction/02_DPV_Generate.py）、CV 三角波或恒压
+#
+# 用法（伪终端仅 POSIX）：
+#   python device_sim.py --binary --rate 500                        # 打印伪终端路径，GUI / cgm_daemon 打开它即可
+#   python device_sim.py --binary --rate 20000 --baud 0 --link /tmp/cgm_sim
+#   python device_sim.py --wave dpv --noise 20 --corrupt 0.01 --drop 0.0001
+#   python device_sim.py --binary --count 100000 --capture sim.cgmraw   # 直接生成原始录制文件（不需要伪终端，结果可复现）
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app_config import CODE12_MAX, CODE12_VREF, ProtocolConfig
+from decoders import FRAME_DTYPE, FRAME_HEAD, FRAME_LEN, FRAME_TAIL
+from raw_capture import RawCaptureWriter
+
+HERE = Path(__file__).resolve().parent
+DPV_GENERATOR = HERE.parent / "01_Learn" / "MyFunction" / "02_DPV_Generate.py"
+
+WAVEFORMS = ("cv", "dpv", "const")
+
+# 各通道的合成响应（原始计数）：基线 + 以某电位为中心的高斯峰
+# 通道 -> (峰电位 V, 峰宽 V, 峰高, 基线)
+CHANNEL_PEAKS = {
+    "uric": (0.35, 0.05, 1200.0, 800.0),
+    "ascorbic": (0.10, 0.06, 900.0, 600.0),
+    "glucose": (0.55, 0.08, 1500.0, 1000.0),
+}
+
+
+def load_dpv_generator():
+    """按文件路径加载 generate_dpv_voltage_array（文件名以数字开头，不能直接 import）"""
+    spec = importlib.util.spec_from_file_location("dpv_generate", DPV_GENERATOR)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.generate_dpv_voltage_array
+
+
+def make_waveform(kind: str, frame_rate: float, v_low: float = 0.0, v_high: float = 0.8,
+                  scan_rate: float = 0.1, dpv_step_mv: float = 2.0, dpv_amp_mv: float = 50.0,
+                  dpv_width_ms: float = 60.0, dpv_period_ms: float = 1000.0) -> np.ndarray:
+    """一个周期的电压序列（V，每帧一个点），模拟器循环播放"""
+    if kind == "dpv":
+        gen = load_dpv_generator()
+        volts, _ = gen(v_low * 1000.0, v_high * 1000.0, dpv_step_mv, dpv_amp_mv,
+                       dpv_width_ms, dpv_period_ms, frame_rate)
+        if len(volts) == 0:
+            raise ValueError("帧率太低：一个 DPV 脉冲周期内不足一个采样点")
+        return np.asarray(volts, dtype=np.float64) / 1000.0
+    if kind == "cv":
+        # 扫描速率 scan_rate（V/s）下往返一次
+        n = max(2, int(round(abs(v_high - v_low) / scan_rate * frame_rate)))
+        return np.concatenate([np.linspace(v_low, v_high, n, endpoint=False),
+                               np.linspace(v_high, v_low, n, endpoint=False)])
+    if kind == "const":
+        return np.array([float(v_low)])
+    raise ValueError(f"unknown waveform: {kind!r}")
+
+
+def channel_response(voltage: np.ndarray, center: float, width: float, height: float,
+                     baseline: float) -> np.ndarray:
+    return baseline + height * np.exp(-0.5 * ((voltage - center) / width) ** 2)
+
+
+class DeviceSimulator:
+    """
+    按帧序号生成设备字节流：next_frames(n) 返回接下来 n 帧的原始字节（含注入的故障）。
+    帧时间 = 序号 / frame_rate（秒），接收端用 start_wall + t 即可算出每帧的端到端延迟。
+    故障注入：
+        noise        : 各电流通道叠加的高斯噪声标准差（原始计数）
+        corrupt_rate : 每帧被破坏的概率（二进制帧改校验和；JSON 行去掉右括号）
+        drop_rate    : 每个字节被丢弃的概率（模拟串口丢字节，破坏帧对齐）
+    """
+
+    def __init__(self, binary: bool = True, frame_rate: float = 100.0, waveform=None,
+                 noise: float = 0.0, corrupt_rate: float = 0.0, drop_rate: float = 0.0,
+                 seed: int = 0, proto: ProtocolConfig = None):
+        self.binary = binary
+        self.frame_rate = float(frame_rate)
+        self.waveform = np.asarray(waveform if waveform is not None else make_waveform("cv", frame_rate),
+                                   dtype=np.float64)
+        self.noise = float(noise)
+        self.corrupt_rate = float(corrupt_rate)
+        self.drop_rate = float(drop_rate)
+        self.rng = np.random.default_rng(seed)
+
+        proto = proto or ProtocolConfig()
+        self._keys = (proto.time_keys[0], proto.voltage_keys[0], proto.uric_keys[0],
+                      proto.ascorbic_keys[0], proto.glucose_keys[0])
+        self._delimiter = proto.line_delimiter or "\n"
+
+        self.seq = 0
+        self.start_wall = time.time()
+        self.frames = 0
+        self.corrupted = 0
+        self.dropped_bytes = 0
+
+    def next_frames(self, n: int) -> bytes:
+        if n <= 0:
+            return b""
+        idx = np.arange(self.seq, self.seq + n)
+        self.seq += n
+        t = idx / self.frame_rate
+        v = self.waveform[idx % len(self.waveform)]
+        chans = [channel_response(v, *CHANNEL_PEAKS[k]) for k in ("uric", "ascorbic", "glucose")]
+        if self.noise:
+            chans = [c + self.rng.normal(0.0, self.noise, n) for c in chans]
+        corrupt = self.rng.random(n) < self.corrupt_rate if self.corrupt_rate else None
+
+        raw = self._encode_binary(t, v, chans, corrupt) if self.binary else self._encode_json(t, v, chans, corrupt)
+        self.frames += n
+        if corrupt is not None:
+            self.corrupted += int(corrupt.sum())
+
+        if self.drop_rate:
+            buf = np.frombuffer(raw, dtype=np.uint8)
+            keep = self.rng.random(buf.size) >= self.drop_rate
+            self.dropped_bytes += int(buf.size - keep.sum())
+            raw = buf[keep].tobytes()
+        return raw
+
+    def _encode_binary(self, t, v, chans, corrupt) -> bytes:
+        n = t.size
+        fr = np.zeros(n, dtype=FRAME_DTYPE)
+        fr["head"] = FRAME_HEAD
+        fr["tail"] = FRAME_TAIL
+        fr["ms"] = np.rint(t * 1000.0).astype(np.int64) & 0xFFFFFFFF
+        for name, c in zip(("uric", "ascorbic", "glucose"), chans):
+            fr[name] = np.clip(np.rint(c), 0, 0xFFFF)
+        fr["code12"] = np.clip(np.rint(v / CODE12_VREF * CODE12_MAX), 0, CODE12_MAX)
+
+        checksum = (fr.view(np.uint8).reshape(n, FRAME_LEN)[:, 1:13].sum(axis=1) & 0xFF).astype(np.uint8)
+        if corrupt is not None and corrupt.any():
+            checksum[corrupt] ^= self.rng.integers(1, 256, int(corrupt.sum()), dtype=np.uint8)
+        fr["checksum"] = checksum
+        return fr.tobytes()
+
+    def _encode_json(self, t, v, chans, corrupt) -> bytes:
+        kt, kv, ku, ka, kg = self._keys
+        fmt = f'{{{{"{kt}": {{:.4f}}, "{kv}": {{:.4f}}, "{ku}": {{:.2f}}, "{ka}": {{:.2f}}, "{kg}": {{:.2f}}}}}}'
+        lines = [fmt.format(*row) for row in zip(t.tolist(), v.tolist(), *(c.tolist() for c in chans))]
+        if corrupt is not None:
+            for i in np.flatnonzero(corrupt).tolist():
+                lines[i] = lines[i][:-1]
+        return "".join(line + self._delimiter for line in lines).encode("utf-8")
+
+
+# =========================
+# 发送：按帧率生成、按波特率限速
+# =========================
+def pump(sim: DeviceSimulator, write, baud: int = 115200, stop: threading.Event = None,
+         duration: float = 0.0, count: int = 0, tick: float = 0.005,
+         max_backlog: int = 1 << 20, status=None, status_interval: float = 0.0) -> dict:
+    """
+    每 tick 生成到期的帧，按 8N1 波特率（baud / 10 字节每秒，0 = 不限速）写出。
+    write(data) 返回实际写出的字节数（接收端来不及读时可以小于 len(data)）。
+    发送不完的字节留在积压里，超过 max_backlog 时丢弃最旧的（模拟设备端缓冲溢出）。
+    """
+    stop = stop or threading.Event()
+    bytes_per_s = baud / 10.0 if baud else 0.0
+    backlog = bytearray()
+    sent = overflow = 0
+    sim.start_wall = time.time()
+    t0 = time.perf_counter()
+    link_t = 0.0                # 串口线上已排到的时间：空闲时最多攒一个 tick 的发送额度
+    next_status = status_interval
+
+    while not stop.is_set():
+        now = time.perf_counter() - t0
+        if duration and now >= duration:
+            break
+        due = int(now * sim.frame_rate) + 1
+        if count:
+            due = min(due, count)
+        if due > sim.seq:
+            backlog += sim.next_frames(due - sim.seq)
+        if len(backlog) > max_backlog:
+            drop = len(backlog) - max_backlog
+            del backlog[:drop]
+            overflow += drop
+
+        if backlog:
+            if bytes_per_s:
+                link_t = max(link_t, now - tick)
+                budget = min(len(backlog), int((now - link_t) * bytes_per_s))
+            else:
+                budget = len(backlog)
+            if budget > 0:
+                n = write(bytes(backlog[:budget]))
+                del backlog[:n]
+                sent += n
+                if bytes_per_s:
+                    link_t += n / bytes_per_s
+        elif count and sim.seq >= count:
+            break
+
+        if status is not None and status_interval and now >= next_status:
+            status({"elapsed": now, "frames": sim.frames, "bytes_sent": sent, "backlog": len(backlog),
+                    "overflow_bytes": overflow})
+            next_status = now + status_interval
+        time.sleep(tick)
+
+    return {
+        "elapsed": time.perf_counter() - t0,
+        "frames": sim.frames,
+        "bytes_sent": sent,
+        "backlog": len(backlog),
+        "overflow_bytes": overflow,
+        "corrupted": sim.corrupted,
+        "dropped_bytes": sim.dropped_bytes,
+    }
+
+
+def open_pty(link: str = None):
+    """打开伪终端，返回 (主端 fd, 从端 fd, 从端路径)；主端非阻塞，接收端没在读时写入返回 0"""
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    os.set_blocking(master, False)
+    name = os.ttyname(slave)
+    if link:
+        if os.path.islink(link):
+            os.unlink(link)
+        os.symlink(name, link)
+    return master, slave, name
+
+
+def pty_writer(master: int):
+    def write(data: bytes) -> int:
+        try:
+            return os.write(master, data)
+        except BlockingIOError:
+            return 0
+    return write
+
+
+def write_capture(sim: DeviceSimulator, path: str, count: int, baud: int = 115200,
+                  chunk_frames: int = 0, meta: dict = None) -> dict:
+    """
+    不经过伪终端，直接生成原始录制文件（.cgmraw）：每块的时间戳取“帧到期时间”和“串口发完时间”中较晚者。
+    同样的参数和 seed 总是得到同样的文件，适合做可复现的回放基准。
+    """
+    chunk_frames = chunk_frames or max(1, int(round(sim.frame_rate * 0.005)))
+    bytes_per_s = baud / 10.0 if baud else 0.0
+    w = RawCaptureWriter(path, dict(meta or {}, binary_mode=sim.binary, synthetic=True))
+    link_t = 0.0
+    while sim.seq < count:
+        n = min(chunk_frames, count - sim.seq)
+        due = (sim.seq + n - 1) / sim.frame_rate
+        data = sim.next_frames(n)
+        link_t = max(link_t, due) + (len(data) / bytes_per_s if bytes_per_s else 0.0)
+        w.write(data, w.t0_ns + int(link_t * 1e9))
+    w.close()
+    return {"frames": sim.frames, "chunks": w.chunks, "bytes": w.bytes, "duration": link_t,
+            "corrupted": sim.corrupted, "dropped_bytes": sim.dropped_bytes}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="CGM 设备模拟器：向伪终端发送二进制帧 / JSON 行")
+    ap.add_argument("--binary", action="store_true", help="15 字节二进制帧协议（缺省为 JSON 行）")
+    ap.add_argument("--rate", type=float, default=100.0, help="帧率（帧/秒）")
+    ap.add_argument("--baud", type=int, default=115200, help="波特率（按 8N1 限速），0 = 不限速")
+    ap.add_argument("--wave", choices=WAVEFORMS, default="cv", help="电压波形")
+    ap.add_argument("--v-low", type=float, default=0.0, help="扫描下限 / 恒压值（V）")
+    ap.add_argument("--v-high", type=float, default=0.8, help="扫描上限（V）")
+    ap.add_argument("--scan-rate", type=float, default=0.1, help="CV 扫描速率（V/s）")
+    ap.add_argument("--noise", type=float, default=0.0, help="电流通道高斯噪声标准差（原始计数）")
+    ap.add_argument("--corrupt", type=float, default=0.0, help="每帧被破坏的概率")
+    ap.add_argument("--drop", type=float, default=0.0, help="每字节被丢弃的概率")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--count", type=int, default=0, help="发送多少帧后退出，0 = 一直发送")
+    ap.add_argument("--duration", type=float, default=0.0, help="运行多少秒后退出，0 = 一直运行")
+    ap.add_argument("--link", help="在此路径建立指向伪终端的符号链接（路径固定，便于脚本使用）")
+    ap.add_argument("--capture", help="改为直接生成原始录制文件（.cgmraw），需要 --count")
+    ap.add_argument("--status-interval", type=float, default=5.0, help="状态输出间隔（秒），0 = 不输出")
+    args = ap.parse_args(argv)
+
+    wave = make_waveform(args.wave, args.rate, v_low=args.v_low, v_high=args.v_high, scan_rate=args.scan_rate)
+    sim = DeviceSimulator(binary=args.binary, frame_rate=args.rate, waveform=wave, noise=args.noise,
+                          corrupt_rate=args.corrupt, drop_rate=args.drop, seed=args.seed)
+    params = {k: v for k, v in vars(args).items() if k not in ("link", "capture", "status_interval")}
+
+    if args.capture:
+        if not args.count:
+            print("--capture 需要同时给出 --count", file=sys.stderr)
+            return 2
+        st = write_capture(sim, args.capture, args.count, baud=args.baud, meta={"simulator": params})
+        print(f"{args.capture}: {st['frames']} 帧 / {st['bytes']} 字节，模拟时长 {st['duration']:.2f} s，"
+              f"破坏 {st['corrupted']} 帧，丢弃 {st['dropped_bytes']} 字节")
+        return 0
+
+    if os.name != "posix":
+        print("伪终端模式仅支持 POSIX；Windows 下可用 --capture 生成录制文件再回放", file=sys.stderr)
+        return 2
+
+    frame_bytes = FRAME_LEN if args.binary else len(sim.next_frames(1))
+    sim.seq = sim.frames = 0
+    if args.baud and args.rate * frame_bytes > args.baud / 10.0:
+        print(f"注意：{args.rate:g} 帧/秒 × {frame_bytes} 字节超过 {args.baud} 波特率的链路容量，"
+              f"发送端会积压", file=sys.stderr)
+
+    master, slave, name = open_pty(args.link)
+    print(f"模拟设备：{name}{f'（{args.link}）' if args.link else ''}，"
+          f"{'二进制' if args.binary else 'JSON'}协议，{args.rate:g} 帧/秒，"
+          f"{'不限速' if not args.baud else f'{args.baud} 波特'}，波形 {args.wave}", flush=True)
+
+    stop = threading.Event()
+
+    def status(st: dict):
+        print(f"{st['elapsed']:.0f}s 已生成 {st['frames']} 帧，已发送 {st['bytes_sent']} 字节，"
+              f"积压 {st['backlog']} 字节，溢出 {st['overflow_bytes']} 字节", flush=True)
+
+    try:
+        st = pump(sim, pty_writer(master), baud=args.baud, stop=stop, duration=args.duration,
+                  count=args.count, status=status, status_interval=args.status_interval)
+    except KeyboardInterrupt:
+        stop.set()
+        st = None
+    finally:
+        if args.link and os.path.islink(args.link):
+            os.unlink(args.link)
+
+    if st is not None:
+        status(st)
+        print(f"破坏 {st['corrupted']} 帧，丢弃 {st['dropped_bytes']} 字节", flush=True)
+    # 给接收端留时间读完伪终端缓冲里剩余的数据
+    time.sleep(0.5)
+    os.close(master)
+    os.close(slave)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
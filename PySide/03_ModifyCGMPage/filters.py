@@ -0,0 +1,166 @@
+# filters.py
+# 流式滤波引擎（不依赖 Qt）：一次处理一整批样本、所有通道，状态跨批保留
+from __future__ import annotations
+
+from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class FilterType(Enum):
+    NONE = "无滤波"
+    MOVING_AVG = "滑动平均"
+    MEDIAN = "中值滤波"
+    KALMAN = "卡尔曼滤波"
+    SAVGOL = "S-G平滑"
+
+
+@lru_cache(maxsize=64)
+def savgol_causal_coeffs(window: int, order: int) -> np.ndarray:
+    """
+    因果 Savitzky-Golay 系数：对最近 window 个点做 order 阶最小二乘拟合，取拟合多项式在最后一个点的值。
+    返回长度 window 的权重（按时间顺序，最旧在前），输出 = window 个样本与权重的点积。
+    order 会被限制在 window - 1 以内（启动阶段样本不足时自动降阶）。
+    """
+    order = min(int(order), window - 1)
+    x = np.arange(-(window - 1), 1, dtype=np.float64)      # 最新点位于 x = 0
+    A = np.vander(x, order + 1, increasing=True)           # (window, order + 1)
+    # 拟合多项式在 x = 0 处的值就是常数项：取伪逆的第 0 行
+    return np.linalg.pinv(A)[0]
+
+
+class StreamFilterBank:
+    """
+    process(values) : (n, C) 原始值 -> (n, C) 滤波后，C 个通道同时处理。
+    与逐样本实现保持一致：
+      - 滑动平均 / 中值：窗口取最近 min(window_size, 已收样本数) 个点；
+        平均值按样本顺序逐项累加后除以窗口长度，中值取排序后第 len // 2 个（偶数取上中位数）
+      - S-G 平滑：因果窗口（只用当前及之前的样本），系数按 (窗口, 阶数) 预先算好，启动阶段按已有点数降阶
+      - 卡尔曼：首个样本直接作为估计值；此后 P_pred = P + Q, K = P_pred / (P_pred + R),
+        x += K * (z - x), P = (1 - K) * P_pred
+    各通道同时收到样本，P / K 序列与数据无关，所有通道共用一份；K 收敛后用分块矩阵一次算完一段递推。
+    """
+
+    KALMAN_BLOCK = 64
+
+    def __init__(self, channels: int, filter_type: FilterType = FilterType.MOVING_AVG,
+                 window_size: int = 5, kalman_Q: float = 0.01, kalman_R: float = 0.1,
+                 savgol_order: int = 2):
+        self.channels = int(channels)
+        self.configure(filter_type, window_size, kalman_Q, kalman_R, savgol_order)
+
+    def configure(self, filter_type: FilterType, window_size: int, kalman_Q: float, kalman_R: float,
+                  savgol_order: int = 2):
+        """修改参数并清空状态"""
+        self.filter_type = filter_type
+        self.window_size = max(1, int(window_size))
+        self.Q = float(kalman_Q)
+        self.R = float(kalman_R)
+        self.savgol_order = max(0, int(savgol_order))
+        self.reset()
+
+    def reset(self):
+        self._tail = np.empty((0, self.channels), dtype=np.float64)    # 最近 window_size - 1 个样本
+        self._x = None          # 卡尔曼估计值 (C,)
+        self._P = 0.1
+        self._K_steady = None   # P 收敛后的稳态增益
+        self._block = None      # 稳态下的 (T, p) 分块递推矩阵
+
+    def process(self, values) -> np.ndarray:
+        z = np.asarray(values, dtype=np.float64).reshape(-1, self.channels)
+        if z.shape[0] == 0:
+            return z.copy()
+        ft = self.filter_type
+        if ft == FilterType.KALMAN:
+            return self._kalman(z)
+
+        w = self.window_size
+        ext = np.concatenate((self._tail, z)) if self._tail.shape[0] else z
+        m = self._tail.shape[0]
+        self._tail = ext[-(w - 1):].copy() if w > 1 else ext[:0].copy()
+
+        if ft == FilterType.NONE:
+            return z.copy()
+        if ft == FilterType.MOVING_AVG:
+            return self._windowed(ext, m, w, self._mean_of)
+        if ft == FilterType.MEDIAN:
+            return self._windowed(ext, m, w, self._median_of)
+        if ft == FilterType.SAVGOL:
+            return self._windowed(ext, m, w, self._savgol_of)
+        return z.copy()
+
+    # ---------- 滑动窗口 ----------
+    @staticmethod
+    def _mean_of(win: np.ndarray) -> np.ndarray:
+        # win: (..., k)；按样本顺序逐项累加，与 sum(buf[-w:]) / w 的舍入一致
+        acc = win[..., 0].copy()
+        for j in range(1, win.shape[-1]):
+            acc += win[..., j]
+        return acc / win.shape[-1]
+
+    @staticmethod
+    def _median_of(win: np.ndarray) -> np.ndarray:
+        k = win.shape[-1] // 2
+        return np.partition(win, k, axis=-1)[..., k]
+
+    def _savgol_of(self, win: np.ndarray) -> np.ndarray:
+        return win @ savgol_causal_coeffs(win.shape[-1], self.savgol_order)
+
+    def _windowed(self, ext: np.ndarray, m: int, w: int, reduce) -> np.ndarray:
+        """ext = 历史尾部(m 行) + 本批；输出本批每个样本对应窗口的统计量"""
+        out = np.empty((ext.shape[0] - m, self.channels), dtype=np.float64)
+        # 启动阶段：已收样本数不足 w，窗口从第一个样本开始（整个生命周期最多 w - 1 行）
+        ramp_end = min(w - 1, ext.shape[0])
+        for i in range(m, ramp_end):
+            out[i - m] = reduce(ext[:i + 1].T)
+        first_full = max(m, w - 1)
+        if ext.shape[0] > first_full:
+            win = sliding_window_view(ext[first_full - w + 1:], w, axis=0)   # (rows, C, w)
+            out[first_full - m:] = reduce(win)
+        return out
+
+    # ---------- 卡尔曼 ----------
+    def _kalman(self, z: np.ndarray) -> np.ndarray:
+        n = z.shape[0]
+        out = np.empty_like(z)
+        i = 0
+        if self._x is None:
+            self._x = z[0].copy()
+            out[0] = self._x
+            i = 1
+
+        # 增益尚未收敛：逐样本递推（所有通道一起算）
+        while i < n and self._K_steady is None:
+            P_pred = self._P + self.Q
+            K = P_pred / (P_pred + self.R)
+            P_new = (1 - K) * P_pred
+            if P_new == self._P:
+                self._K_steady = K
+                break
+            self._x = self._x + K * (z[i] - self._x)
+            self._P = P_new
+            out[i] = self._x
+            i += 1
+
+        # 稳态：x_k = a * x_{k-1} + K * z_k（a = 1 - K），每块用下三角矩阵一次算完
+        while i < n:
+            T, p = self._steady_block()
+            m = min(self.KALMAN_BLOCK, n - i)
+            xb = T[:m, :m] @ z[i:i + m] + p[:m, None] * self._x
+            out[i:i + m] = xb
+            self._x = xb[-1].copy()
+            i += m
+        return out
+
+    def _steady_block(self):
+        if self._block is None:
+            B = self.KALMAN_BLOCK
+            K = self._K_steady
+            a = 1.0 - K
+            powers = a ** np.arange(B + 1, dtype=np.float64)
+            lag = np.arange(B)[:, None] - np.arange(B)[None, :]
+            T = np.where(lag >= 0, K * powers[np.clip(lag, 0, B)], 0.0)
+            self._block = (T, powers[1:])
+        return self._block
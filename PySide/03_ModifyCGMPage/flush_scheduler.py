@@ -0,0 +1,94 @@
+# flush_scheduler.py
+# 界面刷新调度（不依赖 Qt）：每个定时器节拍决定处理多少帧、这一拍要不要重绘图表
+#
+# 原则：
+#   - 数据处理（工程量换算、滤波、写盘、表格 / 图表缓冲）必须跟上到达速率，积压最多保留 max_lag_s 秒，
+#     写盘的数据一帧不丢
+#   - 每拍处理的帧数按“到达速率 × 节拍”与“时间预算 / 每帧耗时”自适应，而不是固定 50 帧
+#   - 图表重绘合并到不超过 max_fps；过载时（预算不够处理该处理的帧）重绘降到 overload_fps，先牺牲显示
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FlushPlan:
+    frames: int          # 本拍处理的帧数
+    redraw: bool         # 本拍是否允许重绘（只在有新数据待显示时才真正重绘）
+    overloaded: bool     # 时间预算不够：显示已降级
+
+
+class FlushScheduler:
+    """
+    plan(pending, now) -> FlushPlan；处理完后调用 done(frames, process_s, redraw_s) 更新耗时估计。
+    note_arrival(n, now) 记录到达的帧数，用于估计到达速率。
+    耗时模型：一拍耗时 ≈ overhead + frames × per_frame + （重绘时）redraw，三项都用指数滑动平均在线估计。
+    """
+
+    EWMA = 0.2
+
+    def __init__(self, tick_ms: float = 50.0, budget_fraction: float = 0.5, max_fps: float = 30.0,
+                 overload_fps: float = 2.0, max_lag_s: float = 0.5, min_batch: int = 50):
+        self.configure(tick_ms, max_fps)
+        self.budget_fraction = float(budget_fraction)
+        self.overload_fps = float(overload_fps)
+        self.max_lag_s = float(max_lag_s)
+        self.min_batch = int(min_batch)
+
+        self.per_frame_s = 20e-6
+        self.overhead_s = 0.5e-3
+        self.redraw_s = 5e-3
+        self.arrival_rate = 0.0         # 帧/秒
+        self._arrived = 0
+        self._rate_t0 = None
+        self._last_redraw = float("-inf")
+
+    def configure(self, tick_ms: float, max_fps: float):
+        self.tick_s = max(1e-3, float(tick_ms) / 1000.0)
+        self.max_fps = max(0.1, float(max_fps))
+
+    def reset(self):
+        self.arrival_rate = 0.0
+        self._arrived = 0
+        self._rate_t0 = None
+
+    # ---------- 到达速率 ----------
+    def note_arrival(self, n: int, now: float):
+        if self._rate_t0 is None:
+            self._rate_t0 = now
+        self._arrived += n
+        dt = now - self._rate_t0
+        if dt >= 0.25:
+            rate = self._arrived / dt
+            self.arrival_rate += self.EWMA * (rate - self.arrival_rate) if self.arrival_rate else rate
+            self._arrived = 0
+            self._rate_t0 = now
+
+    # ---------- 每拍计划 ----------
+    def plan(self, pending: int, now: float) -> FlushPlan:
+        budget = self.tick_s * self.budget_fraction
+        redraw_due = now - self._last_redraw >= 1.0 / self.max_fps
+
+        afford = int(max(0.0, budget - self.overhead_s - (self.redraw_s if redraw_due else 0.0)) / self.per_frame_s)
+        keep_up = int(self.arrival_rate * self.tick_s * 1.2) + 1
+        # 积压超过 max_lag_s 秒的部分本拍必须处理掉，即使超出预算
+        must = pending - int(self.arrival_rate * self.max_lag_s)
+
+        frames = min(pending, max(self.min_batch, afford, keep_up, must))
+        overloaded = frames > max(afford, self.min_batch) or frames < pending
+        if overloaded:
+            redraw_due = now - self._last_redraw >= 1.0 / min(self.max_fps, self.overload_fps)
+        return FlushPlan(frames, redraw_due, overloaded)
+
+    def done(self, frames: int, process_s: float, redraw_s: float = None, now: float = None):
+        """redraw_s 为 None 表示本拍没有重绘"""
+        a = self.EWMA
+        if frames >= 2 * self.min_batch:
+            per_frame = max(1e-7, (process_s - self.overhead_s) / frames)
+            self.per_frame_s += a * (per_frame - self.per_frame_s)
+        elif frames:
+            self.overhead_s += a * (max(0.0, process_s - frames * self.per_frame_s) - self.overhead_s)
+        if redraw_s is not None:
+            self.redraw_s += a * (redraw_s - self.redraw_s)
+            if now is not None:
+                self._last_redraw = now
@@ -0,0 +1,79 @@
+# frame_batch.py
+# 列式帧批次：一批样本用几条平行的 NumPy 数组表示，代替“每个样本一个 dict”
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class FrameBatch:
+    """
+    一批已归一化的样本（所有列等长，float64）：
+        t        : 设备时间（秒）
+        voltage  : 电压（V）
+        uric     : 尿酸（uA）
+        ascorbic : 抗坏血酸（uA）
+        glucose  : 葡萄糖（mA）
+        recv_ts  : 上位机接收时间（time.time() 秒）
+    """
+    t: np.ndarray
+    voltage: np.ndarray
+    uric: np.ndarray
+    ascorbic: np.ndarray
+    glucose: np.ndarray
+    recv_ts: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "FrameBatch":
+        e = np.empty(0, dtype=np.float64)
+        return cls(e, e, e, e, e, e)
+
+    @classmethod
+    def from_columns(cls, t, voltage, uric, ascorbic, glucose, recv_ts=None) -> "FrameBatch":
+        """任意可转数组的列 -> FrameBatch；recv_ts 可为标量（整批同一接收时间），缺省取当前时间"""
+        t = np.asarray(t, dtype=np.float64)
+        n = t.shape[0]
+        if recv_ts is None:
+            recv_ts = time.time()
+        recv_ts = np.asarray(recv_ts, dtype=np.float64)
+        if recv_ts.ndim == 0:
+            recv_ts = np.full(n, float(recv_ts))
+        return cls(
+            t,
+            np.asarray(voltage, dtype=np.float64),
+            np.asarray(uric, dtype=np.float64),
+            np.asarray(ascorbic, dtype=np.float64),
+            np.asarray(glucose, dtype=np.float64),
+            recv_ts,
+        )
+
+    @classmethod
+    def concat(cls, batches) -> "FrameBatch":
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        return cls(*(np.concatenate([getattr(b, f.name) for b in batches]) for f in fields(cls)))
+
+    def __len__(self) -> int:
+        return self.t.shape[0]
+
+    def __getitem__(self, item) -> "FrameBatch":
+        """按行切片/掩码取子批次（切片时为视图，不拷贝）"""
+        return FrameBatch(*(getattr(self, f.name)[item] for f in fields(self)))
+
+    def with_columns(self, **cols) -> "FrameBatch":
+        return replace(self, **{k: np.asarray(v, dtype=np.float64) for k, v in cols.items()})
+
+    def receive_time_strings(self) -> list:
+        """接收时间格式化为 HH:MM:SS.mmm；同一次读取的样本共用时间戳，只格式化一次"""
+        if not len(self):
+            return []
+        uniq, inverse = np.unique(self.recv_ts, return_inverse=True)
+        texts = [datetime.fromtimestamp(ts).strftime("%H:%M:%S.%f")[:-3] for ts in uniq.tolist()]
+        return [texts[i] for i in inverse.tolist()]
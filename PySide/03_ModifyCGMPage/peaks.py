@@ -0,0 +1,90 @@
+# peaks.py
+# 实时判峰（不依赖 Qt）：按扫描段（电压单调的一段）增量跟踪峰电位 / 峰电流，每个新样本只看一次
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass
+class SweepPeaks:
+    """一个扫描段的判峰结果；direction: +1 正扫（电压上升），-1 负扫，0 尚未确定"""
+    index: int
+    direction: int
+    peaks: list = field(default_factory=list)       # [(电位 V, 电流), ...]，按出现顺序
+
+
+class PeakTracker:
+    """
+    feed(voltage, current) -> 本批中结束的扫描段列表（SweepPeaks）；current_sweep 为进行中的扫描段。
+    - 扫描段：电压相对本段极值反向移动超过 dv_threshold 即认为换向，开始新段
+    - 峰：正扫找电流极大、负扫找电流极小（还原峰）。比之前的谷底高出至少 prominence、
+      之后又回落至少 prominence 时确认（流式的“突出度”判据，对应 find_peaks 的 prominence）
+    - 换向时尚未确认的候选点位于扫描端点，不计为峰
+    """
+
+    def __init__(self, prominence: float = 0.1, dv_threshold: float = 0.002):
+        self.prominence = float(prominence)
+        self.dv_threshold = float(dv_threshold)
+        self.reset()
+
+    def reset(self):
+        self.current_sweep = SweepPeaks(0, 0)
+        self._v_ext = None      # 本段电压极值（换向判据）
+        self._v_start = None
+        self._reset_search()
+
+    def _reset_search(self):
+        # 两个状态交替：找谷底 -> 回升 prominence 后找峰 -> 回落 prominence 后确认峰、再找谷底
+        self._seek_peak = False
+        self._low = math.inf
+        self._cand = -math.inf      # 候选峰（已乘方向，统一按极大值处理）
+        self._cand_v = 0.0
+        self._cand_i = 0.0
+
+    def feed(self, voltage, current) -> list:
+        finished = []
+        for v, i in zip(np.asarray(voltage, dtype=np.float64).tolist(), np.asarray(current, dtype=np.float64).tolist()):
+            if self._advance_sweep(v):
+                finished.append(self.current_sweep)
+                self.current_sweep = SweepPeaks(self.current_sweep.index + 1, -self.current_sweep.direction)
+                self._reset_search()
+            self._track(v, i)
+        return finished
+
+    def _advance_sweep(self, v: float) -> bool:
+        """更新扫描方向；返回 True 表示在这个样本处换向"""
+        sweep = self.current_sweep
+        if self._v_start is None:
+            self._v_start = self._v_ext = v
+            return False
+        if sweep.direction == 0:
+            if abs(v - self._v_start) > self.dv_threshold:
+                sweep.direction = 1 if v > self._v_start else -1
+                self._v_ext = v
+            return False
+        if (v - self._v_ext) * sweep.direction >= 0:
+            self._v_ext = v
+            return False
+        if abs(v - self._v_ext) > self.dv_threshold:
+            self._v_ext = v
+            return True
+        return False
+
+    def _track(self, v: float, i: float):
+        y = i if self.current_sweep.direction >= 0 else -i
+        if self._seek_peak:
+            if y > self._cand:
+                self._cand, self._cand_v, self._cand_i = y, v, i
+            elif self._cand - y >= self.prominence:
+                self.current_sweep.peaks.append((self._cand_v, self._cand_i))
+                self._seek_peak = False
+                self._low = y
+        else:
+            if y < self._low:
+                self._low = y
+            elif y - self._low >= self.prominence:
+                self._seek_peak = True
+                self._cand, self._cand_v, self._cand_i = y, v, i
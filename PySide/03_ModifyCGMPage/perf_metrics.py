@@ -0,0 +1,198 @@
+# perf_metrics.py
+# 热路径计数器 / 计时器（不依赖 Qt）：常开，每次记录只是一次加法或两次 perf_counter，
+# 界面定期取快照显示，并可按固定间隔把快照追加到 JSON 行文件（事后分析卡顿）
+#
+# 约定：每个指标只由一个线程写（例如 serial.* 只在串口工作线程里写），读快照的线程只读不写，因此不加锁
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+
+
+class Counter:
+    """单调递增的计数（字节数、帧数、错误数），快照里附带距上次快照的速率"""
+    __slots__ = ("total",)
+
+    def __init__(self):
+        self.total = 0
+
+    def add(self, n: int = 1):
+        self.total += n
+
+
+class _Window:
+    """快照窗口编号：只由取快照的线程递增；写指标的线程只读它，发现换了窗口就重置自己的窗口峰值"""
+    __slots__ = ("epoch",)
+
+    def __init__(self):
+        self.epoch = 0
+
+
+class Gauge:
+    """当前值（队列深度等），快照里附带本窗口（两次快照之间）的峰值"""
+    __slots__ = ("value", "_w", "_window")
+
+    def __init__(self, window: _Window = None):
+        self.value = 0
+        self._window = window or _Window()
+        self._w = (self._window.epoch, 0)     # (窗口编号, 该窗口内的峰值)，整体替换，读快照时不会读到一半
+
+    def set(self, value):
+        self.value = value
+        w = self._w
+        if value > w[1] or w[0] != self._window.epoch:
+            self._w = (self._window.epoch, value)
+
+    def window_peak(self, epoch: int):
+        """epoch 窗口内的峰值；该窗口内没有 set() 过则为当前值"""
+        w_epoch, peak = self._w
+        return peak if w_epoch == epoch else self.value
+
+
+class _Span:
+    __slots__ = ("timer", "t0")
+
+    def __init__(self, timer: "Timer"):
+        self.timer = timer
+        self.t0 = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(time.perf_counter() - self.t0)
+        return False
+
+
+class Timer:
+    """
+    耗时统计：add(秒) 或 with timer.time(): ...
+    count / total / max 自开始起一直累计；窗口（两次快照之间）的次数和总耗时由快照与上次的累计值相减得到，
+    窗口最大值按窗口编号记在 _w 里。所有字段都只由写入线程修改
+    """
+    __slots__ = ("count", "total", "max", "last", "_w", "_window")
+
+    def __init__(self, window: _Window = None):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self._window = window or _Window()
+        self._w = (self._window.epoch, 0.0)   # (窗口编号, 该窗口内的最大耗时)
+
+    def add(self, seconds: float):
+        self.last = seconds
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        w = self._w
+        if seconds > w[1] or w[0] != self._window.epoch:
+            self._w = (self._window.epoch, seconds)
+
+    def window_max(self, epoch: int) -> float:
+        w_epoch, peak = self._w
+        return peak if w_epoch == epoch else 0.0
+
+    def time(self) -> _Span:
+        return _Span(self)
+
+
+class MetricsRegistry:
+    """按名称取得（不存在则创建）指标；snapshot() 生成一份可 JSON 序列化的快照"""
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}
+        self._window = _Window()
+        self._last_snapshot = time.perf_counter()
+        self._last_totals = {}          # 计数器名称 -> 上次快照时的 total
+        self._last_timers = {}          # 计时器名称 -> 上次快照时的 (count, total)
+
+    def counter(self, name: str) -> Counter:
+        c = self.counters.get(name)
+        if c is None:
+            c = self.counters[name] = Counter()
+        return c
+
+    def gauge(self, name: str) -> Gauge:
+        g = self.gauges.get(name)
+        if g is None:
+            g = self.gauges[name] = Gauge(self._window)
+        return g
+
+    def timer(self, name: str) -> Timer:
+        t = self.timers.get(name)
+        if t is None:
+            t = self.timers[name] = Timer(self._window)
+        return t
+
+    def snapshot(self) -> dict:
+        """
+        counters : {名称: {total, rate(每秒)}}
+        gauges   : {名称: {value, peak}}
+        timers   : {名称: {count, avg_ms, max_ms, last_ms, total_count, total_max_ms}}（前三项为本窗口）
+        取快照会开始新的统计窗口：应只由一个地方（界面的定时器）周期性调用。
+        快照只读各指标、只改自己保存的上次累计值和窗口编号，不写其他线程的字段
+        """
+        now = time.perf_counter()
+        dt = max(now - self._last_snapshot, 1e-9)
+        self._last_snapshot = now
+        epoch = self._window.epoch
+        self._window.epoch = epoch + 1     # 之后的写入计入下一个窗口
+
+        counters = {}
+        for name, c in list(self.counters.items()):
+            total = c.total
+            counters[name] = {"total": total, "rate": (total - self._last_totals.get(name, 0)) / dt}
+            self._last_totals[name] = total
+
+        gauges = {}
+        for name, g in list(self.gauges.items()):
+            gauges[name] = {"value": g.value, "peak": g.window_peak(epoch)}
+
+        timers = {}
+        for name, t in list(self.timers.items()):
+            count, total = t.count, t.total
+            prev_count, prev_total = self._last_timers.get(name, (0, 0.0))
+            self._last_timers[name] = (count, total)
+            n = count - prev_count
+            timers[name] = {
+                "count": n,
+                "avg_ms": (total - prev_total) / n * 1000.0 if n else 0.0,
+                "max_ms": t.window_max(epoch) * 1000.0,
+                "last_ms": t.last * 1000.0,
+                "total_count": count,
+                "total_max_ms": t.max * 1000.0,
+            }
+
+        return {
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "interval_s": dt,
+            "counters": counters,
+            "gauges": gauges,
+            "timers": timers,
+        }
+
+
+class MetricsDump:
+    """把快照追加写成 JSON 行（一行一个快照）；写入失败只记录错误，不影响采集"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.lines = 0
+        self.last_error = ""
+
+    def write(self, snapshot: dict):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+            self.lines += 1
+        except OSError as e:
+            self.last_error = repr(e)
+
+
+# 进程内共用的指标表：各模块直接取用，界面统一读快照
+METRICS = MetricsRegistry()
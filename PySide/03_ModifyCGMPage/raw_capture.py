@@ -0,0 +1,117 @@
+# raw_capture.py
+# 原始字节录制 / 读取（不依赖 Qt）：逐块保存串口收到的原始数据和单调时钟时间戳，用于现场问题复现和离线回放
+#
+# 文件布局（小端）：
+#   文件头 : "CGMR" | 版本 u16 | 保留 u16 | JSON 长度 u32 | JSON（开始时间、端口参数、协议选项、AppConfig）
+#   记录   : 相对开始的时间 u64（纳秒，time.monotonic_ns）| 长度 u32 | 原始字节
+# 记录自带长度，程序崩溃时最后一条不完整的记录在读取时丢弃
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+MAGIC = b"CGMR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHI")
+_RECORD = struct.Struct("<QI")
+
+
+class RawCaptureWriter:
+    """write(data) 可以在串口工作线程里直接调用（带锁，写入走 64 KiB 缓冲，不逐条刷盘）"""
+
+    def __init__(self, path, meta: dict = None):
+        self.path = str(path)
+        self._t0 = time.monotonic_ns()
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.bytes = 0
+
+        header = {
+            "created": datetime.now().isoformat(timespec="milliseconds"),
+            "start_time": time.time(),
+            "meta": meta or {},
+        }
+        raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        self._f = open(self.path, "wb", buffering=1 << 16)
+        self._f.write(_HEADER.pack(MAGIC, VERSION, 0, len(raw)) + raw)
+
+    @property
+    def t0_ns(self) -> int:
+        """录制开始时刻（time.monotonic_ns）；write(t_ns=...) 的时间以它为零点"""
+        return self._t0
+
+    def write(self, data: bytes, t_ns: int = None):
+        if not data:
+            return
+        t = (time.monotonic_ns() if t_ns is None else t_ns) - self._t0
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(_RECORD.pack(max(0, t), len(data)))
+            self._f.write(data)
+            self.chunks += 1
+            self.bytes += len(data)
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+class RawCaptureReader:
+    """
+    records() 依次产出 (相对时间秒, 原始字节)。
+    构造时只读文件头；records() 每次重新打开文件、经 64 KiB 缓冲顺序读取，内存占用与录制长度无关
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                raise ValueError(f"not a raw capture file: {self.path}")
+            magic, version, _, meta_len = _HEADER.unpack(head)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a raw capture file: {self.path}")
+            raw = f.read(meta_len)
+        if len(raw) < meta_len:
+            raise ValueError(f"truncated raw capture header: {self.path}")
+        self.header = json.loads(raw.decode("utf-8"))
+        self.meta = self.header.get("meta", {})
+        self._body = _HEADER.size + meta_len
+        self.truncated = False
+
+    def _scan(self, with_data: bool):
+        """(时间纳秒, 数据)；with_data=False 时跳过数据只产出 (时间纳秒, None)"""
+        with open(self.path, "rb", buffering=1 << 16) as f:
+            size = os.fstat(f.fileno()).st_size
+            pos = f.seek(self._body)
+            while pos + _RECORD.size <= size:
+                t_ns, n = _RECORD.unpack(f.read(_RECORD.size))
+                pos += _RECORD.size + n
+                if pos > size:
+                    self.truncated = True
+                    return
+                if with_data:
+                    yield t_ns, f.read(n)
+                else:
+                    f.seek(n, os.SEEK_CUR)
+                    yield t_ns, None
+            if pos != size:
+                self.truncated = True
+
+    def records(self):
+        for t_ns, data in self._scan(True):
+            yield t_ns / 1e9, data
+
+    def duration(self) -> float:
+        last = 0
+        for t_ns, _ in self._scan(False):
+            last = t_ns
+        return last / 1e9
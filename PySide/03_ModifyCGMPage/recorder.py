@@ -0,0 +1,208 @@
+# recorder.py
+# 后台写盘线程（不依赖 Qt）：采集 / GUI 线程只把批次放进有界队列，文件 I/O 全部在本线程完成
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+
+from frame_batch import FrameBatch
+from session_file import SessionWriter
+
+DURABILITY_MODES = ("none", "flush", "fsync")
+
+
+class SessionRecorder:
+    """
+    submit(batch) 永不阻塞：队列满时丢弃该批并计数（dropped_batches / dropped_rows）。
+    写盘策略：
+      - 按大小：攒够 flush_rows 行立即写出一个数据块
+      - 按时间：距上次写盘超过 flush_interval_ms 就把剩余的行也写出
+      - durability 决定每次写盘后做到哪一步（"none" / "flush" / "fsync"，见 SessionWriter.flush）
+    写文件出错时记录 last_error，之后的数据写到新文件（原文件名加 _2、_3 …），不会停止采集。
+    stats() 返回计数和写盘耗时（毫秒）的快照，供界面定时读取。
+    写盘线程是守护线程：stop() 超时返回 False 时，调用方要么再 wait()，要么在退出前报告该会话未写完索引。
+    """
+
+    def __init__(self, path, config: dict = None, flush_rows: int = 4096, flush_interval_ms: int = 1000,
+                 durability: str = "flush", max_queue: int = 1024):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}")
+        self.path = str(path)
+        self.config = config or {}
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = max(0.001, int(flush_interval_ms) / 1000.0)
+        self.durability = durability
+
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._stop = threading.Event()
+        self._thread = None
+        self._writer = None
+        self._part = 0
+        self.files = []
+
+        self._lock = threading.Lock()
+        self.rows_submitted = 0
+        self.rows_written = 0
+        self.dropped_batches = 0
+        self.dropped_rows = 0
+        self.write_errors = 0
+        self.last_error = ""
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self._write_ms_total = 0.0
+        self._writes = 0
+
+    # ---------- 采集线程 ----------
+    def submit(self, batch: FrameBatch) -> bool:
+        n = len(batch)
+        if not n:
+            return True
+        if self._stop.is_set():
+            self._count_drop(n)
+            return False
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self._count_drop(n)
+            return False
+        with self._lock:
+            self.rows_submitted += n
+        return True
+
+    def _count_drop(self, n: int):
+        with self._lock:
+            self.dropped_batches += 1
+            self.dropped_rows += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "rows_submitted": self.rows_submitted,
+                "rows_written": self.rows_written,
+                "dropped_batches": self.dropped_batches,
+                "dropped_rows": self.dropped_rows,
+                "write_errors": self.write_errors,
+                "last_error": self.last_error,
+                "last_write_ms": self.last_write_ms,
+                "max_write_ms": self.max_write_ms,
+                "avg_write_ms": self._write_ms_total / self._writes if self._writes else 0.0,
+                "file": self.files[-1] if self.files else "",
+            }
+
+    # ---------- 生命周期 ----------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        写完队列里剩余的数据、写入索引后关闭文件。
+        返回 False：写盘线程在 timeout 内没有结束（磁盘过慢 / 卡住），文件还没有索引，线程仍在继续写
+        """
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)     # 唤醒正在等队列的写盘线程，不必等满一个写盘间隔
+        except queue.Full:
+            pass
+        return self.wait(timeout)
+
+    def wait(self, timeout: float = None) -> bool:
+        """等写盘线程结束（stop() 之后调用）；返回是否已结束"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- 写盘线程 ----------
+    def _run(self):
+        pending = []
+        pending_rows = 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                timeout = 0 if stopping else max(0.0, deadline - time.monotonic())
+                batch = self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()
+                if batch is None:
+                    continue
+                pending.append(batch)
+                pending_rows += len(batch)
+            except queue.Empty:
+                if stopping:
+                    break
+
+            now = time.monotonic()
+            if pending_rows >= self.flush_rows or (pending_rows and now >= deadline):
+                self._write(pending, pending_rows)
+                pending, pending_rows = [], 0
+                deadline = time.monotonic() + self.flush_interval
+            elif now >= deadline:
+                deadline = now + self.flush_interval
+
+        if pending:
+            self._write(pending, pending_rows)
+        self._close_writer()
+
+    def _write(self, batches: list, rows: int):
+        t0 = time.perf_counter()
+        try:
+            if self._writer is None:
+                self._writer = SessionWriter(self._next_path(), self.config, chunk_rows=self.flush_rows)
+            self._writer.append(FrameBatch.concat(batches))
+            self._writer.flush(self.durability)
+        except Exception as e:
+            with self._lock:
+                self.write_errors += 1
+                self.dropped_batches += len(batches)
+                self.dropped_rows += rows
+                self.last_error = repr(e)
+            self._abandon_writer()
+            return
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            self.rows_written += rows
+            self.last_write_ms = ms
+            self.max_write_ms = max(self.max_write_ms, ms)
+            self._write_ms_total += ms
+            self._writes += 1
+
+    def _next_path(self) -> str:
+        self._part += 1
+        if self._part == 1:
+            path = self.path
+        else:
+            root, ext = os.path.splitext(self.path)
+            path = f"{root}_{self._part}{ext}"
+        self.files.append(path)
+        return path
+
+    def _close_writer(self):
+        if self._writer is None:
+            return
+        try:
+            self._writer.close(self.durability)
+        except Exception as e:
+            with self._lock:
+                self.write_errors += 1
+                self.last_error = repr(e)
+        self._writer = None
+
+    def _abandon_writer(self):
+        # 出错的文件不再写入（没有索引的部分可用 SessionReader 扫描恢复）
+        if self._writer is None:
+            return
+        try:
+            self._writer.close(self.durability)
+        except Exception:
+            pass
+        self._writer = None
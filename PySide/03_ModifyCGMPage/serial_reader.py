@@ -0,0 +1,109 @@
+# serial_reader.py
+# 事件驱动的串口读取：阻塞在系统句柄上等数据，而不是 sleep + 轮询 in_waiting
+from __future__ import annotations
+
+import math
+import os
+import select
+import time
+
+
+class PortReader:
+    """
+    read_chunk(timeout) 阻塞到“有数据”或超时（缺省为空闲等待：POSIX 用 wait_timeout，通用路径用端口 timeout）：
+      - POSIX：poll() 串口 fd，再 os.readv() 直接读进预分配缓冲区（不产生临时 bytes）
+      - 其他平台 / 无 fd 的端口：借助 pyserial 的阻塞 read(1)（内核等待），再把 in_waiting 一次读完。
+        空闲等待用端口自己的 timeout（open_serial 里按串口 / 蓝牙设置），不另行改小；
+        更短的等待只取 TIMEOUT_STEPS 中的几个固定值——Windows 上每次给 timeout 赋值都是一次 SetCommTimeouts
+    max_latency_ms > 0 时（仅 POSIX），首字节到达后最多再攒这么久的数据一起交出（减少小包次数，延迟有上界）
+    返回 memoryview / bytes；超时无数据返回空对象
+    """
+
+    TIMEOUT_STEPS = (0.0, 0.005, 0.02, 0.05)
+
+    def __init__(self, serial_port, chunk_size: int = 4096, wait_timeout: float = 0.1,
+                 max_latency_ms: float = 0.0):
+        self.port = serial_port
+        self.wait_timeout = float(wait_timeout)
+        self.max_latency = float(max_latency_ms) / 1000.0
+
+        self._buf = bytearray(chunk_size)
+        self._view = memoryview(self._buf)
+
+        self._fd = None
+        self._poller = None
+        fileno = getattr(serial_port, "fileno", None)
+        if hasattr(select, "poll") and fileno is not None:
+            try:
+                self._fd = fileno()
+            except Exception:
+                self._fd = None
+        if self._fd is not None:
+            self._poller = select.poll()
+            self._poller.register(self._fd, select.POLLIN | select.POLLERR | select.POLLHUP)
+        else:
+            # 空闲时 read(1) 最多等端口自己的 timeout；没有设置（None / 0）时才用 wait_timeout。
+            # stop() 时由调用方 cancel_read() 打断等待
+            self.idle_timeout = serial_port.timeout or self.wait_timeout
+            if serial_port.timeout != self.idle_timeout:
+                serial_port.timeout = self.idle_timeout
+
+    def read_chunk(self, timeout: float = None):
+        if self._poller is not None:
+            return self._read_poll(self.wait_timeout if timeout is None else max(0.0, float(timeout)))
+        return self._read_blocking(self.idle_timeout if timeout is None else max(0.0, float(timeout)))
+
+    # ---------- POSIX ----------
+    def _wait_readable(self, timeout_s: float) -> bool:
+        events = self._poller.poll(max(0, math.ceil(timeout_s * 1000)))
+        for _, ev in events:
+            if ev & select.POLLIN:
+                return True
+            if ev & (select.POLLERR | select.POLLHUP):
+                raise OSError("串口已断开 (POLLHUP/POLLERR)")
+        return False
+
+    def _read_poll(self, timeout: float):
+        if not self._wait_readable(timeout):
+            return self._view[:0]
+
+        n = os.readv(self._fd, [self._view])
+        if n == 0:
+            # 与 pyserial 一致：报告可读却读不到数据 = 设备被拔出
+            raise OSError("device reports readiness to read but returned no data")
+
+        if self.max_latency > 0:
+            deadline = time.perf_counter() + self.max_latency
+            while n < len(self._buf):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._wait_readable(remaining):
+                    break
+                got = os.readv(self._fd, [self._view[n:]])
+                if got == 0:
+                    break
+                n += got
+        return self._view[:n]
+
+    # ---------- 通用（Windows 等） ----------
+    def _quantize(self, timeout: float) -> float:
+        """取不超过 timeout 的最大固定档位（空闲等待本身也是一档），端口 timeout 只在这几个值之间切换"""
+        if timeout >= self.idle_timeout:
+            return self.idle_timeout
+        step = 0.0
+        for s in self.TIMEOUT_STEPS:
+            if s <= timeout:
+                step = s
+        return step
+
+    def _read_blocking(self, timeout: float):
+        timeout = self._quantize(timeout)
+        if self.port.timeout != timeout:
+            self.port.timeout = timeout
+        first = self.port.read(1)
+        if not first:
+            return first
+        # 首字节到了：已在驱动缓冲里的数据一次读完，不再 sleep 轮询
+        waiting = self.port.in_waiting
+        if not waiting:
+            return first
+        return first + self.port.read(min(waiting, len(self._buf) - 1))
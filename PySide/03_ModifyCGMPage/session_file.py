@@ -0,0 +1,295 @@
+# session_file.py
+# 二进制会话记录格式（不依赖 Qt）：分块列式存储 + 文件尾索引，读取时内存映射，不解析文本
+#
+# 文件布局（小端）：
+#   文件头  : "CGMS" | 版本 u16 | 保留 u16 | JSON 长度 u32 | JSON（列定义、会话开始时间、AppConfig 标定参数）| 补齐到 8 字节
+#   数据块  : "CHNK" | 行数 u32 | 数据长度 u32 | CRC32 u32 | 各列依次存放（每列补齐到 8 字节）
+#   ...
+#   索引    : 每块一条 INDEX_DTYPE（块偏移、行数、设备时间范围）
+#   文件尾  : "CIDX" | 块数 u32 | 索引偏移 u64
+# 程序崩溃时没有索引和文件尾：读取时从文件头之后逐块扫描（校验 CRC），截断的最后一块丢弃
+from __future__ import annotations
+
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from frame_batch import FrameBatch
+
+MAGIC = b"CGMS"
+VERSION = 1
+CHUNK_MAGIC = b"CHNK"
+INDEX_MAGIC = b"CIDX"
+
+_HEADER = struct.Struct("<4sHHI")
+_CHUNK = struct.Struct("<4sIII")
+_TRAILER = struct.Struct("<4sIQ")
+
+# 列定义：设备时间保持 float64（长时间记录时 float32 的时间分辨率不够），
+# 测量值用 float32，接收时间存为相对会话开始时间的毫秒数
+COLUMNS = (
+    ("t", "<f8"),
+    ("voltage", "<f4"),
+    ("uric", "<f4"),
+    ("ascorbic", "<f4"),
+    ("glucose", "<f4"),
+    ("recv_ms", "<u4"),
+)
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),      # 块头在文件中的偏移
+    ("rows", "<u4"),
+    ("reserved", "<u4"),
+    ("t_min", "<f8"),
+    ("t_max", "<f8"),
+])
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _column_layout(rows: int) -> list:
+    """一个数据块内各列的 (名称, dtype, 相对数据区起点的偏移)，以及数据区总长度"""
+    layout = []
+    off = 0
+    for name, dt in COLUMNS:
+        dt = np.dtype(dt)
+        layout.append((name, dt, off))
+        off += _pad8(rows * dt.itemsize)
+    return layout, off
+
+
+class SessionWriter:
+    """
+    append(batch) 累积数据，满 chunk_rows 行写出一个数据块；flush() 把剩余的行也写成一块并刷到磁盘；
+    close() 写索引和文件尾。没有 close 的文件（崩溃）仍可由 SessionReader 扫描恢复。
+    """
+
+    def __init__(self, path, config: dict = None, chunk_rows: int = 4096, start_time: float = None):
+        self.path = str(path)
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.start_time = time.time() if start_time is None else float(start_time)
+        self.rows_written = 0
+        self._index = []
+        self._pending = []
+        self._pending_rows = 0
+
+        header = {
+            "created": datetime.fromtimestamp(self.start_time).isoformat(timespec="milliseconds"),
+            "start_time": self.start_time,
+            "columns": [[name, dt] for name, dt in COLUMNS],
+            "config": config or {},
+        }
+        meta = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        head = _HEADER.pack(MAGIC, VERSION, 0, len(meta)) + meta
+        self._f = open(self.path, "wb")
+        self._f.write(head + b"\0" * (_pad8(len(head)) - len(head)))
+
+    @property
+    def closed(self) -> bool:
+        return self._f is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, batch: FrameBatch):
+        if self._f is None:
+            raise ValueError("session file is closed")
+        if not len(batch):
+            return
+        self._pending.append(batch)
+        self._pending_rows += len(batch)
+        if self._pending_rows >= self.chunk_rows:
+            data = FrameBatch.concat(self._pending)
+            full = len(data) - len(data) % self.chunk_rows
+            for i in range(0, full, self.chunk_rows):
+                self._write_chunk(data[i:i + self.chunk_rows])
+            rest = data[full:]
+            self._pending = [rest] if len(rest) else []
+            self._pending_rows = len(rest)
+
+    def flush(self, durability: str = "flush"):
+        """
+        剩余的行写成一块。durability：
+          "none"  只写进文件对象的缓冲区（进程崩溃可能丢失）
+          "flush" 交给操作系统（进程崩溃不丢，断电可能丢）
+          "fsync" 落盘后才返回
+        """
+        if self._f is None:
+            return
+        if self._pending_rows:
+            self._write_chunk(FrameBatch.concat(self._pending))
+            self._pending = []
+            self._pending_rows = 0
+        if durability != "none":
+            self._f.flush()
+        if durability == "fsync":
+            os.fsync(self._f.fileno())
+
+    def close(self, durability: str = "flush"):
+        if self._f is None:
+            return
+        try:
+            self.flush("none")
+            index = np.array(self._index, dtype=INDEX_DTYPE)
+            index_offset = self._f.tell()
+            self._f.write(index.tobytes())
+            self._f.write(_TRAILER.pack(INDEX_MAGIC, len(index), index_offset))
+            self._f.flush()
+            if durability == "fsync":
+                os.fsync(self._f.fileno())
+        finally:
+            self._f.close()
+            self._f = None
+
+    def _write_chunk(self, batch: FrameBatch):
+        rows = len(batch)
+        recv_ms = np.clip(np.rint((batch.recv_ts - self.start_time) * 1000.0), 0, 0xFFFFFFFF)
+        cols = {
+            "t": batch.t, "voltage": batch.voltage, "uric": batch.uric,
+            "ascorbic": batch.ascorbic, "glucose": batch.glucose, "recv_ms": recv_ms,
+        }
+        layout, size = _column_layout(rows)
+        payload = bytearray(size)
+        for name, dt, off in layout:
+            raw = np.ascontiguousarray(cols[name], dtype=dt).tobytes()
+            payload[off:off + len(raw)] = raw
+
+        offset = self._f.tell()
+        self._f.write(_CHUNK.pack(CHUNK_MAGIC, rows, size, zlib.crc32(payload)))
+        self._f.write(payload)
+        t = batch.t
+        self._index.append((offset, rows, 0, float(t.min()), float(t.max())))
+        self.rows_written += rows
+
+
+class SessionReader:
+    """
+    以只读内存映射打开会话文件；各列按块取视图，不做文本解析。
+    - 有索引时直接使用；否则（崩溃后的文件）逐块扫描恢复，recovered 为 True
+    - read(t0, t1) 只访问设备时间范围与 [t0, t1] 重叠的块
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+        buf = self._mm
+        if len(buf) < _HEADER.size:
+            raise ValueError(f"not a session file: {self.path}")
+        magic, version, _, meta_len = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a session file: {self.path}")
+        self.header = json.loads(bytes(buf[_HEADER.size:_HEADER.size + meta_len]).decode("utf-8"))
+        self.config = self.header.get("config", {})
+        self.start_time = float(self.header["start_time"])
+        self._data_start = _pad8(_HEADER.size + meta_len)
+
+        self.index = self._read_index()
+        self.recovered = self.index is None
+        if self.index is None:
+            self.index = self._scan_chunks()
+
+    def __len__(self) -> int:
+        return int(self.index["rows"].sum())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mm = None
+
+    # ---------- 索引 ----------
+    def _read_index(self):
+        buf = self._mm
+        size = len(buf)
+        if size < self._data_start + _TRAILER.size:
+            return None
+        magic, count, offset = _TRAILER.unpack_from(buf, size - _TRAILER.size)
+        if magic != INDEX_MAGIC or offset + count * INDEX_DTYPE.itemsize != size - _TRAILER.size:
+            return None
+        return np.frombuffer(buf, dtype=INDEX_DTYPE, count=count, offset=offset).copy()
+
+    def _scan_chunks(self) -> np.ndarray:
+        """逐块校验，遇到不完整或校验失败的块即停止（之后的内容视为崩溃时的残留）"""
+        buf = self._mm
+        entries = []
+        pos = self._data_start
+        while pos + _CHUNK.size <= len(buf):
+            magic, rows, size, crc = _CHUNK.unpack_from(buf, pos)
+            end = pos + _CHUNK.size + size
+            if magic != CHUNK_MAGIC or rows == 0 or size != _column_layout(rows)[1] or end > len(buf):
+                break
+            if zlib.crc32(buf[pos + _CHUNK.size:end]) != crc:
+                break
+            t = self._chunk_column(pos, rows, "t")
+            entries.append((pos, rows, 0, float(t.min()), float(t.max())))
+            pos = end
+        self.valid_end = pos
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    # ---------- 读取 ----------
+    def _chunk_column(self, offset: int, rows: int, name: str) -> np.ndarray:
+        layout, _ = _column_layout(rows)
+        for col, dt, off in layout:
+            if col == name:
+                return np.frombuffer(self._mm, dtype=dt, count=rows, offset=offset + _CHUNK.size + off)
+        raise KeyError(name)
+
+    def column(self, name: str, chunks=None) -> np.ndarray:
+        """某一列的全部数据（只有一个块时返回内存映射视图，否则拼接一次）"""
+        chunks = self.index if chunks is None else chunks
+        parts = [self._chunk_column(int(c["offset"]), int(c["rows"]), name) for c in chunks]
+        if not parts:
+            return np.empty(0, dtype=dict(COLUMNS)[name])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def read(self, t0: float = None, t1: float = None) -> FrameBatch:
+        """读成 FrameBatch（float64）；给出 t0 / t1 时只返回设备时间在 [t0, t1] 内的行"""
+        chunks = self.index
+        if t0 is not None:
+            chunks = chunks[chunks["t_max"] >= t0]
+        if t1 is not None:
+            chunks = chunks[chunks["t_min"] <= t1]
+        cols = {name: self.column(name, chunks).astype(np.float64) for name, _ in COLUMNS}
+        batch = FrameBatch.from_columns(
+            cols["t"], cols["voltage"], cols["uric"], cols["ascorbic"], cols["glucose"],
+            self.start_time + cols["recv_ms"] / 1000.0,
+        )
+        if t0 is not None or t1 is not None:
+            t = batch.t
+            mask = np.ones(len(batch), dtype=bool)
+            if t0 is not None:
+                mask &= t >= t0
+            if t1 is not None:
+                mask &= t <= t1
+            batch = batch[mask]
+        return batch
+
+
+def repair_session(path) -> int:
+    """修复崩溃后没有索引的会话文件：截掉残缺的最后一块并补写索引和文件尾；返回保留的行数"""
+    reader = SessionReader(path)
+    if not reader.recovered:
+        return len(reader)
+    index, valid_end = reader.index, reader.valid_end
+    reader.close()
+    with open(path, "r+b") as f:
+        f.truncate(valid_end)
+        f.seek(valid_end)
+        f.write(index.tobytes())
+        f.write(_TRAILER.pack(INDEX_MAGIC, len(index), valid_end))
+        f.flush()
+        os.fsync(f.fileno())
+    return int(index["rows"].sum())
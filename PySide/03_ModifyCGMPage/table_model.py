@@ -0,0 +1,123 @@
+# table_model.py
+# 实时数据表的模型：列式环形缓冲 + QAbstractTableModel，只在单元格可见（被视图请求）时才格式化文本
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from frame_batch import FrameBatch
+
+# 表格列顺序：时间, 尿酸, 抗坏血酸, 葡萄糖, 电压, 接收时间（与 CSV 一致）
+TABLE_COLUMNS = ("t", "uric", "ascorbic", "glucose", "voltage", "recv_ts")
+
+# data() 每个可见单元格每次重绘会被调用多次（各种 role），
+# 与 Qt 枚举比较在 PySide6 里要几微秒，先转成 int 再比较
+_DISPLAY_ROLE = int(Qt.ItemDataRole.DisplayRole)
+
+
+class FrameTableModel(QAbstractTableModel):
+    """
+    最多保留 max_rows 行（超出丢弃最旧的行）。
+    底层为 (6, 2 * max_rows) 的 float64 数组，写到末尾时把保留的行搬回开头（均摊 O(1)）；
+    每批数据只发一次 beginRemoveRows / beginInsertRows，视图只重绘可见区域。
+    """
+
+    def __init__(self, headers, max_rows: int = 1000, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.max_rows = max(1, int(max_rows))
+        self._data = np.empty((len(TABLE_COLUMNS), 2 * self.max_rows), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        self._time_text = {}    # 接收时间戳 -> 文本（同一次读取的行共用）
+
+    # ---------- Qt 接口 ----------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._end - self._start
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(TABLE_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.headers):
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != _DISPLAY_ROLE or not index.isValid():
+            return None
+        return self.cell_text(index.row(), index.column())
+
+    # ---------- 读取 ----------
+    def cell_text(self, row: int, col: int) -> str:
+        v = float(self._data[col, self._start + row])
+        if TABLE_COLUMNS[col] == "recv_ts":
+            return self._format_time(v)
+        return str(round(v, 4))
+
+    def row_texts(self) -> list:
+        """全部行的显示文本（手动保存 CSV 用）"""
+        n_rows, n_cols = self.rowCount(), self.columnCount()
+        return [[self.cell_text(r, c) for c in range(n_cols)] for r in range(n_rows)]
+
+    def _format_time(self, ts: float) -> str:
+        text = self._time_text.get(ts)
+        if text is None:
+            if len(self._time_text) > 4096:
+                self._time_text.clear()
+            text = datetime.fromtimestamp(ts).strftime("%H:%M:%S.%f")[:-3]
+            self._time_text[ts] = text
+        return text
+
+    # ---------- 写入 ----------
+    def append_batch(self, batch: FrameBatch):
+        n = len(batch)
+        if n == 0:
+            return
+        cols = np.vstack([getattr(batch, name) for name in TABLE_COLUMNS])
+        if n > self.max_rows:
+            cols = cols[:, -self.max_rows:]
+            n = self.max_rows
+
+        # 1. 先一次性移除放不下的旧行
+        self._remove_head(self.rowCount() + n - self.max_rows)
+
+        # 2. 空间不够时把保留的行搬回开头（行号不变，视图无感知）
+        size = self.rowCount()
+        if self._end + n > self._data.shape[1]:
+            self._data[:, :size] = self._data[:, self._start:self._end]
+            self._start, self._end = 0, size
+
+        # 3. 一次性插入整批
+        self.beginInsertRows(QModelIndex(), size, size + n - 1)
+        self._data[:, self._end:self._end + n] = cols
+        self._end += n
+        self.endInsertRows()
+
+    def set_max_rows(self, max_rows: int):
+        max_rows = max(1, int(max_rows))
+        if max_rows == self.max_rows:
+            return
+        self._remove_head(self.rowCount() - max_rows)
+        size = self.rowCount()
+        data = np.empty((len(TABLE_COLUMNS), 2 * max_rows), dtype=np.float64)
+        data[:, :size] = self._data[:, self._start:self._end]
+        self._data = data
+        self._start, self._end = 0, size
+        self.max_rows = max_rows
+
+    def clear(self):
+        self.beginResetModel()
+        self._start = self._end = 0
+        self._time_text.clear()
+        self.endResetModel()
+
+    def _remove_head(self, count: int):
+        count = min(count, self.rowCount())
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), 0, count - 1)
+        self._start += count
+        self.endRemoveRows()